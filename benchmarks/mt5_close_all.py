@@ -0,0 +1,56 @@
+# benchmarks/mt5_close_all.py
+"""
+Emergency flatten timing for PepperstoneMT5Broker.close_all against the
+FakeMT5 stand-in: N positions over a few symbols, a per-request round trip
+of --latency seconds and some requotes. Prints per-position reports and the
+total time; terminal calls are serialized, so it grows with positions x latency.
+
+    python benchmarks/mt5_close_all.py [--positions 20] [--latency 0.05] [--requotes 3] [--workers 1]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mt5_fake import FakeMT5  # noqa: E402  (benchmarks/, next to this script)
+
+PRICES = {"BTCUSD": 60000.0, "ETHUSD": 3000.0, "XAUUSD": 2300.0, "EURUSD": 1.08}
+
+
+def run(positions: int, latency: float, requotes: int, workers: int, verbose: bool):
+    fake = FakeMT5(prices=PRICES, latency=latency, requotes=requotes).install()
+    symbols = list(PRICES)
+    for i in range(positions):
+        fake.add_position(symbols[i % len(symbols)], "buy" if i % 3 else "sell", 0.1)
+
+    from bot.broker_pepperstone_mt5 import PepperstoneMT5Broker
+    broker = PepperstoneMT5Broker({"pepperstone_mt5": {"close_workers": workers}})
+    started = time.perf_counter()
+    reports = broker.close_all()
+    elapsed = (time.perf_counter() - started) * 1000
+
+    if verbose:
+        print(f"{'ticket':>6} {'symbol':<8}{'side':<5}{'req':>12}{'fill':>12}{'bps':>7}{'ms':>8}{'tries':>6}")
+        for r in reports:
+            print(f"{r['ticket']:>6} {r['symbol']:<8}{r['side']:<5}{r['requested_price']:>12.5f}"
+                  f"{r['fill_price'] or 0:>12.5f}{r['slippage_bps'] or 0:>7.2f}{r['latency_ms']:>8.1f}{r['attempts']:>6}")
+    closed = sum(r['ok'] for r in reports)
+    print(f"workers={workers:<3} closed {closed}/{positions} in {elapsed:.0f} ms, "
+          f"tick reads {fake.tick_calls}, orders sent {len(fake.requests)}, left open {len(fake.positions_get())}")
+    return elapsed
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--positions", type=int, default=20)
+    ap.add_argument("--latency", type=float, default=0.05)
+    ap.add_argument("--requotes", type=int, default=3)
+    ap.add_argument("--workers", type=int, default=1)
+    args = ap.parse_args()
+    run(args.positions, args.latency, args.requotes, args.workers, verbose=True)
+
+
+if __name__ == "__main__":
+    main()
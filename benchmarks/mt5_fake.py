@@ -0,0 +1,175 @@
+# benchmarks/mt5_fake.py
+"""
+In-process stand-in for the MetaTrader5 package, for exercising
+PepperstoneMT5Broker without a terminal (dry runs, benchmarks/mt5_close_all.py):
+
+    fake = FakeMT5(prices={"BTCUSD": 60000.0}, latency=0.05, requotes=2).install()
+    fake.add_position("BTCUSD", "buy", 0.1)
+    broker = PepperstoneMT5Broker(cfg)
+    broker.close_all()
+
+Only the calls the broker uses are implemented. order_send sleeps `latency`
+seconds, and the first `requotes` deal requests are answered with a requote
+after moving the price down by `drift_bps`. Quotes are mid +/- half
+`spread_bps`. Requests are recorded in `requests`; `max_concurrent` is the
+most order_send / symbol_info_tick calls seen in flight at once (the real
+package is not thread-safe, so callers must keep it at 1).
+"""
+import sys
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, Optional
+
+# Constants with the MetaTrader5 package's values
+TIMEFRAME_M1, TIMEFRAME_M5, TIMEFRAME_M15, TIMEFRAME_M30 = 1, 5, 15, 30
+TIMEFRAME_H1, TIMEFRAME_H4, TIMEFRAME_D1 = 16385, 16388, 16408
+TRADE_ACTION_DEAL, TRADE_ACTION_PENDING, TRADE_ACTION_REMOVE = 1, 5, 8
+ORDER_TYPE_BUY, ORDER_TYPE_SELL, ORDER_TYPE_BUY_LIMIT, ORDER_TYPE_SELL_LIMIT = 0, 1, 2, 3
+ORDER_FILLING_FOK, ORDER_FILLING_IOC, ORDER_FILLING_RETURN = 0, 1, 2
+POSITION_TYPE_BUY, POSITION_TYPE_SELL = 0, 1
+TRADE_RETCODE_REQUOTE, TRADE_RETCODE_PLACED, TRADE_RETCODE_DONE = 10004, 10008, 10009
+TRADE_RETCODE_INVALID, TRADE_RETCODE_PRICE_CHANGED = 10013, 10020
+
+
+class FakeMT5:
+    def __init__(self, prices: Optional[Dict[str, float]] = None, spread_bps: float = 1.0, latency: float = 0.0,
+                 requotes: int = 0, drift_bps: float = 2.0, currency: str = "USD", balance: float = 10000.0):
+        for name, value in globals().items():
+            if name.isupper():
+                setattr(self, name, value)
+        self.prices = dict(prices or {})
+        self.spread_bps = spread_bps
+        self.latency = latency
+        self.requotes = requotes
+        self.drift_bps = drift_bps
+        self.currency = currency
+        self.balance = balance
+        self.requests = []
+        self.tick_calls = 0
+        self.max_concurrent = 0
+        self._in_flight = 0
+        self._flight_lock = threading.Lock()
+        self._positions = {}
+        self._next_ticket = 1
+        self._lock = threading.Lock()
+
+    def install(self):
+        """Make `import MetaTrader5` (and the broker module) use this fake."""
+        sys.modules["MetaTrader5"] = self
+        from bot import broker_pepperstone_mt5
+        broker_pepperstone_mt5.mt5 = self
+        return self
+
+    def add_position(self, symbol: str, side: str, volume: float, price: Optional[float] = None) -> int:
+        with self._lock:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            self._positions[ticket] = SimpleNamespace(
+                ticket=ticket, symbol=symbol, volume=volume,
+                type=POSITION_TYPE_BUY if side == "buy" else POSITION_TYPE_SELL,
+                price_open=price if price is not None else self.prices.get(symbol, 100.0),
+            )
+            return ticket
+
+    # --- MetaTrader5 API ---
+
+    def initialize(self, *args, **kwargs):
+        return True
+
+    def login(self, *args, **kwargs):
+        return True
+
+    def shutdown(self):
+        return True
+
+    def last_error(self):
+        return (1, "Success")
+
+    def account_info(self):
+        return SimpleNamespace(currency=self.currency, balance=self.balance, equity=self.balance,
+                               margin=0.0, margin_free=self.balance)
+
+    def symbol_info(self, symbol):
+        if symbol not in self.prices:
+            return None
+        return SimpleNamespace(name=symbol, currency_base=symbol[:3], currency_profit=symbol[3:] or self.currency,
+                               volume_min=0.01, volume_step=0.01, volume_max=100.0,
+                               trade_tick_size=0.01 if self.prices[symbol] > 100 else 0.00001,
+                               digits=2 if self.prices[symbol] > 100 else 5)
+
+    def symbols_get(self, group=None):
+        return tuple(self.symbol_info(s) for s in self.prices)
+
+    def _enter(self):
+        with self._flight_lock:
+            self._in_flight += 1
+            self.max_concurrent = max(self.max_concurrent, self._in_flight)
+
+    def _leave(self):
+        with self._flight_lock:
+            self._in_flight -= 1
+
+    def symbol_info_tick(self, symbol):
+        self._enter()
+        try:
+            return self._tick(symbol)
+        finally:
+            self._leave()
+
+    def _tick(self, symbol):
+        with self._lock:
+            self.tick_calls += 1
+            mid = self.prices.get(symbol)
+        if mid is None:
+            return None
+        half = mid * self.spread_bps / 20000
+        return SimpleNamespace(bid=mid - half, ask=mid + half, time=int(time.time()))
+
+    def positions_get(self, symbol=None, **kwargs):
+        with self._lock:
+            return tuple(p for p in self._positions.values() if symbol is None or p.symbol == symbol)
+
+    def order_send(self, request):
+        self._enter()
+        try:
+            return self._order_send(request)
+        finally:
+            self._leave()
+
+    def _order_send(self, request):
+        time.sleep(self.latency)
+        with self._lock:
+            self.requests.append(dict(request))
+            symbol = request.get("symbol")
+            if request["action"] == TRADE_ACTION_REMOVE:
+                return SimpleNamespace(retcode=TRADE_RETCODE_DONE, order=request["order"], volume=0.0, price=0.0,
+                                       comment="Request executed")
+            if symbol not in self.prices:
+                return SimpleNamespace(retcode=TRADE_RETCODE_INVALID, order=0, volume=0.0, price=0.0,
+                                       comment="Invalid request")
+            if request["action"] == TRADE_ACTION_PENDING:
+                return SimpleNamespace(retcode=TRADE_RETCODE_DONE, order=self._ticket(), volume=request["volume"],
+                                       price=request["price"], comment="Request executed")
+
+            if self.requotes > 0:
+                self.requotes -= 1
+                self.prices[symbol] *= 1 - self.drift_bps / 10000
+                return SimpleNamespace(retcode=TRADE_RETCODE_REQUOTE, order=0, volume=0.0, price=0.0, comment="Requote")
+
+            mid = self.prices[symbol]
+            buy = request["type"] == ORDER_TYPE_BUY
+            half = mid * self.spread_bps / 20000
+            price = mid + half if buy else mid - half
+            closing = self._positions.pop(request.get("position"), None)
+            if closing is None:
+                self._positions[self._next_ticket] = SimpleNamespace(
+                    ticket=self._next_ticket, symbol=symbol, volume=request["volume"], price_open=price,
+                    type=POSITION_TYPE_BUY if buy else POSITION_TYPE_SELL)
+            return SimpleNamespace(retcode=TRADE_RETCODE_DONE, order=self._ticket(), deal=self._next_ticket,
+                                   volume=request["volume"], price=price, comment="Request executed")
+
+    def _ticket(self) -> int:
+        ticket = self._next_ticket
+        self._next_ticket += 1
+        return ticket
@@ -0,0 +1,103 @@
+# benchmarks/startup.py
+"""
+Startup-time check: how long a fresh interpreter takes to `import bot`, the
+core bot modules, and the top-level imports of every run_*.py (what a
+container restart pays before the runner does any work).
+
+Each target is timed as a whole process (interpreter start included), the
+median of --repeat runs, and compared against a budget. Heavy SDKs must
+also stay out of sys.modules for the core modules. Exits non-zero when a
+budget or an import rule is broken.
+
+    python benchmarks/startup.py [--repeat 5] [--budget-scale 1.0]
+"""
+import argparse
+import ast
+import glob
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Wall-clock budgets in ms, interpreter start included
+BUDGET_MS = {
+    "import bot": 300,
+    "import bot.strategy": 400,
+    "import bot.broker": 500,
+    "run_*.py": 2500,
+}
+
+# Modules that must only load when a runner actually asks for them
+HEAVY = ("ccxt", "matplotlib", "coinbase", "MetaTrader5", "ta")
+CORE = ("bot", "bot.strategy", "bot.broker", "bot.backtest", "bot.data", "bot.live")
+
+
+def runner_imports(path: str) -> str:
+    """The module-level import statements of a runner script, without running its body."""
+    with open(path) as f:
+        tree = ast.parse(f.read(), filename=path)
+    lines = [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    return "\n".join(lines) or "pass"
+
+
+def time_process(code: str, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+        samples.append((time.perf_counter() - started) * 1000)
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "failed")
+    return statistics.median(samples)
+
+
+def loaded_heavy(module: str):
+    code = f"import sys, {module}; print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    return [m for m in proc.stdout.strip().split(",") if m]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--budget-scale", type=float, default=1.0, help="multiply every budget (slow machines)")
+    args = ap.parse_args()
+
+    failures = []
+    baseline = time_process("pass", args.repeat)
+    print(f"{'target':<36}{'ms':>9}{'budget':>9}")
+    print(f"{'(bare interpreter)':<36}{baseline:>9.0f}")
+
+    targets = [(f"import {m}", f"import {m}") for m in ("bot", "bot.strategy", "bot.broker")]
+    for path in sorted(glob.glob(os.path.join(ROOT, "run_*.py"))):
+        targets.append((os.path.basename(path), runner_imports(path)))
+
+    for name, code in targets:
+        budget = BUDGET_MS.get(name, BUDGET_MS["run_*.py"]) * args.budget_scale
+        try:
+            ms = time_process(code, args.repeat)
+        except RuntimeError as e:
+            # A runner whose optional dependency isn't installed here can't be timed
+            print(f"{name:<36}{'skipped':>9}  ({e})")
+            continue
+        flag = "" if ms <= budget else "  OVER BUDGET"
+        print(f"{name:<36}{ms:>9.0f}{budget:>9.0f}{flag}")
+        if flag:
+            failures.append(f"{name}: {ms:.0f} ms > {budget:.0f} ms")
+
+    for module in CORE:
+        heavy = loaded_heavy(module)
+        if heavy:
+            failures.append(f"import {module} loads {', '.join(heavy)}")
+
+    if failures:
+        print("\nFAILED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+# benchmarks/suite.py
+"""
+Offline performance suite: signal generation, backtests, metrics, candle
+DataFrame construction and the live trading cycle, on deterministic
+synthetic candles at 10k / 100k / 1M bars. No network, no exchange SDKs:
+the live cycle runs TradingLoop against a local candle source and the paper
+broker, order submission against the FakeMT5 terminal.
+
+Each case is timed `--repeat` rounds, each round running it at least
+`number` times and for at least --min-round-ms, and the fastest round's
+per-call time is compared with benchmarks/baselines.json. Both sides are
+normalized by a fixed calibration workload timed in rounds interleaved with
+the case's, so a machine that is busy or throttled right now doesn't read
+as a regression.
+A case slower than baseline * --threshold is a regression and the exit code is 1.
+
+    python benchmarks/suite.py                      # 10k and 100k bars
+    python benchmarks/suite.py --sizes 10k,100k,1m --filter backtest
+    python benchmarks/suite.py --save               # store these results as the baselines
+
+Baselines are machine-specific: re-save them on the machine that compares.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+# The best of fewer rounds can't leave out one the machine disturbed
+MIN_ROUNDS = 3
+COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+RISK = {"max_position_pct": 0.2, "stop_loss_pct": 0.02, "take_profit_pct": 0.04}
+
+# Scratch directory for market caches and state journals created by the cases
+_TMP = tempfile.mkdtemp(prefix="bot-bench-")
+
+
+def make_candles(n: int, seed: int = 0) -> pd.DataFrame:
+    """Deterministic 1m candles (bot/synthetic.py): same n and seed, same candles."""
+    from bot.synthetic import generate
+    return generate(n, "1m", seed=seed, start_ms=1_700_000_040_000)
+
+
+# --- cases: setup(n) returns the callable that is timed ---
+
+CASES = []
+
+
+def case(name: str, sizes=tuple(SIZES), number: int = 1):
+    def register(setup):
+        CASES.append((name, sizes, number, setup))
+        return setup
+    return register
+
+
+def _quiet(fn):
+    """Strategies and engines print progress; keep it out of the timings and the report."""
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn()
+    return run
+
+
+def _signals(strategy: str, backend: str):
+    def setup(n):
+        from bot import indicator_cache
+        from bot.strategy import get_strategy
+        candles = make_candles(n)
+        strat = get_strategy(strategy)({'backend': backend})
+
+        def run():
+            indicator_cache.get_cache().clear()  # time the computation, not a cache hit
+            strat.generate_signals(candles)
+        return _quiet(run)
+    return setup
+
+
+for _strategy in ("sma_rsi", "scalping"):
+    for _backend in ("pandas", "numpy"):
+        case(f"signals/{_strategy}-{_backend}")(_signals(_strategy, _backend))
+
+
+@case("signals/sma_rsi-batch16")
+def _signals_batch(n):
+    from bot.strategy import SMARSI
+    candles = make_candles(n)
+    sets = [{'fast_sma': f, 'slow_sma': s} for f in (5, 10, 15, 20) for s in (30, 40, 50, 60)]
+    return lambda: SMARSI.signals_batch(candles, sets, backend="numpy")
+
+
+def _backtest(engine: str):
+    def setup(n):
+        from bot.backtest import Backtester
+        from bot.risk import RiskManager
+        from bot.strategy import SMARSI
+        candles = make_candles(n)
+        bt = Backtester({'engine': engine, 'timeframe': '1m', 'write_artifacts': False},
+                        SMARSI({'backend': 'numpy'}), RiskManager(RISK))
+        return _quiet(lambda: bt.run(candles))
+    return setup
+
+
+for _engine in ("loop", "vectorized"):
+    # the per-bar loop engine needs minutes at 1M bars
+    case(f"backtest/{_engine}", sizes=("10k", "100k") if _engine == "loop" else tuple(SIZES))(_backtest(_engine))
+
+
+@case("metrics/compute")
+def _metrics(n):
+    from bot.metrics import compute_metrics
+    rng = np.random.default_rng(1)
+    ec = 10000 * np.cumprod(1 + rng.normal(0, 0.001, n))
+    return lambda: compute_metrics(ec, "1m", starting_equity=10000)
+
+
+@case("metrics/running")
+def _running_metrics(n):
+    from bot.metrics import RunningMetrics
+    rng = np.random.default_rng(1)
+    ec = 10000 * np.cumprod(1 + rng.normal(0, 0.001, n))
+
+    def run():
+        m = RunningMetrics("1m")
+        m.update_many(ec)
+        return m.snapshot()
+    return run
+
+
+@case("data/ccxt-frame")
+def _ccxt_frame(n):
+    # fetch_ohlcv() payload: list of [ts, o, h, l, c, v] lists
+    rows = make_candles(n).to_numpy().tolist()
+    return lambda: pd.DataFrame(rows, columns=COLUMNS)
+
+
+@case("data/coinbase-frame")
+def _coinbase_frame(n):
+    from bot.broker_coinbase import candles_from_response
+    candles = make_candles(n)
+    # get_candles() payload: newest first, numbers as strings, start in epoch seconds
+    resp = {"candles": [{"start": str(int(r[0]) // 1000), "low": str(r[3]), "high": str(r[2]), "open": str(r[1]),
+                         "close": str(r[4]), "volume": str(r[5])} for r in candles.to_numpy()[::-1]]}
+
+    def run():
+        df = pd.DataFrame(candles_from_response(resp))
+        df['timestamp'] = df['start'].astype(np.int64) * 1000
+        return df[COLUMNS]
+    return run
+
+
+@case("data/candle-store")
+def _candle_store(n):
+    from bot.candle_store import CandleStore
+    store = CandleStore(tempfile.mkdtemp(dir=_TMP))
+    rows = make_candles(n).to_numpy()
+    store.write("bench", "BTC/USDT", "1m", rows)
+    return lambda: store.to_frame(store.read("bench", "BTC/USDT", "1m"))
+
+
+@case("data/resample-1h")
+def _resample(n):
+    from bot.resample import resample
+    candles = make_candles(n)
+    return lambda: resample(candles, "1h", "1m")
+
+
+@case("data/synthetic")
+def _synthetic(n):
+    from bot.synthetic import generate_many
+    return lambda: generate_many(["BTC/USDT", "ETH/USDT"], n, seed=0, corr=0.7, vol_of_vol=0.3, gap_prob=0.001)
+
+
+class LocalSource:
+    """AsyncLiveDataSource stand-in: serves the last `limit` closed candles up to the simulated clock."""
+    def __init__(self, n: int, symbols):
+        self.candles = {sym: make_candles(n, seed=i) for i, sym in enumerate(symbols)}
+        self.markets = None
+        self.exchange = None
+        self.bar = 0
+
+    async def get_recent_candles(self, symbol: str, limit: int = 200) -> pd.DataFrame:
+        df = self.candles[symbol]
+        return df.iloc[max(0, self.bar - limit):self.bar + 1].reset_index(drop=True)  # + the forming candle
+
+    async def close(self):
+        pass
+
+
+@case("live/cycle-4-symbols", sizes=("10k",), number=50)
+def _live_cycle(n):
+    from bot.broker import Broker
+    from bot.live import TradingLoop
+    from bot.scheduler import Tick
+    symbols = ["BTC/USDT", "ETH/USDT", "SOL/USDT", "XRP/USDT"]
+    cfg = {
+        "exchange": {"name": None},
+        "market": {"symbol": symbols[0], "symbols": symbols, "timeframe": "1m"},
+        "strategy": {"name": "sma_rsi", "params": {}},
+        "risk": RISK,
+        "paper": {"enabled": True, "starting_equity": 10000, "fee_pct": 0.0005, "candles_history": 100,
+                  "order_amount": 0.001, "async": True},
+        "state": {"dir": tempfile.mkdtemp(dir=_TMP), "snapshot_every": 1000},
+    }
+    loop = TradingLoop(Broker(cfg), cfg)
+    source = LocalSource(n, symbols)
+    with contextlib.redirect_stdout(io.StringIO()):
+        asyncio.run(loop.setup_async(source))
+    source.bar = 200
+    step = loop.step_ms
+    first_ts = int(source.candles[symbols[0]]['timestamp'].iloc[0])
+
+    def cycle():
+        # one candle close: fetch -> signal -> paper order for every symbol, then metrics + journal
+        source.bar += 1
+        tick = Tick(first_ts + source.bar * step, step, 0.0)
+        asyncio.run(_gather(loop, tick))
+        loop._update_metrics()
+    return _quiet(cycle)
+
+
+async def _gather(loop, tick):
+    await asyncio.gather(*(loop._process_symbol(sym, tick) for sym in loop.symbols))
+
+
+@case("live/mt5-submit", sizes=("10k",), number=200)
+def _mt5_submit(n):
+    from bot import markets
+    from mt5_fake import FakeMT5  # benchmarks/, next to this script
+    from bot.orders import OrderRequest
+    markets.configure(cache_dir=tempfile.mkdtemp(dir=_TMP))
+    FakeMT5(prices={"BTCUSD": 60000.0}).install()
+    from bot.broker_pepperstone_mt5 import PepperstoneMT5Broker
+    broker = PepperstoneMT5Broker({"pepperstone_mt5": {"symbol": "BTCUSD"}})
+    sides = iter(["buy", "sell"] * 10**6)
+    return lambda: broker.submit(OrderRequest("BTCUSD", next(sides), 0.01))
+
+
+# --- runner ---
+
+_CALIBRATION_X = np.random.default_rng(0).standard_normal(200_000)
+
+
+def calibration_work():
+    """A fixed NumPy + pure-Python workload (~10 ms): how fast this machine runs right now."""
+    np.sort(_CALIBRATION_X)
+    np.cumsum(_CALIBRATION_X)
+    sum(i * i for i in range(100_000))
+
+
+def _round(fn, number: int) -> float:
+    started = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return (time.perf_counter() - started) * 1000 / number
+
+
+def time_case(fn, repeat: int, number: int, min_round_ms: float = 0.0):
+    """
+    (ms, calibration_ms): best ms per call of `fn` over `repeat` rounds, and
+    of calibration_work() over rounds interleaved with them, so both see the
+    same load. A round runs `number` calls, more if needed to last
+    `min_round_ms` (sub-ms cases are otherwise timer noise). The minimum is
+    the round least disturbed by the rest of the machine.
+    """
+    first_ms = _round(fn, 1)  # warm-up: imports, JIT, first-touch allocations
+    number = max(number, math.ceil(min_round_ms / max(first_ms, 1e-3)))
+    cal_number = max(1, math.ceil(min_round_ms / max(_round(calibration_work, 1), 1e-3)))
+    samples, calibration = [], []
+    for _ in range(repeat):
+        calibration.append(_round(calibration_work, cal_number))
+        samples.append(_round(fn, number))
+    return min(samples), min(calibration)
+
+
+def machine() -> dict:
+    return {"python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+            "platform": platform.platform(), "cpus": os.cpu_count()}
+
+
+def load_baselines() -> dict:
+    if not os.path.exists(BASELINES):
+        return {"machine": {}, "results": {}}
+    with open(BASELINES) as f:
+        return json.load(f)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="10k,100k", help="comma list of 10k, 100k, 1m")
+    ap.add_argument("--filter", default="", help="only cases whose name contains this")
+    ap.add_argument("--repeat", type=int, default=7, help=f"timed rounds per case (at least {MIN_ROUNDS})")
+    ap.add_argument("--min-round-ms", type=float, default=50.0, help="repeat calls within a round up to this long")
+    ap.add_argument("--threshold", type=float, default=1.5, help="regression if slower than baseline * threshold")
+    ap.add_argument("--save", action="store_true", help="write these results to benchmarks/baselines.json")
+    args = ap.parse_args()
+
+    sizes = [s.strip().lower() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        ap.error(f"unknown size(s): {', '.join(unknown)}")
+
+    stored = load_baselines()
+    baselines = stored.get("results", {})
+    if stored.get("machine") and stored["machine"] != machine():
+        print(f"[BENCH] baselines were saved on another setup ({stored['machine']}); compare with care")
+
+    base_calibration = stored.get("calibration_ms") or {}
+
+    results, calibration, regressions = {}, {}, []
+    print(f"{'case':<36}{'ms':>11}{'baseline':>11}{'ratio':>8}")
+    for name, case_sizes, number, setup in CASES:
+        if args.filter not in name:
+            continue
+        for size in sizes:
+            if size not in case_sizes:
+                continue
+            key = f"{name}/{size}"
+            fn = setup(SIZES[size])
+            # 1M-bar cases take seconds each: fewer rounds
+            rounds = max(MIN_ROUNDS, args.repeat // 2 if size == "1m" else args.repeat)
+            ms, calibration[key] = time_case(fn, rounds, number, args.min_round_ms)
+            results[key] = round(ms, 4)
+            base = baselines.get(key)
+            if base:
+                # scaled by how fast the machine ran the calibration now vs in the baseline run
+                speed = calibration[key] / base_calibration[key] if key in base_calibration else 1.0
+                ratio = ms / base / speed
+                flag = "  REGRESSION" if ratio > args.threshold else ""
+                print(f"{key:<36}{ms:>11.3f}{base:>11.3f}{ratio:>8.2f}{flag}")
+                if flag:
+                    regressions.append(f"{key}: {ms:.3f} ms vs baseline {base:.3f} ms ({ratio:.2f}x calibrated)")
+            else:
+                print(f"{key:<36}{ms:>11.3f}{'-':>11}{'-':>8}")
+
+    if args.save:
+        merged = {**baselines, **results}
+        calibration = {**base_calibration, **{k: round(v, 4) for k, v in calibration.items()}}
+        with open(BASELINES, "w") as f:
+            json.dump({"machine": machine(), "saved_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                       "results": dict(sorted(merged.items())),
+                       "calibration_ms": dict(sorted(calibration.items()))}, f, indent=2)
+            f.write("\n")
+        print(f"\n[BENCH] saved {len(results)} result(s) to {os.path.relpath(BASELINES)}")
+        return
+
+    if regressions:
+        print(f"\nREGRESSIONS (threshold {args.threshold}x):\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# bot/artifacts.py
+import itertools
+import json
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, Optional
+
+import numpy as np
+import pandas as pd
+
+from .utils import ensure_dir
+
+_counter = itertools.count()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def run_dir(root: str = "artifacts", prefix: str = "backtest") -> str:
+    """Fresh directory per run, e.g. artifacts/runs/backtest-20240101-120000-4242-0."""
+    name = f"{prefix}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_counter)}"
+    path = os.path.join(root, "runs", name)
+    ensure_dir(path)
+    return path
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    # One writer thread: artifacts are I/O bound and shouldn't compete with the backtest for CPU.
+    # Pending writes still finish at interpreter exit (executor threads are joined).
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="artifacts")
+    return _executor
+
+
+def write_trades_columnar(trades: pd.DataFrame, path: str):
+    """Trade log as a compressed .npz with one array per column (strings as fixed-width unicode)."""
+    np.savez_compressed(path, **{col: trades[col].to_numpy() if pd.api.types.is_numeric_dtype(trades[col])
+                      else trades[col].to_numpy().astype(str) for col in trades.columns})
+
+
+def read_trades_columnar(path: str) -> pd.DataFrame:
+    with np.load(path, allow_pickle=False) as data:
+        return pd.DataFrame({col: data[col] for col in data.files})
+
+
+def plot_equity_curve(ec: np.ndarray, path: str, dpi: int = 160):
+    # Figure API instead of pyplot: no global state, safe off the main thread
+    from matplotlib.figure import Figure
+    fig = Figure()
+    ax = fig.add_subplot()
+    ax.plot(ec)
+    ax.set_title("Equity Curve")
+    ax.set_xlabel("Step")
+    ax.set_ylabel("Equity")
+    fig.savefig(path, dpi=dpi, bbox_inches='tight')
+
+
+class ArtifactWriter:
+    """
+    Writes a backtest's outputs to its own run directory.
+
+    Options (the `artifacts` section of the backtest config):
+      dir:        root directory (default "artifacts"); runs go to <dir>/runs/<run>
+      formats:    any of "csv", "npz" (compressed, columnar) for the trade log (default both)
+      plot:       render equity_curve.png (imports matplotlib only then)
+      background: write on a worker thread and return immediately (default True)
+
+    save() returns the paths that will be written and a Future that completes
+    once they are on disk.
+    """
+    def __init__(self, options: Optional[Dict[str, Any]] = None):
+        options = options or {}
+        self.root = options.get('dir', "artifacts")
+        self.formats = tuple(options.get('formats', ("csv", "npz")))
+        self.plot = bool(options.get('plot', False))
+        self.dpi = int(options.get('dpi', 160))
+        self.background = bool(options.get('background', True))
+
+    def save(self, trades: pd.DataFrame, equity_curve: np.ndarray, metrics: Dict[str, Any],
+             prefix: str = "backtest"):
+        out = run_dir(self.root, prefix)
+        files = {'run_dir': out, 'metrics_json': os.path.join(out, "metrics.json"),
+                 'equity_curve_npy': os.path.join(out, "equity_curve.npy")}
+        if "csv" in self.formats:
+            files['trades_csv'] = os.path.join(out, "trades.csv")
+        if "npz" in self.formats:
+            files['trades_npz'] = os.path.join(out, "trades.npz")
+        if self.plot:
+            files['equity_curve_png'] = os.path.join(out, "equity_curve.png")
+
+        # Snapshot the inputs so the caller can keep mutating its own copies
+        job = (trades.copy(), np.array(equity_curve, dtype=np.float64), dict(metrics), files)
+        if self.background:
+            future = _get_executor().submit(self._write, *job)
+        else:
+            future = Future()
+            future.set_result(self._write(*job))
+        return files, future
+
+    def _write(self, trades: pd.DataFrame, ec: np.ndarray, metrics: Dict[str, Any], files: Dict[str, str]):
+        with open(files['metrics_json'], "w") as f:
+            json.dump(metrics, f, indent=2, default=float)
+        np.save(files['equity_curve_npy'], ec)
+        if 'trades_csv' in files:
+            trades.to_csv(files['trades_csv'], index=False)
+        if 'trades_npz' in files:
+            write_trades_columnar(trades, files['trades_npz'])
+        if 'equity_curve_png' in files:
+            plot_equity_curve(ec, files['equity_curve_png'], self.dpi)
+        return files
+
+
+def wait():
+    """Block until every queued artifact write has finished."""
+    if _executor is not None:
+        _get_executor().submit(lambda: None).result()
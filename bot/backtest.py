@@ -2,11 +2,18 @@
 from typing import Dict, Any
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from .risk import RiskManager
 from .strategy import BaseStrategy
 from .broker import PaperBroker
-from .utils import ensure_dir
+from .artifacts import ArtifactWriter
+from .metrics import compute_metrics, infer_timeframe_ms, positions_from_trades
+
+def equity_metrics(ec: np.ndarray, equity: float, num_trades: int, timeframe="1m", **kwargs) -> Dict[str, Any]:
+    """Backtest metrics for an equity curve; extra kwargs go to metrics.compute_metrics."""
+    out = compute_metrics(ec, timeframe, starting_equity=equity, **kwargs)
+    out['num_trades'] = int(num_trades)
+    return out
+
 
 class Backtester:
     def __init__(self, params: Dict[str, Any], strategy: BaseStrategy, risk: RiskManager):
@@ -15,11 +22,36 @@ class Backtester:
         self.risk = risk
         self.fee_pct = float(params.get('fee_pct', 0.0005))
         self.slippage_pct = float(params.get('slippage_pct', 0.0002))
+        self.engine = params.get('engine', 'loop')  # 'loop' or 'vectorized'
+        # Trade log / equity curve / chart are opt-in, see bot/artifacts.py
+        self.artifact_options = params.get('artifacts') or {}
+        self.write_artifacts = bool(params.get('write_artifacts', self.artifact_options.get('enabled', False)))
+        # Let the broker fill the sl/tp attached to each entry from the bar's high/low
+        self.intrabar_stops = bool(params.get('intrabar_stops', True))
+        # Annualization; inferred from the candle timestamps when not given
+        self.timeframe = params.get('timeframe')
 
     def run(self, candles: pd.DataFrame):
         df = candles.copy().reset_index(drop=True)
         signals = self.strategy.generate_signals(df)
+        return self.run_signals(df, signals)
+
+    def run_signals(self, candles: pd.DataFrame, signals):
+        """Backtest with signals computed elsewhere (e.g. once on a longer history and sliced)."""
+        df = candles.reset_index(drop=True)
+        signals = pd.Series(np.asarray(signals), index=df.index)
         equity = self.params.get('starting_equity', 10000.0)
+
+        if self.engine == 'vectorized':
+            trades, equity_curve = self._run_vectorized(df, signals, equity)
+        elif self.engine == 'loop':
+            trades, equity_curve = self._run_loop(df, signals, equity)
+        else:
+            raise ValueError(f"Unknown backtest engine: {self.engine}")
+
+        return self._report(trades, equity_curve, equity, df['timestamp'].to_numpy())
+
+    def _run_loop(self, df: pd.DataFrame, signals: pd.Series, equity: float):
         broker = PaperBroker(starting_equity=equity, fee_pct=self.fee_pct)
 
         position = 0.0
@@ -27,6 +59,12 @@ class Backtester:
         equity_curve = []
 
         for i in range(len(df)):
+            if self.intrabar_stops and position > 0.0:
+                for fill in broker.process_bar(float(df.loc[i, 'high']), float(df.loc[i, 'low']),
+                                               float(df.loc[i, 'open']), ts=df.loc[i, 'timestamp']):
+                    trades.append({'ts': fill['ts'], 'side': fill['side'], 'price': fill['price'], 'size': fill['size']})
+                position = broker.position()
+
             price = float(df.loc[i, 'close'])
             signal = int(signals.iloc[i])
             # Apply simple slippage
@@ -47,41 +85,120 @@ class Backtester:
             mark_value = broker.equity + position * price
             equity_curve.append(mark_value)
 
-        # Metrics
+        return pd.DataFrame(trades, columns=['ts', 'side', 'price', 'size']), equity_curve
+
+    def _run_vectorized(self, df: pd.DataFrame, signals: pd.Series, equity: float):
+        """
+        Same long-only entry/exit rules (and PaperBroker stop/target fills) as
+        the loop, computed on NumPy arrays. Python only steps from trade to
+        trade, to size each entry from the cash left after the previous one;
+        the bars in between are handled with searchsorted and array slices.
+        """
+        state = {'cash': float(equity), 'size': 0.0, 'sl': -np.inf, 'tp': np.inf}
+        trades, equity_curve, _ = self.vectorized_step(df, signals.to_numpy(), state)
+        return trades, equity_curve
+
+    def vectorized_step(self, df: pd.DataFrame, signals, state: Dict[str, float]):
+        """
+        Vectorized engine over one block of bars, starting from `state`
+        (cash, open position size and its sl/tp). Returns the block's trades,
+        its equity curve and the state to continue from, so consecutive blocks
+        give exactly the same result as one run over their concatenation.
+        """
+        close = df['close'].to_numpy(dtype=np.float64)
+        ts = df['timestamp'].to_numpy()
+        sig = np.nan_to_num(np.asarray(signals, dtype=np.float64)).astype(np.int8)
+        n = len(close)
+        buys = np.flatnonzero(sig == 1)
+        sells = np.flatnonzero(sig == -1)
+        if self.intrabar_stops:
+            open_ = df['open'].to_numpy(dtype=np.float64)
+            high = df['high'].to_numpy(dtype=np.float64)
+            low = df['low'].to_numpy(dtype=np.float64)
+
+        idx, is_buy, prices, sizes = [], [], [], []
+        cash = state['cash']
+        size = start_size = state['size']
+        sl, tp = state['sl'], state['tp']
+        t = 0
+        while True:
+            if size <= 0:
+                k = np.searchsorted(buys, t)
+                if k == len(buys):
+                    break
+                entry = int(buys[k])
+                p_in = close[entry] * (1 + self.slippage_pct)
+                size = self.risk.position_size(cash, p_in)
+                cash -= p_in * size * (1 + self.fee_pct)
+                idx.append(entry); is_buy.append(True); prices.append(p_in); sizes.append(size)
+                if size <= 0:
+                    t = entry + 1
+                    continue
+                sl, tp = self.risk.stops(p_in)
+                t = entry + 1
+            # else: position carried in from the previous block, manage it from bar 0
+
+            j = np.searchsorted(sells, t)
+            exit_sig = int(sells[j]) if j < len(sells) else n
+
+            exit_at = None
+            if self.intrabar_stops:
+                # Stops are checked from the bar after entry up to and including the sell bar
+                stop_end = min(exit_sig, n - 1) + 1
+                hit = (low[t:stop_end] <= sl) | (high[t:stop_end] >= tp)
+                if hit.any():
+                    exit_at = t + int(np.argmax(hit))
+                    # Stop wins when both levels are in range; gaps fill at the open
+                    p_out = min(open_[exit_at], sl) if low[exit_at] <= sl else max(open_[exit_at], tp)
+                    next_t = exit_at  # a buy signal on the stop bar re-enters at its close
+            if exit_at is None:
+                if exit_sig == n:
+                    break  # still holding at the end of the block
+                exit_at = exit_sig
+                p_out = close[exit_at] * (1 + self.slippage_pct)
+                next_t = exit_at + 1
+
+            cash += p_out * size * (1 - self.fee_pct)
+            idx.append(exit_at); is_buy.append(False); prices.append(p_out); sizes.append(size)
+            size = 0.0
+            t = next_t
+
+        idx = np.asarray(idx, dtype=np.int64)
+        is_buy = np.asarray(is_buy, dtype=bool)
+        prices = np.asarray(prices, dtype=np.float64)
+        sizes = np.asarray(sizes, dtype=np.float64)
+        cash_delta = np.where(is_buy, -prices * sizes * (1 + self.fee_pct), prices * sizes * (1 - self.fee_pct))
+
+        # A stop exit and a re-entry can share a bar, hence add.at rather than assignment
+        cash_curve = np.zeros(n)
+        pos_curve = np.zeros(n)
+        np.add.at(cash_curve, idx, cash_delta)
+        np.add.at(pos_curve, idx, np.where(is_buy, sizes, -sizes))
+        equity_curve = state['cash'] + np.cumsum(cash_curve) + (start_size + np.cumsum(pos_curve)) * close
+
+        trades = pd.DataFrame({
+            'ts': ts[idx],
+            'side': np.where(is_buy, 'buy', 'sell'),
+            'price': prices,
+            'size': sizes,
+        })
+        new_state = {'cash': cash, 'size': max(size, 0.0), 'sl': sl, 'tp': tp}
+        return trades, equity_curve, new_state
+
+    def _report(self, trades_df: pd.DataFrame, equity_curve, equity: float, timestamps: np.ndarray):
         ec = np.array(equity_curve)
-        returns = np.diff(ec) / ec[:-1] if len(ec) > 1 else np.array([])
-        total_return = (ec[-1] / ec[0]) - 1 if len(ec) > 1 else 0.0
-        sharpe = (returns.mean() / (returns.std() + 1e-12)) * np.sqrt(252*24*60) if len(returns) > 2 else 0.0
-        max_dd = 0.0
-        peak = -1e18
-        for v in ec:
-            if v > peak: peak = v
-            dd = (peak - v)/peak if peak > 0 else 0.0
-            if dd > max_dd: max_dd = dd
-
-        # Save artifacts
-        ensure_dir("artifacts")
-        trades_df = pd.DataFrame(trades)
-        trades_df.to_csv("artifacts/backtest_trades.csv", index=False)
-
-        plt.figure()
-        plt.plot(ec)
-        plt.title("Equity Curve")
-        plt.xlabel("Step")
-        plt.ylabel("Equity")
-        plt.savefig("artifacts/equity_curve.png", dpi=160, bbox_inches='tight')
-        plt.close()
+        timeframe = self.timeframe or infer_timeframe_ms(timestamps)
+        metrics = equity_metrics(ec, equity, len(trades_df), timeframe, trades=trades_df,
+                                 positions=positions_from_trades(trades_df, timestamps), fee_pct=self.fee_pct)
+
+        files, pending = {}, None
+        if self.write_artifacts:
+            files, pending = ArtifactWriter(self.artifact_options).save(trades_df, ec, metrics)
 
         return {
-            'metrics': {
-                'final_equity': float(ec[-1]) if len(ec) else equity,
-                'total_return_pct': float(total_return*100),
-                'sharpe_like': float(sharpe),
-                'max_drawdown_pct': float(max_dd*100),
-                'num_trades': int(len(trades_df))
-            },
-            'files': {
-                'trades_csv': "artifacts/backtest_trades.csv",
-                'equity_curve_png': "artifacts/equity_curve.png"
-            }
+            'metrics': metrics,
+            'equity_curve': ec,
+            'trades': trades_df,
+            'files': files,
+            'artifacts': pending
         }
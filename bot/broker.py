@@ -0,0 +1,305 @@
+# bot/broker.py
+from typing import Dict, Any, List, Optional
+import numpy as np
+from .orders import BrokerBase, OrderRequest, OrderResult, Fill, Balance
+
+BUY, SELL = 1, -1
+LIMIT, STOP = 0, 1
+
+
+class PaperBroker:
+    """
+    Simulated exchange used by both the backtester and paper trading.
+
+    `equity` is the cash balance; open positions are marked separately
+    (equity + position * price), matching how Backtester tracks its curve.
+
+    Resting orders live in flat NumPy arrays (one slot per order) so that
+    process_bar() checks every resting order against a bar's high/low in one
+    vectorized step. Only orders that actually trigger are walked in Python.
+
+    - market(): fills immediately at `price` adjusted by slippage_pct
+    - limit():  buy fills when low <= price, sell when high >= price
+    - tp/sl on market(): a reduce-only sell limit (tp) and sell stop (sl),
+      one-cancels-other, cancelled as soon as the position is flat
+    Fill prices respect gaps: a level already crossed at the open fills at the open.
+    When a stop and a take-profit trigger in the same bar, the stop wins.
+    """
+    def __init__(self, starting_equity: float = 10000.0, fee_pct: float = 0.0, slippage_pct: float = 0.0,
+                 capacity: int = 64):
+        self.equity = float(starting_equity)
+        self.fee_pct = float(fee_pct)
+        self.slippage_pct = float(slippage_pct)
+
+        self._symbols: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._positions = np.zeros(8)
+
+        self._n = 0
+        self._next_id = 0
+        self._id = np.zeros(capacity, dtype=np.int64)
+        self._side = np.zeros(capacity, dtype=np.int8)
+        self._kind = np.zeros(capacity, dtype=np.int8)
+        self._price = np.zeros(capacity)
+        self._size = np.zeros(capacity)
+        self._sym = np.zeros(capacity, dtype=np.int32)
+        self._oco = np.full(capacity, -1, dtype=np.int64)
+        self._reduce_only = np.zeros(capacity, dtype=bool)
+        self._active = np.zeros(capacity, dtype=bool)
+        self.fills: List[Dict[str, Any]] = []
+
+    # --- positions ---
+
+    def _sym_id(self, symbol: str) -> int:
+        sid = self._symbols.get(symbol)
+        if sid is None:
+            sid = self._symbols[symbol] = len(self._symbols)
+            self._names.append(symbol)
+            if sid >= len(self._positions):
+                self._positions = np.concatenate([self._positions, np.zeros(len(self._positions))])
+        return sid
+
+    def position(self, symbol: str = "default") -> float:
+        sid = self._symbols.get(symbol)
+        return float(self._positions[sid]) if sid is not None else 0.0
+
+    def mark_to_market(self, prices: Dict[str, float]) -> float:
+        return self.equity + sum(self.position(sym) * float(p) for sym, p in prices.items())
+
+    def restore(self, cash: float, positions: Dict[str, float], exits: Optional[Dict[str, tuple]] = None):
+        """
+        Resume from saved state (bot/state_store.py). Resting orders are not
+        saved; `exits` {symbol: (tp, sl)} re-places protective ones.
+        """
+        self.equity = float(cash)
+        for sym, size in positions.items():
+            self._positions[self._sym_id(sym)] = float(size)
+        for sym, (tp, sl) in (exits or {}).items():
+            if self.position(sym) > 0:
+                self._attach_exits(sym, self.position(sym), tp, sl)
+
+    # --- order entry ---
+
+    def market(self, side: str, price: float, size: float, tp: Optional[float] = None, sl: Optional[float] = None,
+               symbol: str = "default", ts=None) -> Optional[Dict[str, Any]]:
+        direction = BUY if side == "buy" else SELL
+        fill_price = price * (1 + direction * self.slippage_pct)
+        fill = self._fill(self._sym_id(symbol), direction, fill_price, size, "market", ts)
+        # Exits cover the size actually filled; no fill, no resting exits
+        if fill is not None and direction == BUY and (tp is not None or sl is not None):
+            self._attach_exits(symbol, fill['size'], tp, sl)
+        return fill
+
+    def limit(self, side: str, price: float, size: float, symbol: str = "default", reduce_only: bool = False) -> int:
+        return self._add_order(self._sym_id(symbol), BUY if side == "buy" else SELL, LIMIT, price, size,
+                               reduce_only=reduce_only)
+
+    def stop(self, side: str, price: float, size: float, symbol: str = "default", reduce_only: bool = True) -> int:
+        return self._add_order(self._sym_id(symbol), BUY if side == "buy" else SELL, STOP, price, size,
+                               reduce_only=reduce_only)
+
+    def cancel(self, order_id: int):
+        self._active[:self._n] &= self._id[:self._n] != order_id
+
+    def cancel_all(self, symbol: Optional[str] = None):
+        if symbol is None:
+            self._active[:self._n] = False
+        elif symbol in self._symbols:
+            self._active[:self._n] &= self._sym[:self._n] != self._symbols[symbol]
+
+    def open_orders(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        ids = np.flatnonzero(self._active[:self._n])
+        if symbol is not None:
+            ids = ids[self._sym[ids] == self._symbols.get(symbol, -1)]
+        return [{'id': int(self._id[i]), 'symbol': self._names[self._sym[i]], 'side': 'buy' if self._side[i] == BUY else 'sell',
+                 'type': 'limit' if self._kind[i] == LIMIT else 'stop', 'price': float(self._price[i]),
+                 'size': float(self._size[i])} for i in ids]
+
+    def _attach_exits(self, symbol: str, size: float, tp: Optional[float], sl: Optional[float]):
+        sid = self._sym_id(symbol)
+        group = self._next_id
+        if sl is not None:
+            self._add_order(sid, SELL, STOP, sl, size, reduce_only=True, oco=group)
+        if tp is not None:
+            self._add_order(sid, SELL, LIMIT, tp, size, reduce_only=True, oco=group)
+
+    def _add_order(self, sid: int, direction: int, kind: int, price: float, size: float,
+                   reduce_only: bool = False, oco: int = -1) -> int:
+        if self._n == len(self._side):
+            self._compact()
+        i = self._n
+        self._id[i] = self._next_id
+        self._next_id += 1
+        self._side[i] = direction
+        self._kind[i] = kind
+        self._price[i] = price
+        self._size[i] = size
+        self._sym[i] = sid
+        self._oco[i] = oco
+        self._reduce_only[i] = reduce_only
+        self._active[i] = True
+        self._n += 1
+        return int(self._id[i])
+
+    _FIELDS = ('_id', '_side', '_kind', '_price', '_size', '_sym', '_oco', '_reduce_only', '_active')
+
+    def _compact(self):
+        # Drop filled/cancelled slots; only grow when the live orders really fill the arrays
+        keep = np.flatnonzero(self._active[:self._n])
+        capacity = len(self._side) * 2 if len(keep) > len(self._side) // 2 else len(self._side)
+        for name in self._FIELDS:
+            arr = getattr(self, name)
+            new = np.full(capacity, -1 if name == '_oco' else 0, dtype=arr.dtype)
+            new[:len(keep)] = arr[keep]
+            setattr(self, name, new)
+        self._n = len(keep)
+
+    # --- matching ---
+
+    def process_bar(self, high: float, low: float, open_: Optional[float] = None, symbol: str = "default",
+                    ts=None) -> List[Dict[str, Any]]:
+        """Fill every resting order of `symbol` that this bar's range reaches. Returns the fills."""
+        sid = self._symbols.get(symbol)
+        if sid is None or self._n == 0:
+            return []
+        n = self._n
+        active = self._active[:n] & (self._sym[:n] == sid)
+        if not active.any():
+            return []
+        side, kind, price = self._side[:n], self._kind[:n], self._price[:n]
+        open_ = price if open_ is None else np.full(n, float(open_))
+
+        # Limits fill on a touch in their favour, stops on a touch against the position
+        buy_hit = low <= price
+        sell_hit = high >= price
+        limit_hit = np.where(side == BUY, buy_hit, sell_hit) & (kind == LIMIT)
+        stop_hit = np.where(side == BUY, sell_hit, buy_hit) & (kind == STOP)
+        triggered = np.flatnonzero(active & (limit_hit | stop_hit))
+        if not len(triggered):
+            return []
+
+        # Gap-through: buy limits / sell stops fill at min(open, level), sell limits / buy stops at max
+        better_low = (side == BUY) == (kind == LIMIT)
+        fill_px = np.where(better_low, np.minimum(open_, price), np.maximum(open_, price))
+
+        # Stops first (worst case when a stop and a target share a bar), then by order id
+        order = triggered[np.lexsort((triggered, kind[triggered] != STOP))]
+        fills = []
+        for i in order:
+            if not self._active[i]:
+                continue  # cancelled by an earlier fill in this bar (OCO / flat)
+            # Stops become market orders and slip; limits fill at their price
+            px = fill_px[i] * (1 + side[i] * self.slippage_pct) if kind[i] == STOP else fill_px[i]
+            fill = self._fill(sid, int(side[i]), float(px), float(self._size[i]),
+                              'stop' if kind[i] == STOP else 'limit', ts, reduce_only=bool(self._reduce_only[i]))
+            self._active[i] = False
+            if self._oco[i] >= 0:
+                self._active[:n] &= self._oco[:n] != self._oco[i]
+            if fill is not None:
+                fills.append(fill)
+        return fills
+
+    def _fill(self, sid: int, direction: int, price: float, size: float, kind: str, ts=None,
+              reduce_only: bool = False) -> Optional[Dict[str, Any]]:
+        if reduce_only:
+            # Never let a protective order flip the position
+            held = self._positions[sid]
+            size = min(size, held) if direction == SELL else min(size, -held)
+        if size <= 0:
+            return None
+
+        notional = price * size
+        fee = notional * self.fee_pct
+        self.equity -= direction * notional + fee
+        self._positions[sid] += direction * size
+        if abs(self._positions[sid]) < 1e-12:
+            self._positions[sid] = 0.0
+            # Flat: protective orders for this symbol no longer have anything to protect
+            n = self._n
+            self._active[:n] &= ~((self._sym[:n] == sid) & self._reduce_only[:n])
+
+        fill = {'ts': ts, 'symbol': self._names[sid], 'side': 'buy' if direction == BUY else 'sell',
+                'price': price, 'size': size, 'fee': fee, 'type': kind}
+        self.fills.append(fill)
+        return fill
+
+
+class Broker(BrokerBase):
+    """
+    Paper trading broker for run_paper_trading.py / TradingLoop: a PaperBroker
+    driven by live candles, plus the ccxt exchange (if any) used for market data.
+    Market orders through submit() need `price` (the price to fill at).
+    """
+    batch_workers = 1  # PaperBroker is in-memory and not thread-safe
+    def __init__(self, cfg: Dict[str, Any]):
+        paper = cfg.get("paper", {})
+        self.cfg = cfg
+        self.paper = PaperBroker(
+            starting_equity=paper.get("starting_equity", 10000.0),
+            fee_pct=paper.get("fee_pct", 0.0),
+            slippage_pct=paper.get("slippage_pct", 0.0),
+        )
+        self.exchange = None
+        if (cfg.get("exchange") or {}).get("name"):
+            from .data import LiveDataSource
+            source = LiveDataSource(cfg)
+            self.exchange, self.markets = source.exchange, source.markets
+
+    def fetch_balance(self) -> Dict[str, Any]:
+        return {
+            "cash": self.paper.equity,
+            "positions": {sym: self.paper.position(sym) for sym in self.paper._symbols},
+        }
+
+    # --- common broker interface (bot/orders.py) ---
+
+    def submit(self, order: OrderRequest) -> OrderResult:
+        if order.price is None:
+            raise ValueError("paper orders need a price")
+        amount = order.amount if order.quote_amount is None else order.quote_amount / order.price
+        if order.type == "limit":
+            oid = self.paper.limit(order.side, order.price, amount, symbol=order.symbol)
+            return OrderResult(ok=True, order_id=str(oid), client_id=order.client_id, symbol=order.symbol,
+                               side=order.side, status="new", amount=amount)
+        fill = self.paper.market(order.side, order.price, amount, symbol=order.symbol)
+        if fill is None:
+            return OrderResult(ok=False, client_id=order.client_id, symbol=order.symbol, side=order.side,
+                               status="rejected", amount=amount, error="zero size")
+        return OrderResult(ok=True, raw=fill, client_id=order.client_id, symbol=order.symbol, side=order.side,
+                           status="filled", amount=amount, filled=fill['size'], avg_price=fill['price'],
+                           fills=[Fill(order.symbol, order.side, fill['size'], fill['price'], fill['fee'], fill['ts'])])
+
+    def cancel(self, order_id: str, symbol: Optional[str] = None) -> OrderResult:
+        self.paper.cancel(int(order_id))
+        return OrderResult(ok=True, order_id=order_id, symbol=symbol, status="canceled")
+
+    def balances(self) -> Dict[str, Balance]:
+        out = {"cash": Balance("cash", self.paper.equity)}
+        for sym in self.paper._symbols:
+            out[sym] = Balance(sym, self.paper.position(sym))
+        return out
+
+
+# Broker adapters by name, as "module:Class" so an adapter's SDK is only
+# imported when that broker is actually requested.
+BROKERS: Dict[str, str] = {
+    "paper": "bot.broker:Broker",
+    "bitvavo": "bot.broker_bitvavo:BitvavoBroker",
+    "coinbase": "bot.broker_coinbase:CoinbaseBroker",
+    "pepperstone_mt5": "bot.broker_pepperstone_mt5:PepperstoneMT5Broker",
+}
+
+
+def register_broker(name: str, target: str):
+    """Add or override an adapter, e.g. register_broker("kraken", "mypkg.kraken:KrakenBroker")."""
+    BROKERS[name] = target
+
+
+def get_broker(name: str):
+    """Resolve a broker class by name, importing its module on demand."""
+    target = BROKERS.get(name)
+    if target is None:
+        raise ValueError(f"Unknown broker: {name}")
+    import importlib
+    module, _, cls = target.partition(":")
+    return getattr(importlib.import_module(module), cls)
@@ -1,18 +1,48 @@
 # bot/broker_bitvavo.py
 import logging
+import os
+from dataclasses import replace
+from typing import Dict, Optional
 from integrations.bitvavo.adapter import BitvavoAdapter
+from .orders import BrokerBase, OrderRequest, OrderResult, Fill, Balance, rejected
+from .markets import market_cache, from_bitvavo
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 
+# Bitvavo order status -> normalized status
+_STATUS = {
+    "new": "new", "awaitingTrigger": "new", "partiallyFilled": "partially_filled",
+    "filled": "filled", "canceled": "canceled", "cancelled": "canceled", "expired": "canceled",
+    "rejected": "rejected", "dry_run": "dry_run",
+}
 
-class BitvavoBroker:
-    def __init__(self, api_key: str, api_secret: str, dry_run: bool = True, default_market: str = "BTC-EUR", order_size_eur: float = 5.0):
+
+def _error(raw) -> Optional[str]:
+    """Error text for an error payload ({"errorCode": .., "error": ..}) or a non-object reply, else None."""
+    if not isinstance(raw, dict):
+        return f"unexpected response: {raw!r}"
+    if "errorCode" in raw:
+        return f"{raw['errorCode']}: {raw.get('error', '')}"
+    return None
+
+
+class BitvavoBroker(BrokerBase):
+    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None, dry_run: bool = True,
+                 default_market: str = "BTC-EUR", order_size_eur: float = 5.0):
+        # Credentials default to the environment (BITVAVO_API_KEY / BITVAVO_API_SECRET)
+        api_key = api_key if api_key is not None else os.getenv("BITVAVO_API_KEY", "")
+        api_secret = api_secret if api_secret is not None else os.getenv("BITVAVO_API_SECRET", "")
         self.adapter = BitvavoAdapter(api_key=api_key, api_secret=api_secret, dry_run=dry_run, default_market=default_market, order_size_eur=order_size_eur)
         self.default_market = default_market
         self.order_size_eur = order_size_eur
         self.dry_run = dry_run
+        self.markets = market_cache("bitvavo", self.adapter.get_markets, from_bitvavo)
         logging.info(f"BitvavoBroker initialized: market={self.default_market} dry_run={self.dry_run}")
 
+    def start_stream(self, intervals=("1m",), buffer_size=200, ws_url=None):
+        return self.adapter.start_stream(markets=[self.default_market], intervals=intervals, buffer_size=buffer_size,
+                                         ws_url=ws_url)
+
     def recent_candles(self, limit=200, interval="1m"):
         return self.adapter.recent_candles(interval=interval, limit=limit)
 
@@ -26,8 +56,61 @@ class BitvavoBroker:
         return self.adapter.get_open_orders()
 
     def buy(self, amount):
-        return self.adapter.create_order(market=self.default_market, side="buy", order_type="market", amount=amount)
+        return self.adapter.create_order(market=self.default_market, side="buy", order_type="market",
+                                         amount=self._lot(amount))
 
     def sell(self, amount):
-        return self.adapter.create_order(market=self.default_market, side="sell", order_type="market", amount=amount)
+        return self.adapter.create_order(market=self.default_market, side="sell", order_type="market",
+                                         amount=self._lot(amount))
+
+    def _lot(self, amount):
+        info = self.market_info(self.default_market)
+        return info.round_amount(amount) if info else amount
+
+    # --- common broker interface (bot/orders.py) ---
+    # Bitvavo has no batch order endpoint; submit_many() runs these
+    # concurrently over the pooled HTTP session.
+
+    def submit(self, order: OrderRequest) -> OrderResult:
+        order = self.round_order(replace(order, symbol=order.symbol or self.default_market))
+        if order.quote_amount is None and order.amount <= 0:
+            return rejected(order, "amount below the market minimum")
+        # a market order's price is only a paper reference: Bitvavo rejects one on the request
+        raw = self.adapter.create_order(
+            market=order.symbol, side=order.side, order_type=order.type,
+            amount=order.amount, price=order.price if order.type == "limit" else None,
+            amount_quote=order.quote_amount, client_order_id=order.client_id,
+        )
+        return self._result(raw, order)
+
+    def cancel(self, order_id: str, symbol: Optional[str] = None) -> OrderResult:
+        raw = self.adapter.cancel_order(order_id, market=symbol or self.default_market)
+        error = _error(raw)
+        return OrderResult(ok=error is None, raw=raw, order_id=order_id, symbol=symbol or self.default_market,
+                           status="rejected" if error else "dry_run" if self.dry_run else "canceled", error=error)
+
+    def balances(self) -> Dict[str, Balance]:
+        raw = self.adapter.get_balance()
+        if isinstance(raw, dict):  # dry run: {asset: {available, inOrder}}
+            rows = [{"symbol": k, **v} for k, v in raw.items()]
+        else:
+            rows = raw
+        return {r["symbol"]: Balance(r["symbol"], float(r.get("available", 0)), float(r.get("inOrder", 0)))
+                for r in rows}
 
+    def _result(self, raw, order: OrderRequest) -> OrderResult:
+        error = _error(raw)
+        if error is not None:
+            return replace(rejected(order, error), raw=raw)
+        fills = [Fill(symbol=order.symbol, side=order.side, amount=float(f["amount"]), price=float(f["price"]),
+                      fee=float(f.get("fee", 0) or 0), ts=f.get("timestamp"), order_id=raw.get("orderId"))
+                 for f in raw.get("fills", [])]
+        filled = float(raw.get("filledAmount", sum(f.amount for f in fills)) or 0)
+        quote = float(raw.get("filledAmountQuote", 0) or 0) or sum(f.amount * f.price for f in fills)
+        status = _STATUS.get(raw.get("status"), "unknown")
+        return OrderResult(
+            ok=status not in ("rejected", "canceled"),
+            raw=raw, order_id=raw.get("orderId"), client_id=raw.get("clientOrderId", order.client_id),
+            symbol=order.symbol, side=order.side, status=status, amount=order.amount, filled=filled,
+            avg_price=quote / filled if filled else None, fills=fills, error=raw.get("error"),
+        )
@@ -1,20 +1,145 @@
-from dataclasses import dataclass
-from typing import Any, Dict
-import os
-from dotenv import load_dotenv
-from coinbase.rest import RESTClient
+from typing import Any, Dict, List, Optional
+from dataclasses import replace
+import os, time
+from .orders import BrokerBase, OrderRequest, OrderResult, Fill, Balance, field_of, rejected
+from .markets import market_cache, from_coinbase, format_decimal
+from .utils import timeframe_to_ms
 
-load_dotenv()  # make sure environment variables are loaded
+GRANULARITY_MAP = {
+    "1m": "ONE_MINUTE",
+    "3m": "THREE_MINUTE",
+    "5m": "FIVE_MINUTE",
+    "15m": "FIFTEEN_MINUTE",
+    "30m": "THIRTY_MINUTE",
+    "1h": "ONE_HOUR",
+    "2h": "TWO_HOUR",
+    "4h": "FOUR_HOUR",
+    "6h": "SIX_HOUR",
+    "1d": "ONE_DAY",
+}
 
+# Coinbase order status -> normalized status; the first four are final
+_STATUS = {
+    "FILLED": "filled", "CANCELLED": "canceled", "EXPIRED": "canceled", "FAILED": "rejected",
+    "OPEN": "new", "PENDING": "new", "QUEUED": "new", "CANCEL_QUEUED": "new",
+}
+_FINAL = ("FILLED", "CANCELLED", "EXPIRED", "FAILED")
 
-@dataclass
-class OrderResult:
-    ok: bool
-    raw: Any
 
+def candles_from_response(resp) -> List[Dict[str, Any]]:
+    """get_candles() response -> dicts oldest first; "start" is the open time in epoch seconds."""
+    candles = []
+    for c in field_of(resp, "candles", []) or []:
+        candles.append({
+            "start": field_of(c, "start"),
+            "end": field_of(c, "end"),
+            "low": float(field_of(c, "low")),
+            "high": float(field_of(c, "high")),
+            "open": float(field_of(c, "open")),
+            "close": float(field_of(c, "close")),
+            "volume": float(field_of(c, "volume")),
+        })
+    candles.sort(key=lambda x: int(x["start"]))
+    return candles
 
-class CoinbaseBroker:
+
+class CoinbaseOrders(BrokerBase):
+    """
+    Common broker interface on top of a coinbase.rest.RESTClient (`self.client`).
+    Shared by CoinbaseBroker and coinbase_advanced.CoinbaseAdvanced.
+    Cancels use the native batch endpoint; Coinbase has none for placing orders.
+    Sizes and limit prices are rounded to the product's increments.
+    """
+    client: Any = None
+    retail_portfolio_id: Optional[str] = None
+
+    def _init_markets(self):
+        self.markets = market_cache("coinbase", self._fetch_products, from_coinbase)
+
+    def _fetch_products(self) -> List[Dict[str, Any]]:
+        products = field_of(self.client.get_products(), "products", []) or []
+        return [p.to_dict() if hasattr(p, "to_dict") else dict(p) for p in products]
+
+    def submit(self, order: OrderRequest) -> OrderResult:
+        order = self.round_order(order)
+        if order.quote_amount is None and order.amount <= 0:
+            return rejected(order, "amount below the market minimum")
+        info = self.market_info(order.symbol)
+        base_size = format_decimal(order.amount, info.amount_precision if info else None)
+        if order.type == "limit":
+            limit_price = format_decimal(order.price, info.price_precision if info else None)
+            config = {"limit_limit_gtc": {"base_size": base_size, "limit_price": limit_price}}
+        elif order.quote_amount is not None:
+            config = {"market_market_ioc": {"quote_size": format_decimal(order.quote_amount)}}
+        else:
+            config = {"market_market_ioc": {"base_size": base_size}}
+        kwargs = {"retail_portfolio_id": self.retail_portfolio_id} if self.retail_portfolio_id else {}
+        raw = self.client.create_order(client_order_id=order.client_id, product_id=order.symbol,
+                                       side=order.side.upper(), order_configuration=config, **kwargs)
+        ok = bool(field_of(raw, "success", False))
+        success, error = field_of(raw, "success_response"), field_of(raw, "error_response")
+        return OrderResult(
+            ok=ok, raw=raw, order_id=field_of(success, "order_id"), client_id=order.client_id,
+            symbol=order.symbol, side=order.side, status="new" if ok else "rejected", amount=order.amount,
+            error=None if ok else str(field_of(error, "message") or field_of(raw, "failure_reason") or error),
+        )
+
+    def settle(self, result: OrderResult, timeout: float = 5.0, poll: float = 0.25) -> OrderResult:
+        """
+        `result` completed with what Coinbase actually filled (size, average
+        price, fees): create_order answers before a market order fills, so
+        get_order is polled until the order is final or `timeout` passes.
+        """
+        if not result.ok or not result.order_id:
+            return result
+        deadline = time.monotonic() + timeout
+        while True:
+            order = field_of(self.client.get_order(result.order_id), "order")
+            status = field_of(order, "status")
+            if status in _FINAL or time.monotonic() >= deadline:
+                break
+            time.sleep(poll)
+        filled = float(field_of(order, "filled_size", 0) or 0)
+        price = float(field_of(order, "average_filled_price", 0) or 0)
+        fee = float(field_of(order, "total_fees", 0) or 0)
+        status = _STATUS.get(status, result.status)
+        if filled and status == "new":
+            status = "partially_filled"
+        return replace(result, raw=order, status=status, ok=status not in ("rejected", "canceled") or filled > 0,
+                       filled=filled, avg_price=price if filled else None,
+                       fills=[Fill(result.symbol, result.side, filled, price, fee=fee, order_id=result.order_id)]
+                       if filled else [])
+
+    def cancel(self, order_id: str, symbol: Optional[str] = None) -> OrderResult:
+        return self.cancel_many([order_id], symbol)[0]
+
+    def cancel_many(self, order_ids: List[str], symbol: Optional[str] = None) -> List[OrderResult]:
+        raw = self.client.cancel_orders(order_ids=list(order_ids))
+        results = {field_of(r, "order_id"): r for r in field_of(raw, "results", []) or []}
+        out = []
+        for oid in order_ids:
+            r = results.get(oid)
+            ok = bool(field_of(r, "success", False))
+            out.append(OrderResult(ok=ok, raw=r, order_id=oid, symbol=symbol, status="canceled" if ok else "rejected",
+                                   error=None if ok else str(field_of(r, "failure_reason", "no result"))))
+        return out
+
+    def balances(self) -> Dict[str, Balance]:
+        out = {}
+        for acct in field_of(self.client.get_accounts(), "accounts", []) or []:
+            asset = field_of(acct, "currency")
+            out[asset] = Balance(asset, float(field_of(field_of(acct, "available_balance"), "value", 0) or 0),
+                                 float(field_of(field_of(acct, "hold"), "value", 0) or 0))
+        return out
+
+
+class CoinbaseBroker(CoinbaseOrders):
     def __init__(self, cfg: Dict[str, Any]):
+        # SDK and .env are loaded here, not at import, so importing this module stays cheap
+        from dotenv import load_dotenv
+        from coinbase.rest import RESTClient
+        load_dotenv()  # make sure environment variables are loaded
+
         # Read from .env / config.yaml
         api_key_env = cfg["coinbase"]["api_key_env"]
         api_secret_file_env = cfg["coinbase"]["api_secret_file_env"]
@@ -33,41 +158,29 @@ class CoinbaseBroker:
             api_secret=api_secret,
             base_url=cfg["coinbase"]["base_url"]
         )
+        self._init_markets()
 
         # Market settings
         self.product_id = cfg.get("market", {}).get("symbol", os.getenv("PRODUCT_ID", "BTC-USD"))
         self.timeframe = cfg.get("market", {}).get("timeframe", os.getenv("TIMEFRAME", "1h"))
 
-    def recent_candles(self, limit: int = 300):
-        return self.client.get_candles(
+    def recent_candles(self, limit: int = 300) -> List[Dict[str, Any]]:
+        """Last `limit` candles oldest first, the forming one included (see candles_from_response)."""
+        end = int(time.time())
+        start = end - timeframe_to_ms(self.timeframe) // 1000 * limit
+        return candles_from_response(self.client.get_candles(
             product_id=self.product_id,
-            granularity=self.timeframe,
+            start=str(start),
+            end=str(end),
+            granularity=GRANULARITY_MAP[self.timeframe],
             limit=limit
-        )
+        ))
 
     def buy(self, quote_usd: float):
-        resp = self.client.create_order(
-            product_id=self.product_id,
-            side="BUY",
-            order_configuration={
-                "market_market_ioc": {
-                    "quote_size": str(quote_usd)
-                }
-            }
-        )
-        return OrderResult(ok=True, raw=resp)
+        return self.submit(OrderRequest(self.product_id, "buy", quote_amount=quote_usd))
 
     def sell(self, base_size: float):
-        resp = self.client.create_order(
-            product_id=self.product_id,
-            side="SELL",
-            order_configuration={
-                "market_market_ioc": {
-                    "base_size": str(base_size)
-                }
-            }
-        )
-        return OrderResult(ok=True, raw=resp)
+        return self.submit(OrderRequest(self.product_id, "sell", base_size))
 
     def accounts(self):
         return self.client.get_accounts()
@@ -1,22 +1,42 @@
-from dataclasses import dataclass
 from typing import Any, Dict, Optional
-import os, time, logging
-from dotenv import load_dotenv
-load_dotenv()
-try:
-    import MetaTrader5 as mt5
-except Exception as e:
-    mt5 = None
+import os, time, logging, math, threading
+from concurrent.futures import ThreadPoolExecutor
+from .orders import BrokerBase, OrderRequest, OrderResult, Fill, Balance, rejected
+from .markets import market_cache, from_mt5, mt5_symbol_rows
+
+# MetaTrader5 is Windows-only and slow to load: imported by _load_mt5() when a broker is created
+mt5 = None
+
+
+def _load_mt5():
+    global mt5
+    if mt5 is None:
+        try:
+            import MetaTrader5
+            mt5 = MetaTrader5
+        except Exception:
+            mt5 = None
+    return mt5
 
 logger = logging.getLogger(__name__)
 
-@dataclass
-class OrderResult:
-    ok: bool
-    raw: Any
+# ccxt-style timeframe -> MetaTrader5 constant name
+MT5_TIMEFRAMES = {
+    "1m": "TIMEFRAME_M1", "5m": "TIMEFRAME_M5", "15m": "TIMEFRAME_M15", "30m": "TIMEFRAME_M30",
+    "1h": "TIMEFRAME_H1", "4h": "TIMEFRAME_H4", "1d": "TIMEFRAME_D1",
+}
+
+# The MetaTrader5 package talks to the terminal over one IPC channel and is not
+# thread-safe: calls that can run on close_all() / submit_many() workers go through this lock
+_MT5_LOCK = threading.Lock()
 
-class PepperstoneMT5Broker:
+# Price moved between snapshot and execution: refresh the tick and resend
+REQUOTE_RETCODES = (10004, 10020, 10021)  # REQUOTE, PRICE_CHANGED, PRICE_OFF
+
+class PepperstoneMT5Broker(BrokerBase):
     def __init__(self, cfg: Dict[str, Any]):
+        from dotenv import load_dotenv
+        load_dotenv()
         self.cfg = cfg.get("pepperstone_mt5", cfg)
         self.login = int(os.getenv("MT5_LOGIN", str(self.cfg.get("login","0")) or "0"))
         self.password = os.getenv("MT5_PASSWORD", self.cfg.get("password",""))
@@ -24,9 +44,20 @@ class PepperstoneMT5Broker:
         self.terminal_path = os.getenv("MT5_TERMINAL_PATH", self.cfg.get("terminal_path", None))
         self.symbol = self.cfg.get("symbol", "BTCUSD")
         self.default_lot = float(self.cfg.get("lot", 0.01))
-        if mt5 is None:
+        self.timeframe = self.cfg.get("timeframe", "1h")
+        # close_all(): worker threads (terminal calls are serialized, see _MT5_LOCK) and requote retries
+        self.close_workers = int(self.cfg.get("close_workers", 1))
+        self.close_retries = int(self.cfg.get("close_retries", 3))
+        if _load_mt5() is None:
             raise RuntimeError("MetaTrader5 module not installed. pip install MetaTrader5")
         self._init_mt5()
+        # Lot min/step per symbol, read from the terminal once per session (specs differ per server)
+        self.markets = market_cache(f"mt5-{self.server or 'default'}", self._symbol_rows, from_mt5)
+
+    def _symbol_rows(self):
+        # first market_info() may come from a submit_many() worker
+        with _MT5_LOCK:
+            return mt5_symbol_rows(mt5)
 
     def _init_mt5(self):
         if self.terminal_path:
@@ -42,9 +73,10 @@ class PepperstoneMT5Broker:
                 # some MT5 setups don't require explicit login from python if terminal already logged in
                 pass
 
-    def recent_candles(self, limit:int=200, timeframe=mt5.TIMEFRAME_M60):
+    def recent_candles(self, limit:int=200, timeframe=None):
         # returns list of dicts with open/high/low/close/time
-        from datetime import datetime, timedelta
+        if timeframe is None:
+            timeframe = getattr(mt5, MT5_TIMEFRAMES[self.timeframe])
         rates = mt5.copy_rates_from_pos(self.symbol, timeframe, 0, limit)
         res=[]
         for r in rates:
@@ -52,7 +84,8 @@ class PepperstoneMT5Broker:
         return res
 
     def get_price(self):
-        tick = mt5.symbol_info_tick(self.symbol)
+        with _MT5_LOCK:
+            tick = mt5.symbol_info_tick(self.symbol)
         if not tick:
             raise RuntimeError("No tick for symbol "+self.symbol)
         return {"bid": tick.bid, "ask": tick.ask, "last": (tick.bid+tick.ask)/2}
@@ -67,14 +100,11 @@ class PepperstoneMT5Broker:
         # APPROXIMATION: assume 1 lot == 1 base unit (e.g., 1 BTC)
         price = self.get_price()["ask"]
         lots = usd_amount / price
-        # enforce minimal lot step
-        sym = mt5.symbol_info(self.symbol)
-        lot_min = sym.volume_min if sym else 0.01
-        lot_step = sym.volume_step if sym else 0.01
-        # round down to nearest step
-        import math
-        lots = max(lot_min, math.floor(lots/lot_step)*lot_step)
-        return round(lots, 8)
+        # round down to the lot step, but never below the minimum lot
+        info = self.market_info(self.symbol)
+        if info is None:
+            return round(max(0.01, math.floor(lots / 0.01) * 0.01), 8)
+        return info.round_amount(lots) or info.amount_min
 
     def buy(self, usd_amount:Optional[float]=None, lots:Optional[float]=None):
         if lots is None:
@@ -82,55 +112,163 @@ class PepperstoneMT5Broker:
                 lots = self.default_lot
             else:
                 lots = self.usd_to_lots(usd_amount)
-        price = mt5.symbol_info_tick(self.symbol).ask
-        request = {
-            "action": mt5.TRADE_ACTION_DEAL,
-            "symbol": self.symbol,
-            "volume": float(lots),
-            "type": mt5.ORDER_TYPE_BUY,
-            "price": price,
-            "deviation": 100,
-            "magic": 123456,
-            "comment": "pepperstone_bot_buy",
-            "type_filling": mt5.ORDER_FILLING_FOK,
-        }
-        res = mt5.order_send(request)
-        ok = res is not None and getattr(res, "retcode", None) == mt5.TRADE_RETCODE_DONE
-        return OrderResult(ok=ok, raw=res)
+        return self.submit(OrderRequest(self.symbol, "buy", lots))
 
     def sell(self, lots:Optional[float]=None):
         # sell by lots
         if lots is None:
             lots = self.default_lot
-        price = mt5.symbol_info_tick(self.symbol).bid
-        request = {
-            "action": mt5.TRADE_ACTION_DEAL,
-            "symbol": self.symbol,
+        return self.submit(OrderRequest(self.symbol, "sell", lots))
+
+    # --- common broker interface (bot/orders.py); amounts are lots ---
+
+    def submit(self, order: OrderRequest) -> OrderResult:
+        symbol = order.symbol or self.symbol
+        lots = order.amount
+        if order.quote_amount is not None:
+            lots = self.usd_to_lots(order.quote_amount)
+        order = self.round_order(OrderRequest(symbol, order.side, lots, order.type, order.price,
+                                              client_id=order.client_id))
+        lots = order.amount
+        if lots <= 0:
+            return rejected(order, "volume below the symbol's minimum lot")
+        buy = order.side == "buy"
+        if order.type == "limit":
+            request = {
+                "action": mt5.TRADE_ACTION_PENDING,
+                "type": mt5.ORDER_TYPE_BUY_LIMIT if buy else mt5.ORDER_TYPE_SELL_LIMIT,
+                "price": float(order.price),
+                "type_filling": mt5.ORDER_FILLING_RETURN,
+            }
+        else:
+            with _MT5_LOCK:
+                tick = mt5.symbol_info_tick(symbol)
+            request = {
+                "action": mt5.TRADE_ACTION_DEAL,
+                "type": mt5.ORDER_TYPE_BUY if buy else mt5.ORDER_TYPE_SELL,
+                "price": tick.ask if buy else tick.bid,
+                "type_filling": mt5.ORDER_FILLING_FOK,
+            }
+        request.update({
+            "symbol": symbol,
             "volume": float(lots),
-            "type": mt5.ORDER_TYPE_SELL,
-            "price": price,
             "deviation": 100,
             "magic": 123456,
-            "comment": "pepperstone_bot_sell",
-            "type_filling": mt5.ORDER_FILLING_FOK,
-        }
-        res = mt5.order_send(request)
-        ok = res is not None and getattr(res, "retcode", None) == mt5.TRADE_RETCODE_DONE
-        return OrderResult(ok=ok, raw=res)
+            "comment": f"pepperstone_bot_{order.side}",
+        })
+        with _MT5_LOCK:
+            res = mt5.order_send(request)
+            last_error = mt5.last_error()
+        retcode = getattr(res, "retcode", None)
+        ok = retcode in (mt5.TRADE_RETCODE_DONE, getattr(mt5, "TRADE_RETCODE_PLACED", None))
+        filled = float(getattr(res, "volume", 0.0) or 0.0) if retcode == mt5.TRADE_RETCODE_DONE and order.type != "limit" else 0.0
+        price = getattr(res, "price", None)
+        order_id = str(getattr(res, "order", "")) or None
+        return OrderResult(
+            ok=ok, raw=res, order_id=order_id, client_id=order.client_id, symbol=symbol, side=order.side,
+            status=("filled" if filled else "new") if ok else "rejected", amount=float(lots), filled=filled,
+            avg_price=price if filled else None,
+            fills=[Fill(symbol, order.side, filled, price, order_id=order_id)] if filled else [],
+            error=None if ok else (getattr(res, "comment", None) or str(last_error)),
+        )
+
+    def cancel(self, order_id: str, symbol: Optional[str] = None) -> OrderResult:
+        with _MT5_LOCK:
+            res = mt5.order_send({"action": mt5.TRADE_ACTION_REMOVE, "order": int(order_id)})
+        ok = getattr(res, "retcode", None) == mt5.TRADE_RETCODE_DONE
+        return OrderResult(ok=ok, raw=res, order_id=order_id, symbol=symbol or self.symbol,
+                           status="canceled" if ok else "rejected",
+                           error=None if ok else getattr(res, "comment", None))
+
+    def balances(self) -> Dict[str, Balance]:
+        info = mt5.account_info()
+        if info is None:
+            return {}
+        return {info.currency: Balance(info.currency, float(info.margin_free), float(info.margin))}
 
     def positions(self):
         return mt5.positions_get()
 
-    def close_all(self):
-        positions = mt5.positions_get()
+    def close_all(self, symbol: Optional[str] = None):
+        """
+        Flatten every open position (or those of `symbol`) as fast as possible.
+
+        Ticks are read once per symbol up front, then the close orders go out
+        from `close_workers` threads; the terminal calls themselves are
+        serialized (_MT5_LOCK), so more workers only overlap the Python-side
+        bookkeeping. Each order closes its own position ticket, so hedging
+        accounts don't open opposite deals.
+        Requotes refresh that symbol's tick and resend, up to `close_retries`.
+
+        Returns one report per position: ticket, symbol, volume, requested and
+        fill price, slippage (price units and bps, positive = worse than the
+        snapshot), latency_ms, attempts, ok, retcode and comment.
+        """
+        started = time.monotonic()
+        positions = mt5.positions_get(symbol=symbol) if symbol else mt5.positions_get()
         if not positions:
-            return
-        for p in positions:
-            vol = p.volume
-            sym = p.symbol
-            if p.type==0:
-                # long -> sell
-                mt5.order_send({"action": mt5.TRADE_ACTION_DEAL, "symbol": sym, "volume": vol, "type": mt5.ORDER_TYPE_SELL, "price": mt5.symbol_info_tick(sym).bid, "deviation":100, "type_filling": mt5.ORDER_FILLING_FOK})
-            else:
-                mt5.order_send({"action": mt5.TRADE_ACTION_DEAL, "symbol": sym, "volume": vol, "type": mt5.ORDER_TYPE_BUY, "price": mt5.symbol_info_tick(sym).ask, "deviation":100, "type_filling": mt5.ORDER_FILLING_FOK})
-            time.sleep(0.2)
+            return []
+        ticks = {sym: mt5.symbol_info_tick(sym) for sym in {p.symbol for p in positions}}
+
+        workers = max(1, min(self.close_workers, len(positions)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            reports = list(pool.map(lambda p: self._close_position(p, ticks[p.symbol]), positions))
+
+        failed = [r for r in reports if not r["ok"]]
+        worst = max((r["slippage"] for r in reports if r["slippage"] is not None), default=0.0)
+        logger.info(f"close_all: {len(reports) - len(failed)}/{len(reports)} closed in "
+                    f"{(time.monotonic() - started) * 1000:.0f} ms, worst slippage {worst:.5f}")
+        for r in failed:
+            logger.warning(f"close_all: ticket {r['ticket']} {r['symbol']} failed: {r['retcode']} {r['comment']}")
+        return reports
+
+    def _close_position(self, p, tick):
+        long = p.type == 0
+        report = {"ticket": p.ticket, "symbol": p.symbol, "side": "sell" if long else "buy", "volume": p.volume,
+                  "requested_price": None, "fill_price": None, "slippage": None, "slippage_bps": None, "latency_ms": None,
+                  "attempts": 0, "ok": False, "retcode": None, "comment": None}
+        if tick is None:
+            report["comment"] = "no tick"
+            return report
+        requested = price = tick.bid if long else tick.ask
+        report["requested_price"] = requested
+
+        started = time.monotonic()
+        res = None
+        for attempt in range(1, self.close_retries + 2):
+            request = {
+                "action": mt5.TRADE_ACTION_DEAL,
+                "symbol": p.symbol,
+                "volume": p.volume,
+                "type": mt5.ORDER_TYPE_SELL if long else mt5.ORDER_TYPE_BUY,
+                "position": p.ticket,
+                "price": price,
+                "deviation": 100,
+                "magic": 123456,
+                "comment": "pepperstone_bot_close",
+                "type_filling": mt5.ORDER_FILLING_FOK,
+            }
+            with _MT5_LOCK:
+                res = mt5.order_send(request)
+            report["attempts"] = attempt
+            if getattr(res, "retcode", None) not in REQUOTE_RETCODES or attempt > self.close_retries:
+                break
+            with _MT5_LOCK:
+                fresh = mt5.symbol_info_tick(p.symbol)
+            if fresh is not None:
+                price = fresh.bid if long else fresh.ask
+
+        report["latency_ms"] = (time.monotonic() - started) * 1000
+        report["retcode"] = getattr(res, "retcode", None)
+        if res is not None:
+            report["comment"] = getattr(res, "comment", None)
+        else:
+            with _MT5_LOCK:
+                report["comment"] = str(mt5.last_error())
+        report["ok"] = report["retcode"] == mt5.TRADE_RETCODE_DONE
+        if report["ok"]:
+            fill = getattr(res, "price", 0.0) or price  # some servers report 0 for market deals
+            report["fill_price"] = fill
+            report["slippage"] = (requested - fill) if long else (fill - requested)
+            report["slippage_bps"] = report["slippage"] / requested * 10000 if requested else None
+        return report
@@ -0,0 +1,72 @@
+# bot/candle_store.py
+import os
+from typing import Optional
+import numpy as np
+import pandas as pd
+from .utils import ensure_dir
+
+CANDLE_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+
+class CandleStore:
+    """
+    On-disk OHLCV cache, one .npy file per exchange/symbol/timeframe holding an
+    (n, 6) float64 array sorted by timestamp. Reads are memory-mapped, so
+    slicing the tail of a multi-year file only touches the pages it needs.
+    """
+    def __init__(self, root: str = "data/candles"):
+        self.root = root
+
+    def path(self, exchange: str, symbol: str, timeframe: str) -> str:
+        safe_symbol = symbol.replace('/', '-').replace(':', '-')
+        return os.path.join(self.root, exchange or "none", f"{safe_symbol}_{timeframe}.npy")
+
+    def read(self, exchange: str, symbol: str, timeframe: str) -> np.ndarray:
+        path = self.path(exchange, symbol, timeframe)
+        if not os.path.exists(path):
+            return np.empty((0, len(CANDLE_COLUMNS)), dtype=np.float64)
+        return np.load(path, mmap_mode='r')
+
+    def first_timestamp(self, exchange: str, symbol: str, timeframe: str) -> Optional[int]:
+        arr = self.read(exchange, symbol, timeframe)
+        return int(arr[0, 0]) if len(arr) else None
+
+    def last_timestamp(self, exchange: str, symbol: str, timeframe: str) -> Optional[int]:
+        arr = self.read(exchange, symbol, timeframe)
+        return int(arr[-1, 0]) if len(arr) else None
+
+    def write(self, exchange: str, symbol: str, timeframe: str, rows) -> int:
+        """Merge `rows` (ccxt-style [ts, o, h, l, c, v] lists) into the file. Returns rows stored."""
+        new = np.asarray(rows, dtype=np.float64).reshape(-1, len(CANDLE_COLUMNS))
+        old = self.read(exchange, symbol, timeframe)
+        if not len(new):
+            return len(old)
+
+        ts = new[:, 0]
+        if len(old) and (ts[0] > old[-1, 0] or ts[-1] < old[0, 0]) and np.all(ts[1:] > ts[:-1]):
+            # Pure append/prepend of sorted rows (the usual sync page): no dedupe or sort needed
+            merged = np.concatenate([old, new] if ts[0] > old[-1, 0] else [new, old])
+        else:
+            merged = np.concatenate([old, new]) if len(old) else new
+            # Later rows win on duplicate timestamps (a refetched candle replaces the stored one)
+            _, last_idx = np.unique(merged[::-1, 0], return_index=True)
+            merged = merged[::-1][last_idx]
+
+        path = self.path(exchange, symbol, timeframe)
+        ensure_dir(os.path.dirname(path))
+        tmp = path + ".tmp.npy"
+        np.save(tmp, merged)
+        del old  # release the old mapping before replacing the file
+        os.replace(tmp, path)
+        return len(merged)
+
+    def iter_chunks(self, exchange: str, symbol: str, timeframe: str, chunk_bars: int = 100_000):
+        """Yield the stored candles as DataFrames of at most `chunk_bars` rows, oldest first."""
+        arr = self.read(exchange, symbol, timeframe)
+        for start in range(0, len(arr), chunk_bars):
+            yield self.to_frame(arr[start:start + chunk_bars])
+
+    def to_frame(self, arr: np.ndarray) -> pd.DataFrame:
+        df = pd.DataFrame(np.asarray(arr), columns=CANDLE_COLUMNS)
+        df['timestamp'] = df['timestamp'].astype(np.int64)
+        return df
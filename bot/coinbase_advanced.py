@@ -10,20 +10,8 @@ from dataclasses import dataclass
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta, timezone
 
-from coinbase.rest import RESTClient
-
-GRANULARITY_MAP = {
-    "1m": "ONE_MINUTE",
-    "3m": "THREE_MINUTE",
-    "5m": "FIVE_MINUTE",
-    "15m": "FIFTEEN_MINUTE",
-    "30m": "THIRTY_MINUTE",
-    "1h": "ONE_HOUR",
-    "2h": "TWO_HOUR",
-    "4h": "FOUR_HOUR",
-    "6h": "SIX_HOUR",
-    "1d": "ONE_DAY",
-}
+from .broker_coinbase import CoinbaseOrders, GRANULARITY_MAP, candles_from_response
+from .markets import format_decimal
 
 @dataclass
 class CoinbaseConfig:
@@ -34,19 +22,23 @@ class CoinbaseConfig:
     retail_portfolio_id: Optional[str] = None
     base_url: str = "api.coinbase.com"
 
-class CoinbaseAdvanced:
+class CoinbaseAdvanced(CoinbaseOrders):
     def __init__(self, cfg: CoinbaseConfig):
         if cfg.timeframe not in GRANULARITY_MAP:
             raise ValueError(f"Unsupported timeframe: {cfg.timeframe}")
         self.cfg = cfg
+        self.retail_portfolio_id = cfg.retail_portfolio_id
         if not os.path.exists(cfg.api_private_key_path):
             raise FileNotFoundError(f"Private key PEM not found: {cfg.api_private_key_path}")
         
+        from coinbase.rest import RESTClient  # SDK loaded on first use, not at import
+
         # FIX: Only use key_file for Advanced Trade, do not pass api_key
         self.client = RESTClient(
             key_file=cfg.api_private_key_path,
             base_url=cfg.base_url,
         )
+        self._init_markets()
 
     def get_candles(self, limit: int = 300) -> List[Dict[str, Any]]:
         gran = GRANULARITY_MAP[self.cfg.timeframe]
@@ -60,19 +52,7 @@ class CoinbaseAdvanced:
             granularity=gran,
             limit=limit,
         )
-        candles = []
-        for c in getattr(resp, "candles", []):
-            candles.append({
-                "start": c.start,
-                "end": c.end,
-                "low": float(c.low),
-                "high": float(c.high),
-                "open": float(c.open),
-                "close": float(c.close),
-                "volume": float(c.volume),
-            })
-        candles.sort(key=lambda x: x["start"])
-        return candles
+        return candles_from_response(resp)
 
     def _bucket_seconds(self, tf: str) -> int:
         return {
@@ -91,10 +71,16 @@ class CoinbaseAdvanced:
             retail_portfolio_id=self.cfg.retail_portfolio_id,
         )
 
+    def _base_size(self, base_size) -> str:
+        info = self.market_info(self.cfg.product_id)
+        if info is None:
+            return str(base_size)
+        return format_decimal(info.round_amount(float(base_size)), info.amount_precision)
+
     def market_sell_base(self, base_size: str) -> Any:
         return self.client.market_order_sell(
             client_order_id=str(uuid.uuid4()),
             product_id=self.cfg.product_id,
-            base_size=str(base_size),
+            base_size=self._base_size(base_size),
             retail_portfolio_id=self.cfg.retail_portfolio_id,
         )
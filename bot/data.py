@@ -1,13 +1,40 @@
 # bot/data.py
+import asyncio
 import time
 from typing import Dict, Any
 import pandas as pd
-import numpy as np
+from .candle_store import CandleStore
+from .utils import timeframe_to_ms
+from .markets import install_ccxt_markets
+from .resample import resample_many
 
-try:
-    import ccxt  # type: ignore
-except Exception:
-    ccxt = None
+# Served by the market cache only if coinbaseadvanced's own market fetch fails
+# (it answers 401 for Secret API Keys) and nothing is cached on disk yet.
+COINBASE_SEED_MARKETS = [
+    {'id': 'BTC-USD', 'symbol': 'BTC/USD', 'base': 'BTC', 'quote': 'USD'},
+    {'id': 'ETH-USD', 'symbol': 'ETH/USD', 'base': 'ETH', 'quote': 'USD'},
+    {'id': 'SOL-USD', 'symbol': 'SOL/USD', 'base': 'SOL', 'quote': 'USD'},
+    {'id': 'ADA-USD', 'symbol': 'ADA/USD', 'base': 'ADA', 'quote': 'USD'},
+]
+
+
+def load_ccxt(async_support: bool = False):
+    """
+    Import ccxt on first use rather than with this module: it loads hundreds
+    of exchange classes, which offline backtests never need. None if missing.
+    """
+    try:
+        if async_support:
+            import ccxt.async_support as module  # type: ignore
+        else:
+            import ccxt as module  # type: ignore
+    except Exception:
+        return None
+    return module
+
+
+def _seed_markets(exchange_name: str):
+    return COINBASE_SEED_MARKETS if exchange_name == "coinbaseadvanced" else None
 
 
 class HistoricalDataSource:
@@ -15,56 +42,120 @@ class HistoricalDataSource:
         self.cfg = cfg
         self.symbol = cfg['market']['symbol']
         self.timeframe = cfg['market']['timeframe']
-        self.exchange_name = cfg['exchange']['name']
-        self.rate_limit_ms = cfg['exchange'].get('rate_limit_ms', 250)
+        # config.yaml may have no `exchange` section: synthetic candles then (see get_historical)
+        ex_cfg = cfg.get('exchange') or {}
+        self.exchange_name = ex_cfg.get('name')
+        self.rate_limit_ms = ex_cfg.get('rate_limit_ms', 250)
+
+        data_cfg = cfg.get('data', {})
+        self.store = CandleStore(data_cfg['cache_dir']) if data_cfg.get('cache_dir') else None
+        self.page_limit = int(data_cfg.get('page_limit', 1000))
+        self.offline = bool(data_cfg.get('offline', False))
+        # With a store, other timeframes are resampled from this one instead of fetched
+        self.base_timeframe = data_cfg.get('base_timeframe')
 
-        if self.exchange_name and ccxt:
+        ccxt = load_ccxt() if self.exchange_name and self.exchange_name != "synthetic" else None
+        if self.exchange_name == "synthetic":
+            from .synthetic import feed_for
+            self.exchange = feed_for(cfg)
+            self.markets = None
+        elif ccxt:
             ex_cls = getattr(ccxt, self.exchange_name, None)
             if ex_cls is None:
                 raise ValueError(f"Exchange {self.exchange_name} not in ccxt")
             self.exchange = ex_cls({'enableRateLimit': True})
-            # Mock fetch_markets to avoid 401s with Secret API Key
-            if self.exchange_name == "coinbaseadvanced":
-                self.exchange.fetch_markets = self.mock_fetch_markets
+            self.markets = install_ccxt_markets(self.exchange, seed=_seed_markets(self.exchange_name))
         else:
             self.exchange = None
+            self.markets = None
 
-    def mock_fetch_markets(self, params={}):
-        return [
-            {'id': 'BTC-USD', 'symbol': 'BTC/USD', 'base': 'BTC', 'quote': 'USD'},
-            {'id': 'ETH-USD', 'symbol': 'ETH/USD', 'base': 'ETH', 'quote': 'USD'},
-            {'id': 'SOL-USD', 'symbol': 'SOL/USD', 'base': 'SOL', 'quote': 'USD'},
-            {'id': 'ADA-USD', 'symbol': 'ADA/USD', 'base': 'ADA', 'quote': 'USD'},
-        ]
+    def get_historical(self, limit: int = 2000, timeframe: str = None) -> pd.DataFrame:
+        timeframe = timeframe or self.timeframe
+        if self.store is not None and (self.exchange or self.offline):
+            if self.base_timeframe and timeframe != self.base_timeframe:
+                return self.get_timeframes([timeframe], limit)[timeframe]
+            return self._get_cached(limit, timeframe)
 
-    def get_historical(self, limit: int = 2000) -> pd.DataFrame:
         if self.exchange:
-            print(f"[DATA] Fetching {limit} candles for {self.symbol} ({self.timeframe}) from {self.exchange_name}")
-            ohlcv = self.exchange.fetch_ohlcv(self.symbol, timeframe=self.timeframe, limit=limit)
+            print(f"[DATA] Fetching {limit} candles for {self.symbol} ({timeframe}) from {self.exchange_name}")
+            ohlcv = self.exchange.fetch_ohlcv(self.symbol, timeframe=timeframe, limit=limit)
             return pd.DataFrame(ohlcv, columns=['timestamp','open','high','low','close','volume'])
 
-        # Fallback: synthetic candles
-        ts = int(time.time()*1000)
-        step_ms = {'1m': 60_000, '5m': 300_000, '15m': 900_000, '1h': 3_600_000}.get(self.timeframe, 60_000)
-        prices = [20000.0]
-        for _ in range(limit-1):
-            prices.append(prices[-1] * (1 + np.random.normal(0, 0.001)))
-
-        open_ = np.array(prices[:-1])
-        close = np.array(prices[1:])
-        high = np.maximum(open_, close) * (1 + np.random.rand(len(open_))*0.002)
-        low = np.minimum(open_, close) * (1 - np.random.rand(len(open_))*0.002)
-        volume = np.random.rand(len(open_))*10
-        timestamps = [ts - step_ms*(len(open_)-i) for i in range(len(open_))]
-
-        return pd.DataFrame({
-            'timestamp': timestamps,
-            'open': open_,
-            'high': high,
-            'low': low,
-            'close': close,
-            'volume': volume
-        })
+        # Fallback: seeded synthetic candles (config.yaml `synthetic`), aligned to the timeframe
+        from .synthetic import feed_for
+        return feed_for(self.cfg, timeframe, history=limit).candles(self.symbol, limit)
+
+    def _get_cached(self, limit: int, timeframe: str = None) -> pd.DataFrame:
+        timeframe = timeframe or self.timeframe
+        key = (self.exchange_name, self.symbol, timeframe)
+        if self.exchange and not self.offline:
+            self.sync(limit, timeframe)
+        arr = self.store.read(*key)
+        return self.store.to_frame(arr[-limit:])
+
+    def get_timeframes(self, timeframes, limit: int = 2000) -> Dict[str, pd.DataFrame]:
+        """
+        `limit` closed candles for each of `timeframes`, all resampled from
+        one sync of `data.base_timeframe` (default: market.timeframe), so they
+        cost a single series of requests and agree with each other.
+        """
+        base = self.base_timeframe or self.timeframe
+        base_step = timeframe_to_ms(base)
+        # enough base candles for `limit` bars of the longest timeframe, plus one partial bucket
+        need = max((limit + 1) * timeframe_to_ms(tf) // base_step for tf in timeframes)
+        if self.store is not None and (self.exchange or self.offline):
+            candles = self._get_cached(need, base)
+        else:
+            candles = self.get_historical(need, base)
+        return {tf: df.iloc[-limit:].reset_index(drop=True) for tf, df in resample_many(candles, timeframes, base).items()}
+
+    def sync(self, limit: int = 2000, timeframe: str = None):
+        """Fetch closed candles newer than the cache, then backfill until it holds `limit` rows."""
+        timeframe = timeframe or self.timeframe
+        key = (self.exchange_name, self.symbol, timeframe)
+        step = timeframe_to_ms(timeframe)
+        now = int(time.time()*1000)
+        last_closed = (now // step - 1) * step
+
+        last_ts = self.store.last_timestamp(*key)
+        if last_ts is None:
+            since = last_closed - (limit - 1) * step
+        else:
+            since = last_ts + step
+
+        # Pages are collected and merged into the file once per direction, not rewritten per page
+        pages = []
+        while since <= last_closed:
+            batch = self._fetch_page(since, timeframe)
+            batch = [c for c in batch if since <= c[0] <= last_closed]
+            if not batch:
+                break
+            pages.extend(batch)
+            since = int(batch[-1][0]) + step
+        fetched = len(pages)
+        stored = self.store.write(*key, pages) if pages else len(self.store.read(*key))
+
+        first_ts = self.store.first_timestamp(*key)
+        pages = []
+        while first_ts is not None and stored + len(pages) < limit:
+            batch = self._fetch_page(first_ts - self.page_limit * step, timeframe)
+            batch = [c for c in batch if c[0] < first_ts]
+            if not batch:
+                break
+            pages[:0] = batch
+            first_ts = int(batch[0][0])
+        if pages:
+            stored = self.store.write(*key, pages)
+            fetched += len(pages)
+
+        if fetched:
+            print(f"[DATA] Synced {fetched} candles for {self.symbol} ({timeframe}), {stored} cached")
+
+    def _fetch_page(self, since: int, timeframe: str = None):
+        batch = self.exchange.fetch_ohlcv(self.symbol, timeframe=timeframe or self.timeframe, since=since,
+                                          limit=self.page_limit)
+        time.sleep(self.rate_limit_ms / 1000)
+        return batch or []
 
 
 class LiveDataSource:
@@ -72,33 +163,30 @@ class LiveDataSource:
         self.cfg = cfg
         self.symbol = cfg['market']['symbol']
         self.timeframe = cfg['market']['timeframe']
-        self.exchange_name = cfg['exchange']['name']
+        ex_cfg = cfg.get('exchange') or {}
+        self.exchange_name = ex_cfg.get('name')
 
-        if self.exchange_name and ccxt:
+        ccxt = load_ccxt() if self.exchange_name and self.exchange_name != "synthetic" else None
+        if self.exchange_name == "synthetic":
+            from .synthetic import feed_for
+            self.exchange = feed_for(cfg)
+            self.markets = None
+        elif ccxt:
             ex_cls = getattr(ccxt, self.exchange_name, None)
             if ex_cls is None:
                 raise ValueError(f"Exchange {self.exchange_name} not in ccxt")
 
             self.exchange = ex_cls({
-                'apiKey': cfg['exchange'].get('api_key'),
-                'secret': cfg['exchange'].get('secret'),
-                'password': cfg['exchange'].get('password'),
+                'apiKey': ex_cfg.get('api_key'),
+                'secret': ex_cfg.get('secret'),
+                'password': ex_cfg.get('password'),
                 'enableRateLimit': True
             })
 
-            # Mock fetch_markets for Secret API Keys
-            if self.exchange_name == "coinbaseadvanced":
-                self.exchange.fetch_markets = self.mock_fetch_markets
+            self.markets = install_ccxt_markets(self.exchange, seed=_seed_markets(self.exchange_name))
         else:
             self.exchange = None
-
-    def mock_fetch_markets(self, params={}):
-        return [
-            {'id': 'BTC-USD', 'symbol': 'BTC/USD', 'base': 'BTC', 'quote': 'USD'},
-            {'id': 'ETH-USD', 'symbol': 'ETH/USD', 'base': 'ETH', 'quote': 'USD'},
-            {'id': 'SOL-USD', 'symbol': 'SOL/USD', 'base': 'SOL', 'quote': 'USD'},
-            {'id': 'ADA-USD', 'symbol': 'ADA/USD', 'base': 'ADA', 'quote': 'USD'},
-        ]
+            self.markets = None
 
     def get_recent_candles(self, limit: int = 200) -> pd.DataFrame:
         if self.exchange:
@@ -110,6 +198,89 @@ class LiveDataSource:
         return HistoricalDataSource(self.cfg).get_historical(limit=limit)
 
 
+class AsyncRateLimiter:
+    """Shared by concurrent requests: spaces them `interval_ms` apart and caps how many are in flight."""
+    def __init__(self, interval_ms: float = 250, max_concurrent: int = 5):
+        self.interval = interval_ms / 1000
+        self._sem = asyncio.Semaphore(max_concurrent)
+        self._lock = asyncio.Lock()
+        self._next_slot = 0.0
+
+    async def __aenter__(self):
+        await self._sem.acquire()
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._sem.release()
+
+
+class AsyncLiveDataSource:
+    """
+    Concurrent counterpart of LiveDataSource for many symbols. Uses ccxt's
+    async_support exchange when available; otherwise runs the blocking fetch
+    in a worker thread. All requests go through one AsyncRateLimiter.
+    """
+    def __init__(self, cfg: Dict[str, Any], limiter: AsyncRateLimiter = None):
+        self.cfg = cfg
+        self.timeframe = cfg['market']['timeframe']
+        ex_cfg = cfg.get('exchange') or {}
+        self.exchange_name = ex_cfg.get('name')
+        self.limiter = limiter or AsyncRateLimiter(
+            ex_cfg.get('rate_limit_ms', 250),
+            ex_cfg.get('max_concurrent_requests', 5),
+        )
+
+        ccxt_async = load_ccxt(async_support=True) if self.exchange_name and self.exchange_name != "synthetic" else None
+        if self.exchange_name == "synthetic":
+            from .synthetic import feed_for, AsyncSyntheticFeed
+            self.exchange = AsyncSyntheticFeed(feed_for(cfg))
+            self.markets = None
+        elif ccxt_async:
+            ex_cls = getattr(ccxt_async, self.exchange_name, None)
+            if ex_cls is None:
+                raise ValueError(f"Exchange {self.exchange_name} not in ccxt")
+            self.exchange = ex_cls({
+                'apiKey': ex_cfg.get('api_key'),
+                'secret': ex_cfg.get('secret'),
+                'password': ex_cfg.get('password'),
+                # pacing is done by self.limiter across all symbols
+                'enableRateLimit': False
+            })
+            self.markets = install_ccxt_markets(self.exchange, seed=_seed_markets(self.exchange_name))
+        else:
+            self.exchange = None
+            self.markets = None
+        self._sync_sources = {}
+
+    def _sync_source(self, symbol: str) -> LiveDataSource:
+        if symbol not in self._sync_sources:
+            cfg = {**self.cfg, 'market': {**self.cfg['market'], 'symbol': symbol}}
+            self._sync_sources[symbol] = LiveDataSource(cfg)
+        return self._sync_sources[symbol]
+
+    async def get_recent_candles(self, symbol: str, limit: int = 200) -> pd.DataFrame:
+        async with self.limiter:
+            if self.exchange:
+                ohlcv = await self.exchange.fetch_ohlcv(symbol, timeframe=self.timeframe, limit=limit)
+                return pd.DataFrame(ohlcv, columns=['timestamp','open','high','low','close','volume'])
+            return await asyncio.to_thread(self._sync_source(symbol).get_recent_candles, limit)
+
+    async def create_order(self, symbol: str, side: str, amount: float):
+        async with self.limiter:
+            return await self.exchange.create_order(symbol, 'market', side, amount)
+
+    async def close(self):
+        if self.exchange:
+            await self.exchange.close()
+
+
 class DataFetcher:
     """
     Wrapper class to match old interface.
@@ -0,0 +1,98 @@
+# bot/http_session.py
+import threading
+import time
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class HttpClient:
+    """
+    One pooled requests.Session for the whole process, so repeated calls to the
+    same host reuse a kept-alive TCP/TLS connection instead of handshaking again.
+
+    - at most `pool_maxsize` connections per host (callers wait for a free one)
+    - (connect, read) timeouts on every request unless the caller overrides them
+    - idempotent GET/HEAD retried on connection errors and 429/5xx with
+      exponential backoff; POSTs are only retried if the connection never opened
+    - per host+method latency counters, see latency_stats()
+    """
+    def __init__(self, connect_timeout: float = 3.05, read_timeout: float = 10.0,
+                 retries: int = 3, backoff_factor: float = 0.3, pool_maxsize: int = 10):
+        self.timeout = (connect_timeout, read_timeout)
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=pool_maxsize, pool_block=True, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._lock = threading.Lock()
+        self._latency: Dict[str, Dict[str, float]] = {}
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', self.timeout)
+        start = time.perf_counter()
+        ok = False
+        try:
+            resp = self.session.request(method, url, **kwargs)
+            ok = True
+            return resp
+        finally:
+            self._record(f"{method.upper()} {urlsplit(url).netloc}", time.perf_counter() - start, ok)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def _record(self, key: str, seconds: float, ok: bool):
+        with self._lock:
+            st = self._latency.get(key)
+            if st is None:
+                st = self._latency[key] = {'count': 0, 'errors': 0, 'total_s': 0.0, 'max_s': 0.0, 'last_s': 0.0}
+            st['count'] += 1
+            st['errors'] += 0 if ok else 1
+            st['total_s'] += seconds
+            st['last_s'] = seconds
+            st['max_s'] = max(st['max_s'], seconds)
+
+    def latency_stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {k: {**v, 'avg_s': v['total_s'] / v['count'] if v['count'] else 0.0}
+                    for k, v in self._latency.items()}
+
+    def close(self):
+        self.session.close()
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def configure(**kwargs) -> HttpClient:
+    """Replace the shared client, e.g. configure(read_timeout=5, retries=2)."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = HttpClient(**kwargs)
+        return _client
+
+
+def get_client() -> HttpClient:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient()
+    return _client
@@ -0,0 +1,141 @@
+# bot/indicator_cache.py
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, TYPE_CHECKING
+
+import numpy as np
+
+from .utils import ensure_dir
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def fingerprint(values: np.ndarray) -> str:
+    """Content hash of a float series; equal data gives equal keys regardless of where it came from."""
+    arr = np.ascontiguousarray(values, dtype=np.float64)
+    return hashlib.blake2b(arr.tobytes(), digest_size=16).hexdigest() + f":{len(arr)}"
+
+
+class IndicatorCache:
+    """
+    Memoizes batch indicator results keyed by (data fingerprint, indicator, params).
+
+    In-memory entries are evicted least-recently-used beyond `max_entries`.
+    With `cache_dir`, results are also written as .npy files and read back on
+    a memory miss, so separate runs over the same data share work.
+    Cached arrays are read-only; callers get them wrapped in a Series.
+    """
+    def __init__(self, max_entries: int = 256, cache_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, series: "pd.Series", name: str, params: tuple, compute: Callable[["pd.Series"], "pd.Series"]) -> "pd.Series":
+        import pandas as pd
+        key = f"{fingerprint(series.to_numpy())}:{name}:{params}"
+        with self._lock:
+            arr = self._entries.get(key)
+            if arr is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return pd.Series(arr, index=series.index, copy=False)
+
+        arr = self._load(key)
+        if arr is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            arr = np.asarray(compute(series), dtype=np.float64).copy()
+            self._save(key, arr)
+        arr.flags.writeable = False
+
+        with self._lock:
+            self._entries[key] = arr
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return pd.Series(arr, index=series.index, copy=False)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.blake2b(key.encode(), digest_size=16).hexdigest() + ".npy")
+
+    def _load(self, key: str) -> Optional[np.ndarray]:
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        return np.load(path) if os.path.exists(path) else None
+
+    def _save(self, key: str, arr: np.ndarray):
+        if not self.cache_dir:
+            return
+        ensure_dir(self.cache_dir)
+        path = self._path(key)
+        tmp = path + ".tmp.npy"
+        np.save(tmp, arr)
+        os.replace(tmp, path)
+
+    def stats(self) -> Dict[str, int]:
+        total = self.hits + self.disk_hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'hit_rate': (self.hits + self.disk_hits) / total if total else 0.0,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = IndicatorCache()
+
+
+def configure(max_entries: int = 256, cache_dir: Optional[str] = None) -> IndicatorCache:
+    """Replace the process-wide cache, e.g. configure(cache_dir="data/indicators")."""
+    global _cache
+    _cache = IndicatorCache(max_entries=max_entries, cache_dir=cache_dir)
+    return _cache
+
+
+def get_cache() -> IndicatorCache:
+    return _cache
+
+
+@contextmanager
+def using(cache: IndicatorCache):
+    """Route sma/ema/rsi through `cache` instead of the process-wide one for the duration of the block."""
+    global _cache
+    previous, _cache = _cache, cache
+    try:
+        yield cache
+    finally:
+        _cache = previous
+
+
+# Same calculations bot/strategy.py used inline, routed through the cache.
+# pandas/ta are imported when first used, so strategies load without them.
+
+def sma(series: "pd.Series", window: int) -> "pd.Series":
+    return _cache.get(series, 'sma', (int(window),), lambda s: s.rolling(window).mean())
+
+
+def ema(series: "pd.Series", span: int) -> "pd.Series":
+    return _cache.get(series, 'ema', (int(span),), lambda s: s.ewm(span=span, adjust=False).mean())
+
+
+def rsi(series: "pd.Series", window: int) -> "pd.Series":
+    import ta
+    return _cache.get(series, 'rsi', (int(window),), lambda s: ta.momentum.rsi(s, window=window))
@@ -0,0 +1,83 @@
+# bot/indicators.py
+"""
+Streaming indicators: feed one value at a time, O(1) per update.
+
+Each one reproduces the batch pandas/`ta` calculation used in bot/strategy.py
+bar for bar, including the NaN warm-up period, so a strategy driven by these
+emits the same signals as `generate_signals` on the full history.
+"""
+import math
+from collections import deque
+
+NAN = float('nan')
+
+
+class SMA:
+    """Same as `series.rolling(window).mean()`."""
+    def __init__(self, window: int):
+        self.window = int(window)
+        self._values = deque()
+        self._sum = 0.0
+        self._updates = 0
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        self._values.append(x)
+        self._sum += x
+        if len(self._values) > self.window:
+            self._sum -= self._values.popleft()
+        # Re-sum once per window so float drift from add/subtract can't build up
+        self._updates += 1
+        if self._updates % self.window == 0:
+            self._sum = math.fsum(self._values)
+        self.value = self._sum / self.window if len(self._values) == self.window else NAN
+        return self.value
+
+
+class EMA:
+    """Same as `series.ewm(span=span, adjust=False).mean()`."""
+    def __init__(self, span: int):
+        self.alpha = 2.0 / (span + 1)
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        if math.isnan(self.value):
+            self.value = x
+        else:
+            self.value = (1 - self.alpha) * self.value + self.alpha * x
+        return self.value
+
+
+class RSI:
+    """Wilder RSI, same as `ta.momentum.rsi(series, window=window)`."""
+    def __init__(self, window: int = 14):
+        self.window = int(window)
+        self.alpha = 1.0 / self.window
+        self._prev = None
+        self._up = 0.0
+        self._down = 0.0
+        self._count = 0
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        diff = 0.0 if self._prev is None else x - self._prev
+        self._prev = x
+        up = diff if diff > 0 else 0.0
+        down = -diff if diff < 0 else 0.0
+        if self._count == 0:
+            self._up, self._down = up, down
+        else:
+            self._up = (1 - self.alpha) * self._up + self.alpha * up
+            self._down = (1 - self.alpha) * self._down + self.alpha * down
+        self._count += 1
+
+        if self._count < self.window:
+            self.value = NAN
+        elif self._down == 0:
+            self.value = 100.0
+        else:
+            self.value = 100 - 100 / (1 + self._up / self._down)
+        return self.value
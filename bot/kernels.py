@@ -0,0 +1,359 @@
+# bot/kernels.py
+"""
+Array backends for the strategies' generate_signals(): the same SMA/EMA/RSI,
+crossover and volume-filter logic as the pandas/`ta` path in bot/strategy.py,
+on contiguous float64 arrays and without the intermediate Series.
+
+    backend="numpy"  vectorized indicators + boolean logic (always available)
+    backend="numba"  one fused pass per series, JIT-compiled; needs numba
+    backend="auto"   numba when installed, else numpy
+
+Select with strategy params `backend` (default "pandas", the original path).
+Signals match the pandas path; indicator values agree to float rounding.
+
+smarsi_batch() / scalping_batch() evaluate many parameter sets over the same
+series in one call, returning one int8 signal row per set. The numpy backend
+computes each distinct indicator window once for the whole batch; numba runs
+the sets in parallel.
+"""
+import math
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+SMARSI_DEFAULTS = {'fast_sma': 10, 'slow_sma': 30, 'rsi_period': 14, 'rsi_buy_below': 35, 'rsi_sell_above': 65}
+SCALPING_DEFAULTS = {'ema_fast': 5, 'ema_slow': 20, 'rsi_period': 14, 'rsi_overbought': 70,
+                     'rsi_oversold': 30, 'volume_ma': 10}
+
+# numba is optional and slow to import: loaded on first use of the numba backend
+_numba = None
+_jitted: Dict[str, Any] = {}
+
+
+def _load_numba():
+    global _numba
+    if _numba is None:
+        try:
+            import numba
+            _numba = numba
+        except Exception:
+            _numba = False
+    return _numba or None
+
+
+def resolve_backend(name: str = "auto") -> str:
+    if name == "auto":
+        return "numba" if _load_numba() else "numpy"
+    if name == "numba" and not _load_numba():
+        print("[KERNELS] numba not installed, using the numpy backend")
+        return "numpy"
+    if name not in ("numpy", "numba"):
+        raise ValueError(f"Unknown signal backend: {name}")
+    return name
+
+
+def _contiguous(x) -> np.ndarray:
+    return np.ascontiguousarray(x, dtype=np.float64)
+
+
+def _args(params: Dict[str, Any], defaults: Dict[str, Any]) -> List[Any]:
+    return [params.get(key, default) for key, default in defaults.items()]
+
+
+# --- numpy indicators (same definitions as bot/indicators.py) ---
+
+def sma(x: np.ndarray, window: int) -> np.ndarray:
+    """series.rolling(window).mean()"""
+    x = _contiguous(x)
+    out = np.full(len(x), np.nan)
+    window = int(window)
+    if 0 < window <= len(x):
+        # cumulative sum of deviations from the first value keeps the sums small
+        c = np.empty(len(x) + 1)
+        c[0] = 0.0
+        np.cumsum(x - x[0], out=c[1:])
+        out[window - 1:] = (c[window:] - c[:-window]) / window + x[0]
+    return out
+
+
+def ewm(x: np.ndarray, alpha: float) -> np.ndarray:
+    """series.ewm(alpha=alpha, adjust=False).mean() for a series without NaN."""
+    x = _contiguous(x)
+    out = np.empty(len(x))
+    if not len(x):
+        return out
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        out[:] = x
+        return out
+    # y[j] = decay^(j+1) * (y[-1] + alpha * sum_i x[i] / decay^(i+1)), evaluated in blocks short
+    # enough that decay^-block stays far from overflow
+    block = max(1, min(len(x), int(230.0 / -math.log(decay))))
+    powers = decay ** np.arange(1, block + 1)
+    prev = x[0]
+    for start in range(0, len(x), block):
+        chunk = x[start:start + block]
+        p = powers[:len(chunk)]
+        out[start:start + len(chunk)] = p * (prev + alpha * np.cumsum(chunk / p))
+        prev = out[start + len(chunk) - 1]
+    return out
+
+
+def ema(x: np.ndarray, span: int) -> np.ndarray:
+    """series.ewm(span=span, adjust=False).mean()"""
+    return ewm(x, 2.0 / (span + 1))
+
+
+def rsi(x: np.ndarray, window: int) -> np.ndarray:
+    """ta.momentum.rsi(series, window=window)"""
+    x = _contiguous(x)
+    diff = np.empty(len(x))
+    if len(x):
+        diff[0] = 0.0
+        np.subtract(x[1:], x[:-1], out=diff[1:])
+    up = ewm(np.maximum(diff, 0.0), 1.0 / window)
+    down = ewm(np.maximum(-diff, 0.0), 1.0 / window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = np.where(down == 0, 100.0, 100.0 - 100.0 / (1.0 + up / down))
+    out[:int(window) - 1] = np.nan
+    return out
+
+
+def _prev(a: np.ndarray) -> np.ndarray:
+    out = np.empty_like(a)
+    out[:1] = np.nan
+    out[1:] = a[:-1]
+    return out
+
+
+def _to_signal(buy: np.ndarray, sell: np.ndarray) -> np.ndarray:
+    """1 where buy, -1 where sell (sell wins, as in the pandas path), else 0."""
+    return np.where(sell, -1, buy).astype(np.int8)
+
+
+class _Memo:
+    """Indicator arrays for one series, each (kind, window) computed once across a batch."""
+    def __init__(self, close: np.ndarray, volume: np.ndarray = None):
+        self.close = close
+        self.volume = volume
+        self._cache: Dict[tuple, np.ndarray] = {}
+
+    def get(self, kind: str, window: int, series: str = 'close') -> np.ndarray:
+        key = (kind, window, series)
+        if key not in self._cache:
+            fn = {'sma': sma, 'ema': ema, 'rsi': rsi}[kind]
+            self._cache[key] = fn(getattr(self, series), window)
+        return self._cache[key]
+
+
+def _smarsi_numpy(m: _Memo, fast, slow, rsi_p, buy_below, sell_above) -> np.ndarray:
+    f, s, r = m.get('sma', fast), m.get('sma', slow), m.get('rsi', rsi_p)
+    pf, ps = _prev(f), _prev(s)
+    buy = ((f > s) & (pf <= ps)) | (r < buy_below)
+    sell = ((f < s) & (pf >= ps)) | (r > sell_above)
+    return _to_signal(buy, sell)
+
+
+def _scalping_numpy(m: _Memo, ema_fast, ema_slow, rsi_p, overbought, oversold, vol_window) -> np.ndarray:
+    ef, es, r = m.get('ema', ema_fast), m.get('ema', ema_slow), m.get('rsi', rsi_p)
+    active = m.volume > m.get('sma', vol_window, 'volume')
+    buy = (ef > es) & (r > oversold) & active
+    sell = (ef < es) & (r < overbought) & active
+    return _to_signal(buy, sell)
+
+
+# --- fused single-pass loops (compiled by numba; plain Python otherwise) ---
+
+def _smarsi_loop(close, fast, slow, rsi_p, buy_below, sell_above, out):
+    n = close.shape[0]
+    nan = np.nan
+    sum_f = 0.0
+    sum_s = 0.0
+    up = 0.0
+    down = 0.0
+    a = 1.0 / rsi_p
+    prev_f = nan
+    prev_s = nan
+    for i in range(n):
+        x = close[i]
+        sum_f += x
+        sum_s += x
+        if i >= fast:
+            sum_f -= close[i - fast]
+        if i >= slow:
+            sum_s -= close[i - slow]
+        # re-sum once per window so add/subtract drift can't build up (as indicators.SMA)
+        if i + 1 >= fast and (i + 1) % fast == 0:
+            sum_f = np.sum(close[i + 1 - fast:i + 1])
+        if i + 1 >= slow and (i + 1) % slow == 0:
+            sum_s = np.sum(close[i + 1 - slow:i + 1])
+        f = sum_f / fast if i + 1 >= fast else nan
+        s = sum_s / slow if i + 1 >= slow else nan
+
+        d = x - close[i - 1] if i > 0 else 0.0
+        u = d if d > 0 else 0.0
+        v = -d if d < 0 else 0.0
+        if i == 0:
+            up = u
+            down = v
+        else:
+            up = (1 - a) * up + a * u
+            down = (1 - a) * down + a * v
+        if i + 1 < rsi_p:
+            r = nan
+        elif down == 0:
+            r = 100.0
+        else:
+            r = 100.0 - 100.0 / (1.0 + up / down)
+
+        sig = 0
+        if (f > s and prev_f <= prev_s) or r < buy_below:
+            sig = 1
+        if (f < s and prev_f >= prev_s) or r > sell_above:
+            sig = -1
+        out[i] = sig
+        prev_f = f
+        prev_s = s
+
+
+def _scalping_loop(close, volume, ema_fast, ema_slow, rsi_p, overbought, oversold, vol_window, out):
+    n = close.shape[0]
+    nan = np.nan
+    a_f = 2.0 / (ema_fast + 1)
+    a_s = 2.0 / (ema_slow + 1)
+    a_r = 1.0 / rsi_p
+    e_f = 0.0
+    e_s = 0.0
+    up = 0.0
+    down = 0.0
+    sum_v = 0.0
+    for i in range(n):
+        x = close[i]
+        if i == 0:
+            e_f = x
+            e_s = x
+        else:
+            e_f = (1 - a_f) * e_f + a_f * x
+            e_s = (1 - a_s) * e_s + a_s * x
+
+        d = x - close[i - 1] if i > 0 else 0.0
+        u = d if d > 0 else 0.0
+        v = -d if d < 0 else 0.0
+        if i == 0:
+            up = u
+            down = v
+        else:
+            up = (1 - a_r) * up + a_r * u
+            down = (1 - a_r) * down + a_r * v
+        if i + 1 < rsi_p:
+            r = nan
+        elif down == 0:
+            r = 100.0
+        else:
+            r = 100.0 - 100.0 / (1.0 + up / down)
+
+        vol = volume[i]
+        sum_v += vol
+        if i >= vol_window:
+            sum_v -= volume[i - vol_window]
+        if i + 1 >= vol_window and (i + 1) % vol_window == 0:
+            sum_v = np.sum(volume[i + 1 - vol_window:i + 1])
+        vol_ma = sum_v / vol_window if i + 1 >= vol_window else nan
+
+        sig = 0
+        if vol > vol_ma:
+            if e_f > e_s and r > oversold:
+                sig = 1
+            if e_f < e_s and r < overbought:
+                sig = -1
+        out[i] = sig
+
+
+def _smarsi_batch_loop(close, fast, slow, rsi_p, buy_below, sell_above, out):
+    for k in _prange(out.shape[0]):
+        _smarsi_fused(close, fast[k], slow[k], rsi_p[k], buy_below[k], sell_above[k], out[k])
+
+
+def _scalping_batch_loop(close, volume, ema_fast, ema_slow, rsi_p, overbought, oversold, vol_window, out):
+    for k in _prange(out.shape[0]):
+        _scalping_fused(close, volume, ema_fast[k], ema_slow[k], rsi_p[k], overbought[k], oversold[k],
+                        vol_window[k], out[k])
+
+
+# Names the batch loops call; rebound to the compiled versions by _jit()
+_prange = range
+_smarsi_fused = _smarsi_loop
+_scalping_fused = _scalping_loop
+
+
+def _jit(name: str):
+    """The numba-compiled kernel `name` (compiled once per process, cached on disk by numba)."""
+    global _prange, _smarsi_fused, _scalping_fused
+    if not _jitted:
+        numba = _load_numba()
+        _prange = numba.prange
+        _jitted['smarsi'] = _smarsi_fused = numba.njit(cache=True, nogil=True)(_smarsi_loop)
+        _jitted['scalping'] = _scalping_fused = numba.njit(cache=True, nogil=True)(_scalping_loop)
+        _jitted['smarsi_batch'] = numba.njit(cache=True, parallel=True)(_smarsi_batch_loop)
+        _jitted['scalping_batch'] = numba.njit(cache=True, parallel=True)(_scalping_batch_loop)
+    return _jitted[name]
+
+
+# --- public entry points ---
+
+def smarsi_signals(close, params: Dict[str, Any], backend: str = "auto") -> np.ndarray:
+    """SMARSI.generate_signals() as an int8 array."""
+    close = _contiguous(close)
+    args = _args(params, SMARSI_DEFAULTS)
+    if resolve_backend(backend) == "numba":
+        out = np.zeros(len(close), dtype=np.int8)
+        _jit('smarsi')(close, int(args[0]), int(args[1]), int(args[2]), float(args[3]), float(args[4]), out)
+        return out
+    return _smarsi_numpy(_Memo(close), *args)
+
+
+def scalping_signals(close, volume, params: Dict[str, Any], backend: str = "auto") -> np.ndarray:
+    """ScalpingStrategy.generate_signals() as an int8 array."""
+    close, volume = _contiguous(close), _contiguous(volume)
+    args = _args(params, SCALPING_DEFAULTS)
+    if resolve_backend(backend) == "numba":
+        out = np.zeros(len(close), dtype=np.int8)
+        _jit('scalping')(close, volume, int(args[0]), int(args[1]), int(args[2]), float(args[3]),
+                         float(args[4]), int(args[5]), out)
+        return out
+    return _scalping_numpy(_Memo(close, volume), *args)
+
+
+def _columns(param_sets: Sequence[Dict[str, Any]], defaults: Dict[str, Any]) -> List[np.ndarray]:
+    """One float64 array per parameter, in `defaults` order (window columns are cast by the caller)."""
+    return [np.array([p.get(key, default) for p in param_sets], dtype=np.float64) for key, default in defaults.items()]
+
+
+def smarsi_batch(close, param_sets: Sequence[Dict[str, Any]], backend: str = "auto") -> np.ndarray:
+    """(len(param_sets), len(close)) int8 signals, row k for param_sets[k]."""
+    close = _contiguous(close)
+    out = np.zeros((len(param_sets), len(close)), dtype=np.int8)
+    if resolve_backend(backend) == "numba":
+        fast, slow, rsi_p, buy_below, sell_above = _columns(param_sets, SMARSI_DEFAULTS)
+        _jit('smarsi_batch')(close, fast.astype(np.int64), slow.astype(np.int64), rsi_p.astype(np.int64),
+                             buy_below, sell_above, out)
+        return out
+    memo = _Memo(close)
+    for k, params in enumerate(param_sets):
+        out[k] = _smarsi_numpy(memo, *_args(params, SMARSI_DEFAULTS))
+    return out
+
+
+def scalping_batch(close, volume, param_sets: Sequence[Dict[str, Any]], backend: str = "auto") -> np.ndarray:
+    """(len(param_sets), len(close)) int8 signals, row k for param_sets[k]."""
+    close, volume = _contiguous(close), _contiguous(volume)
+    out = np.zeros((len(param_sets), len(close)), dtype=np.int8)
+    if resolve_backend(backend) == "numba":
+        ema_fast, ema_slow, rsi_p, overbought, oversold, vol_window = _columns(param_sets, SCALPING_DEFAULTS)
+        _jit('scalping_batch')(close, volume, ema_fast.astype(np.int64), ema_slow.astype(np.int64),
+                               rsi_p.astype(np.int64), overbought, oversold, vol_window.astype(np.int64), out)
+        return out
+    memo = _Memo(close, volume)
+    for k, params in enumerate(param_sets):
+        out[k] = _scalping_numpy(memo, *_args(params, SCALPING_DEFAULTS))
+    return out
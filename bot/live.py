@@ -1,6 +1,84 @@
 # bot/live.py
-import time
-from bot.data import DataFetcher
+import asyncio
+from bot.data import AsyncLiveDataSource
+from bot.strategy import get_strategy
+from bot.risk import RiskManager
+from bot.utils import timeframe_to_ms
+from bot.metrics import RunningMetrics
+from bot.scheduler import CandleScheduler
+from bot.state_store import open_store, import_legacy_paper_state
+
+LEGACY_PAPER_STATE = "artifacts/paper_state.txt"
+
+
+class StrategyFeed:
+    """
+    One strategy instance for one symbol, driven by a runner that polls recent
+    candles: the first poll warms it up on the whole history, later polls
+    step() only the candles newer than the last one seen.
+    """
+    def __init__(self, strategy, timeframe: str):
+        self.strategy = strategy
+        strategy.base_timeframe = strategy.base_timeframe or timeframe
+        self.last_ts = None
+
+    def update(self, candles) -> int:
+        """`candles`: closed candles oldest first, dicts with timestamp (ms), open, high, low, close, volume."""
+        if not candles:
+            return 0
+        if self.last_ts is None:
+            import pandas as pd
+            signal = self.strategy.warm_up(pd.DataFrame(candles))
+        else:
+            signal = 0
+            for candle in candles:
+                if candle["timestamp"] > self.last_ts:
+                    signal = self.strategy.step(candle)
+        self.last_ts = max(self.last_ts or 0, int(candles[-1]["timestamp"]))
+        return signal
+
+
+class RunnerPosition:
+    """
+    The position of a single-market live runner, kept in its StateStore: seeded
+    from store.recover() at start-up, with stop-loss / take-profit re-derived
+    from the entry price (risk.stops), and updated by record() after each order.
+    """
+    def __init__(self, store, symbol: str, risk: RiskManager):
+        self.store = store
+        self.symbol = symbol
+        self.risk = risk
+        self._load()
+
+    def _load(self):
+        pos = self.store.recover()["positions"].get(self.symbol) or {}
+        self.size = float(pos.get("size") or 0.0)
+        self.entry_price = pos.get("entry_price")
+        # (sl, tp) while long; exits are watched on candles rather than resting at the venue
+        self.exits = self.risk.stops(self.entry_price) if self.size > 0 and self.entry_price else None
+
+    def record(self, result, price: float, amount: float = None):
+        """
+        Journal an order result. An accepted order the venue answered without
+        fills (market orders still settling, dry runs) is taken as filled:
+        `amount` (default: result.filled or result.amount) at `price`.
+        """
+        self.store.record_order(result)
+        if result.ok and not result.fills:
+            amount = amount or result.filled or result.amount
+            if result.side == "buy":
+                size, entry = self.size + amount, price
+            else:
+                size, entry = max(0.0, self.size - amount), self.entry_price
+            self.store.record_position(self.symbol, size, entry if size > 0 else None)
+        self._load()
+
+    def exit_hit(self, candle) -> bool:
+        """True if `candle` (high/low) touched the open position's stop-loss or take-profit."""
+        if self.exits is None:
+            return False
+        sl, tp = self.exits
+        return candle["low"] <= sl or candle["high"] >= tp
 
 
 class TradingLoop:
@@ -8,11 +86,11 @@ class TradingLoop:
         self.broker = broker
         self.cfg = cfg
         self.history = cfg["paper"].get("candles_history", 100)
-        self.poll_seconds = cfg["paper"].get("poll_seconds", 60)
+        # Both modes cycle once per closed candle, settle_ms after the close
+        settle_ms = (cfg.get("scheduler") or {}).get("settle_ms", cfg["paper"].get("settle_ms", 2000))
+        self.scheduler = CandleScheduler(cfg["market"]["timeframe"], settle_ms, name="LIVE")
         self.symbols = cfg["market"]["symbols"]
-
-        # Use the DataFetcher wrapper that links to the broker's exchange
-        self.ds = DataFetcher(broker, cfg)
+        self.use_async = cfg["paper"].get("async", False)
 
     def run_forever(self):
         # Test connection first
@@ -25,21 +103,179 @@ class TradingLoop:
 
         print(f"Starting live trading loop for symbols: {self.symbols}")
 
-        while True:
-            try:
-                all_candles = self.ds.get_all_candles(limit=self.history)
-                for symbol, candles in all_candles.items():
-                    if candles is not None and len(candles) > 0:
-                        last_candle = candles.iloc[-1] if hasattr(candles, "iloc") else candles[-1]
-                        print(f"[{symbol}] Last candle: {last_candle}")
-
-                        # TODO: implement your SMA/RSI or other strategy logic here
-                        # Example:
-                        # signal = self.calculate_signal(candles)
-                        # self.execute_signal(symbol, signal)
-                time.sleep(self.poll_seconds)
-            except Exception as e:
-                print("[LIVE ERROR]", e)
-                time.sleep(5)
-
-    # Optional: add calculate_signal or execute_signal here
+        # Both modes share one path (strategies, execute_signal, journaling); paper.async
+        # only decides whether the symbols of a cycle run concurrently or one after another
+        asyncio.run(self.run_async(concurrent=self.use_async))
+
+    # --- trading cycle: one per candle close, all symbols concurrently with paper.async ---
+
+    async def run_async(self, concurrent: bool = True):
+        await self.setup_async()
+
+        try:
+            while True:
+                tick = await self.scheduler.wait_async()
+                # Each symbol runs fetch -> signal -> order on its own; a slow or
+                # failing symbol only delays itself, bounded by one candle period.
+                if concurrent:
+                    results = await asyncio.gather(*(self._bounded(sym, tick) for sym in self.symbols))
+                else:
+                    results = [await self._bounded(sym, tick) for sym in self.symbols]
+                for sym, res in zip(self.symbols, results):
+                    if isinstance(res, Exception):
+                        print(f"[LIVE ERROR] {sym}: {type(res).__name__} {res}")
+                tick.mark("cycle")
+                self.scheduler.report(tick)
+                self._update_metrics()
+        finally:
+            await self.source.close()
+            self.store.close()
+
+    async def _bounded(self, symbol: str, tick):
+        """_process_symbol limited to one candle period; returns its exception instead of raising."""
+        try:
+            await asyncio.wait_for(self._process_symbol(symbol, tick), timeout=self.step_ms / 1000)
+        except Exception as e:
+            return e
+
+    async def setup_async(self, source=None):
+        """Everything run_async() needs before its first cycle; `source` replaces AsyncLiveDataSource (benchmarks)."""
+        self.step_ms = timeframe_to_ms(self.cfg["market"]["timeframe"])
+        self.paper = self.cfg["paper"].get("enabled", True)
+        order_amount = self.cfg["paper"].get("order_amount", 0.001)
+        self.order_amount = float(order_amount) if order_amount is not None else None
+        self.risk = RiskManager(self.cfg.get("risk", {}))
+        # Paper fills go through the broker's PaperBroker (same engine as backtests)
+        self.paper_broker = getattr(self.broker, "paper", None)
+        self.source = source or AsyncLiveDataSource(self.cfg)
+        strategy_cls = get_strategy(self.cfg["strategy"]["name"])
+        # One strategy instance per symbol: streaming indicator state is per series
+        self.strategies = {sym: strategy_cls(self.cfg["strategy"].get("params", {})) for sym in self.symbols}
+        for strat in self.strategies.values():
+            strat.base_timeframe = strat.base_timeframe or self.cfg["market"]["timeframe"]
+        self.last_ts = {sym: None for sym in self.symbols}
+        self.positions = {sym: 0.0 for sym in self.symbols}
+        self.last_price = {}
+        # Paper performance, updated in O(1) per cycle
+        self.metrics = RunningMetrics(self.cfg["market"]["timeframe"])
+        self._fills_seen = 0
+        self._fills_journaled = 0
+        self._entry_price = {}
+        # Orders, fills, positions and equity are journaled so a restart resumes where we stopped
+        self.store = open_store(self.cfg, "paper" if self.paper else "live")
+        self._restore_state()
+        if self.source.markets is not None:
+            # Load lot sizes now (from disk, or one fetch) rather than inside the first order
+            await asyncio.to_thread(self.source.markets.all)
+
+    def _restore_state(self):
+        import_legacy_paper_state(self.store, LEGACY_PAPER_STATE, self.symbols[0])
+        state = self.store.recover()
+        for sym, pos in state["positions"].items():
+            if sym in self.positions and pos["size"]:
+                self.positions[sym] = pos["size"]
+                if pos.get("entry_price"):
+                    self._entry_price[sym] = pos["entry_price"]
+        self.last_price.update({s: p for s, p in state["last_price"].items() if s in self.positions})
+        if self.paper_broker is not None and state["cash"] is not None:
+            # protective orders don't survive a restart: re-place them from the entry price
+            exits = {sym: self.risk.stops(entry)[::-1] for sym, entry in self._entry_price.items()}
+            self.paper_broker.restore(state["cash"], {s: p for s, p in self.positions.items() if p}, exits)
+            self._fills_seen = self._fills_journaled = len(self.paper_broker.fills)
+        held = {s: p for s, p in self.positions.items() if p}
+        print(f"[LIVE] resumed state: cash {state['cash']} positions {held or 'flat'}")
+
+    def _journal_fills(self):
+        """Queue paper fills not yet journaled (non-blocking; committed by the store's writer)."""
+        if self.paper_broker is None:
+            return
+        for fill in self.paper_broker.fills[self._fills_journaled:]:
+            self.store.record_fill(fill)
+        self._fills_journaled = len(self.paper_broker.fills)
+
+    def _update_metrics(self):
+        if self.paper_broker is None or not self.last_price:
+            return
+        for fill in self.paper_broker.fills[self._fills_seen:]:
+            sym, fee = fill['symbol'], self.paper_broker.fee_pct
+            if fill['side'] == "buy":
+                self._entry_price[sym] = fill['price']
+                self.metrics.record_trade(fill['price'], fill['size'])
+            else:
+                entry = self._entry_price.get(sym, fill['price'])
+                pnl = fill['size'] * (fill['price'] * (1 - fee) - entry * (1 + fee))
+                self.metrics.record_trade(fill['price'], fill['size'], pnl)
+        self._fills_seen = len(self.paper_broker.fills)
+        equity = self.paper_broker.mark_to_market(self.last_price)
+        self.store.record_equity(cash=self.paper_broker.equity, equity=equity, prices=self.last_price)
+        self.metrics.update(equity, exposed=any(p > 0 for p in self.positions.values()))
+        m = self.metrics.snapshot()
+        print(f"[LIVE] equity {m['final_equity']:.2f} return {m['total_return_pct']:.2f}% "
+              f"max dd {m['max_drawdown_pct']:.2f}% trades {m['num_trades']}")
+
+    def _entry_amount(self, symbol: str, price: float) -> float:
+        """paper.order_amount, or a risk-sized entry when it is null; rounded to the market's lot step."""
+        market = self.source.markets.get(symbol) if self.source.markets is not None else None
+        if self.order_amount is None:
+            equity = self.paper_broker.equity if self.paper_broker is not None else 0.0
+            return self.risk.position_size(equity, price, market)
+        return market.round_amount(self.order_amount, price) if market else self.order_amount
+
+    async def _process_symbol(self, symbol: str, tick):
+        candles = await self.source.get_recent_candles(symbol, limit=self.history)
+        if candles is None or len(candles) == 0:
+            return
+        # Drop the candle that is still forming
+        closed = candles[candles['timestamp'] + tick.step_ms <= tick.close_ms]
+        if len(closed) == 0:
+            return
+
+        strat = self.strategies[symbol]
+        last_ts = self.last_ts[symbol]
+        if last_ts is None:
+            signal = strat.warm_up(closed)
+        else:
+            new = closed[closed['timestamp'] > last_ts]
+            if len(new) == 0:
+                return
+            signal = 0
+            for row in new.itertuples(index=False):
+                if self.paper and self.paper_broker is not None:
+                    for fill in self.paper_broker.process_bar(row.high, row.low, row.open, symbol=symbol, ts=row.timestamp):
+                        print(f"[PAPER] {fill['type']} {fill['side'].upper()} {fill['size']} {symbol} at {fill['price']}")
+                        self.positions[symbol] = self.paper_broker.position(symbol)
+                signal = strat.step(row._asdict())
+            self._journal_fills()
+        self.last_ts[symbol] = int(closed['timestamp'].iloc[-1])
+
+        price = float(closed['close'].iloc[-1])
+        self.last_price[symbol] = price
+        print(f"[{symbol}] signal: {signal} last close: {price}")
+        if await self.execute_signal(symbol, signal, price):
+            tick.mark(f"{symbol} order")
+
+    async def execute_signal(self, symbol: str, signal: int, price: float):
+        position = self.positions[symbol]
+        if signal == 1 and position == 0.0:
+            side, amount = "buy", self._entry_amount(symbol, price)
+            if amount <= 0:
+                print(f"[LIVE] {symbol}: entry size below the market minimum, skipped")
+                return
+        elif signal == -1 and position > 0.0:
+            side, amount = "sell", position
+        else:
+            return
+
+        if self.paper or self.source.exchange is None:
+            if self.paper_broker is not None:
+                sl, tp = self.risk.stops(price) if side == "buy" else (None, None)
+                self.paper_broker.market(side, price, amount, tp=tp, sl=sl, symbol=symbol)
+                self._journal_fills()
+            print(f"[PAPER] {side.upper()} {amount} {symbol} at {price}")
+        else:
+            res = await self.source.create_order(symbol, side, amount)
+            print(f"[TRADE] {side.upper()} {amount} {symbol}: {res}")
+        self.positions[symbol] = amount if side == "buy" else 0.0
+        if self.paper_broker is None or not self.paper:
+            self.store.record_position(symbol, self.positions[symbol], price if side == "buy" else None)
+        return True
@@ -0,0 +1,326 @@
+# bot/markets.py
+"""
+Market metadata (lot min/step, tick size, precision, fees) per venue, loaded
+once per session instead of on every order:
+
+    cache = market_cache("bitvavo", fetch=adapter.get_markets, parse=from_bitvavo)
+    info = cache.get("BTC-EUR")
+    amount = info.round_amount(0.0012345)
+
+Each venue's raw market list is kept in <cache_dir>/<name>.json. A file older
+than the TTL is still used, and a background thread fetches a fresh copy;
+only a session with no file at all blocks on the first fetch.
+"""
+import asyncio
+import json
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from .utils import ensure_dir
+
+DEFAULT_AMOUNT_STEP = 1e-6  # what RiskManager truncated to before market metadata existed
+RETRY_SECONDS = 300         # wait after a failed fetch before trying again
+
+
+@dataclass
+class MarketInfo:
+    symbol: str
+    base: str = ""
+    quote: str = ""
+    amount_min: float = 0.0
+    amount_step: float = DEFAULT_AMOUNT_STEP
+    price_tick: float = 0.0                # 0 = unknown, prices are sent as given
+    min_notional: float = 0.0              # minimum amount * price
+    maker_fee: Optional[float] = None      # fractions, e.g. 0.0015
+    taker_fee: Optional[float] = None
+
+    @property
+    def amount_precision(self) -> int:
+        return _decimals(self.amount_step)
+
+    @property
+    def price_precision(self) -> Optional[int]:
+        return _decimals(self.price_tick) if self.price_tick else None
+
+    def round_amount(self, amount: float, price: Optional[float] = None) -> float:
+        """Round down to the lot step; 0 when below the venue minimum (or min notional, given a price)."""
+        if amount <= 0:
+            return 0.0
+        rounded = round(math.floor(amount / self.amount_step + 1e-9) * self.amount_step, self.amount_precision)
+        if rounded < self.amount_min or (price and rounded * price < self.min_notional):
+            return 0.0
+        return rounded
+
+    def round_amounts(self, amounts: np.ndarray, prices: Optional[np.ndarray] = None) -> np.ndarray:
+        """Vectorized round_amount."""
+        amounts = np.asarray(amounts, dtype=np.float64)
+        rounded = np.round(np.floor(amounts / self.amount_step + 1e-9) * self.amount_step, self.amount_precision)
+        too_small = rounded < self.amount_min
+        if prices is not None and self.min_notional:
+            too_small |= rounded * np.asarray(prices, dtype=np.float64) < self.min_notional
+        return np.where(too_small | (amounts <= 0), 0.0, rounded)
+
+    def round_price(self, price: float) -> float:
+        """Nearest tick (unchanged when the tick size is unknown)."""
+        if not self.price_tick:
+            return price
+        return round(round(price / self.price_tick) * self.price_tick, self.price_precision)
+
+
+def _decimals(step: float) -> int:
+    """Decimal places of a step size: 0.01 -> 2, 0.005 -> 3, 1 -> 0."""
+    if step <= 0:
+        return 8
+    return max(0, -Decimal(str(step)).normalize().as_tuple().exponent)
+
+
+def format_decimal(value: float, decimals: Optional[int] = None) -> str:
+    """Plain decimal string for an order field: never "1e-05", no float noise past `decimals`."""
+    if decimals is not None:
+        return f"{value:.{decimals}f}"
+    return np.format_float_positional(float(value), trim='-')
+
+
+def _float(value, default: float = 0.0) -> float:
+    try:
+        return float(value) if value is not None and value != "" else default
+    except (TypeError, ValueError):
+        return default
+
+
+# --- venue market rows -> MarketInfo ---
+
+CCXT_DECIMAL_PLACES = 2  # ccxt precisionMode constant; most exchanges use TICK_SIZE (4)
+
+
+def from_ccxt(m: Dict[str, Any], precision_mode: int = 4) -> MarketInfo:
+    """ccxt unified market; `precision` holds step sizes, or decimal places in DECIMAL_PLACES mode."""
+    precision = m.get('precision') or {}
+    limits = m.get('limits') or {}
+
+    def step(value, default):
+        if value is None:
+            return default
+        return 10.0 ** -float(value) if precision_mode == CCXT_DECIMAL_PLACES else float(value)
+
+    return MarketInfo(
+        symbol=m['symbol'], base=m.get('base', ''), quote=m.get('quote', ''),
+        amount_min=_float((limits.get('amount') or {}).get('min')),
+        amount_step=step(precision.get('amount'), DEFAULT_AMOUNT_STEP),
+        price_tick=step(precision.get('price'), 0.0),
+        min_notional=_float((limits.get('cost') or {}).get('min')),
+        maker_fee=m.get('maker'), taker_fee=m.get('taker'),
+    )
+
+
+def from_bitvavo(m: Dict[str, Any]) -> MarketInfo:
+    """Row of Bitvavo's public GET /markets."""
+    decimals = m.get('quantityDecimals')
+    return MarketInfo(
+        symbol=m['market'], base=m.get('base', ''), quote=m.get('quote', ''),
+        amount_min=_float(m.get('minOrderInBaseAsset')),
+        amount_step=10.0 ** -int(decimals) if decimals is not None else 1e-8,
+        price_tick=_float(m.get('tickSize')),
+        min_notional=_float(m.get('minOrderInQuoteAsset')),
+    )
+
+
+def from_coinbase(p: Dict[str, Any]) -> MarketInfo:
+    """Coinbase Advanced Trade product (GET /brokerage/products)."""
+    return MarketInfo(
+        symbol=p['product_id'], base=p.get('base_currency_id', ''), quote=p.get('quote_currency_id', ''),
+        amount_min=_float(p.get('base_min_size')),
+        amount_step=_float(p.get('base_increment'), DEFAULT_AMOUNT_STEP),
+        price_tick=_float(p.get('price_increment') or p.get('quote_increment')),
+        min_notional=_float(p.get('quote_min_size')),
+    )
+
+
+def from_mt5(s: Dict[str, Any]) -> MarketInfo:
+    """MetaTrader5 SymbolInfo as a dict (mt5_symbol_rows()); amounts are lots."""
+    return MarketInfo(
+        symbol=s['name'], base=s.get('currency_base', ''), quote=s.get('currency_profit', ''),
+        amount_min=_float(s.get('volume_min'), 0.01),
+        amount_step=_float(s.get('volume_step'), 0.01),
+        price_tick=_float(s.get('trade_tick_size')) or (10.0 ** -int(s['digits']) if 'digits' in s else 0.0),
+    )
+
+
+MT5_FIELDS = ("name", "currency_base", "currency_profit", "volume_min", "volume_step", "volume_max",
+              "trade_tick_size", "digits")
+
+
+def mt5_symbol_rows(mt5) -> List[Dict[str, Any]]:
+    """All symbols of the connected terminal, reduced to the fields from_mt5() reads."""
+    return [{f: getattr(s, f, None) for f in MT5_FIELDS} for s in mt5.symbols_get() or ()]
+
+
+class MarketCache:
+    """
+    Parsed market metadata for one venue. `fetch` returns the venue's raw
+    market rows (JSON-serializable dicts), `parse` turns one into a MarketInfo.
+    `seed` rows are used only when there is no file and the fetch fails.
+    """
+    def __init__(self, name: str, fetch: Callable[[], List[Dict[str, Any]]], parse: Callable[[Dict[str, Any]], MarketInfo],
+                 cache_dir: str = "data/markets", ttl_seconds: float = 86400.0, seed: Optional[List[Dict[str, Any]]] = None):
+        self.name = name
+        self.fetch = fetch
+        self.parse = parse
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.seed = seed
+        self.fetched_at = 0.0
+        self._raw: Optional[List[Dict[str, Any]]] = None
+        self._markets: Dict[str, MarketInfo] = {}
+        self._lock = threading.Lock()
+        self._refreshing: Optional[threading.Thread] = None
+        self._retry_at = 0.0
+
+    @property
+    def path(self) -> str:
+        safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in self.name)
+        return os.path.join(self.cache_dir, f"{safe_name}.json")
+
+    @property
+    def stale(self) -> bool:
+        return time.time() - self.fetched_at > self.ttl_seconds
+
+    def raw(self) -> List[Dict[str, Any]]:
+        """The venue's market rows as fetched (what ccxt's fetch_markets returns)."""
+        self._ensure()
+        return self._raw
+
+    def get(self, symbol: str) -> Optional[MarketInfo]:
+        self._ensure()
+        return self._markets.get(symbol)
+
+    def all(self) -> Dict[str, MarketInfo]:
+        self._ensure()
+        return dict(self._markets)
+
+    def refresh(self) -> bool:
+        """Fetch now (blocking). Keeps the current data if the fetch fails."""
+        try:
+            rows = list(self.fetch())
+        except Exception as e:
+            print(f"[MARKETS] {self.name}: fetch failed: {type(e).__name__} {e}")
+            self._retry_at = time.time() + RETRY_SECONDS
+            return False
+        self._set(rows, time.time())
+        self._save()
+        return True
+
+    def refresh_async(self) -> threading.Thread:
+        """Refresh in a daemon thread unless one is already running."""
+        with self._lock:
+            if self._refreshing is None or not self._refreshing.is_alive():
+                self._refreshing = threading.Thread(target=self.refresh, name=f"markets-{self.name}", daemon=True)
+                self._refreshing.start()
+            return self._refreshing
+
+    def _ensure(self):
+        if self._raw is None:
+            with self._lock:
+                if self._raw is None:
+                    self._load()
+            if self._raw is None and not self.refresh():
+                self._set(list(self.seed or []), 0.0)
+                return
+        if self.stale and time.time() >= self._retry_at:
+            self.refresh_async()
+
+    def _parse_all(self, rows: List[Dict[str, Any]]) -> Dict[str, MarketInfo]:
+        markets = {}
+        for row in rows:
+            try:
+                info = self.parse(row)
+            except (KeyError, TypeError, ValueError):
+                continue  # a malformed row only loses that market
+            markets[info.symbol] = info
+        return markets
+
+    def _set(self, rows: List[Dict[str, Any]], fetched_at: float):
+        markets = self._parse_all(rows)
+        with self._lock:
+            self._raw, self._markets, self.fetched_at = rows, markets, fetched_at
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                doc = json.load(f)
+        except (OSError, ValueError):
+            return
+        rows = doc.get("markets") or []
+        self._raw, self._markets, self.fetched_at = rows, self._parse_all(rows), float(doc.get("fetched_at", 0))
+
+    def _save(self):
+        try:
+            ensure_dir(self.cache_dir)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({"fetched_at": self.fetched_at, "markets": self._raw}, f, default=str)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"[MARKETS] {self.name}: could not write {self.path}: {e}")
+
+
+# Process-wide caches, one per venue name
+_options: Dict[str, Any] = {"cache_dir": "data/markets", "ttl_seconds": 86400.0}
+_caches: Dict[str, MarketCache] = {}
+_caches_lock = threading.Lock()
+
+
+def configure(cache_dir: str = "data/markets", ttl_hours: float = 24.0):
+    """Set where and for how long caches created from now on keep their data (config.yaml `markets`)."""
+    _options.update(cache_dir=cache_dir, ttl_seconds=float(ttl_hours) * 3600)
+
+
+def market_cache(name: str, fetch: Callable[[], List[Dict[str, Any]]], parse: Callable[[Dict[str, Any]], MarketInfo],
+                 seed: Optional[List[Dict[str, Any]]] = None) -> MarketCache:
+    """The shared cache for venue `name`, created on first request."""
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = _caches[name] = MarketCache(name, fetch, parse, seed=seed, **_options)
+        return cache
+
+
+def install_ccxt_markets(exchange, name: Optional[str] = None, seed: Optional[List[Dict[str, Any]]] = None) -> MarketCache:
+    """
+    Serve a ccxt exchange's fetch_markets() from the shared cache, so
+    load_markets() costs no request after the first session. Works for sync
+    and async_support exchanges (an async one is fetched through a sync twin).
+    """
+    name = name or exchange.id
+    fetch = exchange.fetch_markets
+    if asyncio.iscoroutinefunction(fetch):
+        fetch = _sync_twin_fetch(exchange)
+    mode = getattr(exchange, 'precisionMode', 4)
+    cache = market_cache(name, fetch, lambda m: from_ccxt(m, mode), seed=seed)
+
+    if asyncio.iscoroutinefunction(exchange.fetch_markets):
+        async def fetch_markets(params={}):
+            return await asyncio.to_thread(cache.raw)
+    else:
+        def fetch_markets(params={}):
+            return cache.raw()
+    exchange.fetch_markets = fetch_markets
+    return cache
+
+
+def _sync_twin_fetch(exchange):
+    def fetch():
+        from .data import load_ccxt
+        ccxt = load_ccxt()
+        if ccxt is None:
+            raise RuntimeError("ccxt not installed")
+        return getattr(ccxt, exchange.id)({'apiKey': exchange.apiKey, 'secret': exchange.secret,
+                                           'password': exchange.password}).fetch_markets()
+    return fetch
@@ -0,0 +1,246 @@
+# bot/metrics.py
+from typing import Dict, Any, Optional, Union
+import math
+import numpy as np
+import pandas as pd
+from .utils import timeframe_to_ms
+
+YEAR_MS = 365 * 24 * 3_600_000  # crypto trades around the clock
+
+
+def periods_per_year(timeframe: Union[str, int]) -> float:
+    """Bars per year for a timeframe string ("1m", "4h") or a bar length in ms."""
+    step = timeframe_to_ms(timeframe) if isinstance(timeframe, str) else int(timeframe)
+    return YEAR_MS / step
+
+
+def infer_timeframe_ms(timestamps: np.ndarray, default: str = "1m") -> int:
+    """Typical bar length of a ms timestamp column (median spacing, so gaps don't skew it)."""
+    ts = np.asarray(timestamps, dtype=np.int64)
+    steps = np.diff(ts)
+    steps = steps[steps > 0]
+    return int(np.median(steps)) if len(steps) else timeframe_to_ms(default)
+
+
+def drawdown(ec: np.ndarray):
+    """Per-bar drawdown fraction and bars since the last equity peak."""
+    ec = np.asarray(ec, dtype=np.float64)
+    peaks = np.maximum.accumulate(ec)
+    dd = np.where(peaks > 0, (peaks - ec) / np.where(peaks > 0, peaks, 1.0), 0.0)
+    bars = np.arange(len(ec))
+    last_peak = np.maximum.accumulate(np.where(ec >= peaks, bars, 0))
+    return dd, bars - last_peak
+
+
+def round_trips(trades: pd.DataFrame, fee_pct: float = 0.0) -> np.ndarray:
+    """Net PnL per closed long round trip from a buy/sell trade log (per symbol if it has one)."""
+    if trades is None or len(trades) == 0:
+        return np.array([])
+    if 'symbol' in trades.columns and trades['symbol'].nunique() > 1:
+        return np.concatenate([round_trips(g.drop(columns='symbol'), fee_pct) for _, g in trades.groupby('symbol', sort=False)])
+    side = trades['side'].to_numpy()
+    price = trades['price'].to_numpy(dtype=np.float64)
+    size = trades['size'].to_numpy(dtype=np.float64)
+    buys = np.flatnonzero(side == 'buy')
+    sells = np.flatnonzero(side == 'sell')
+    # Each sell closes the most recent buy before it
+    k = np.searchsorted(buys, sells) - 1
+    sells = sells[k >= 0]
+    opener = buys[k[k >= 0]]
+    return price[sells] * size[sells] * (1 - fee_pct) - price[opener] * size[sells] * (1 + fee_pct)
+
+
+def positions_from_trades(trades: pd.DataFrame, timestamps: np.ndarray, start: float = 0.0) -> np.ndarray:
+    """Position size held at the close of each bar, rebuilt from a ts/side/size trade log."""
+    pos = np.zeros(len(timestamps))
+    if trades is not None and len(trades):
+        rows = np.searchsorted(np.asarray(timestamps), trades['ts'].to_numpy())
+        signed = np.where(trades['side'].to_numpy() == 'buy', 1.0, -1.0) * trades['size'].to_numpy(dtype=np.float64)
+        np.add.at(pos, rows, signed)
+    return start + np.cumsum(pos)
+
+
+def compute_metrics(ec: np.ndarray, timeframe: Union[str, int] = "1m", trades: Optional[pd.DataFrame] = None,
+                    positions: Optional[np.ndarray] = None, fee_pct: float = 0.0,
+                    starting_equity: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Metrics for an equity curve sampled once per candle of `timeframe`
+    (a string like "1h" or the bar length in ms); ratios are annualized with it.
+
+    `trades` (ts/side/price/size) enables win rate, profit factor and turnover;
+    `positions` (size held per bar) enables exposure.
+    """
+    ec = np.asarray(ec, dtype=np.float64)
+    ppy = periods_per_year(timeframe)
+    n = len(ec)
+    returns = np.diff(ec) / ec[:-1] if n > 1 else np.array([])
+    total_return = (ec[-1] / ec[0]) - 1 if n > 1 else 0.0
+
+    if len(returns) > 2:
+        mean = returns.mean()
+        sharpe = mean / (returns.std() + 1e-12) * math.sqrt(ppy)
+        downside = math.sqrt(np.mean(np.minimum(returns, 0.0) ** 2))
+        sortino = mean / (downside + 1e-12) * math.sqrt(ppy)
+    else:
+        sharpe = sortino = 0.0
+
+    if n:
+        dd, since_peak = drawdown(ec)
+        max_dd, max_dd_bars = float(dd.max()), int(since_peak.max())
+    else:
+        max_dd, max_dd_bars = 0.0, 0
+    cagr = (ec[-1] / ec[0]) ** (ppy / (n - 1)) - 1 if n > 1 and ec[0] > 0 and ec[-1] > 0 else 0.0
+    calmar = cagr / max_dd if max_dd > 0 else 0.0
+
+    pnl = round_trips(trades, fee_pct)
+    wins, losses = pnl[pnl > 0].sum(), -pnl[pnl < 0].sum()
+    if trades is not None and len(trades) and n:
+        notional = float((trades['price'] * trades['size']).sum())
+        turnover = notional / ec.mean() * ppy / n
+    else:
+        turnover = 0.0
+
+    return {
+        'final_equity': float(ec[-1]) if n else (starting_equity or 0.0),
+        'total_return_pct': float(total_return*100),
+        'sharpe_like': float(sharpe),
+        'sortino': float(sortino),
+        'calmar': float(calmar),
+        'max_drawdown_pct': float(max_dd*100),
+        'max_drawdown_bars': max_dd_bars,
+        'win_rate_pct': float((pnl > 0).mean()*100) if len(pnl) else 0.0,
+        'profit_factor': float(wins / losses) if losses > 0 else (float('inf') if wins > 0 else 0.0),
+        'exposure_pct': float((np.asarray(positions) > 0).mean()*100) if positions is not None and n else 0.0,
+        'turnover': float(turnover),
+        'num_trades': int(len(trades)) if trades is not None else 0,
+    }
+
+
+class RunningMetrics:
+    """
+    Incremental version of compute_metrics for the live loop: update() takes
+    one equity point in O(1); update_many() merges a whole block at once
+    (for streaming backtests). snapshot() returns the same keys.
+    """
+    def __init__(self, timeframe: Union[str, int] = "1m"):
+        self.ppy = periods_per_year(timeframe)
+        self.n = 0
+        self.first = None
+        self.last = None
+        self.peak = -math.inf
+        self.bars_since_peak = 0
+        self.max_dd = 0.0
+        self.max_dd_bars = 0
+        # Return moments (Welford / Chan) and downside second moment
+        self.n_ret = 0
+        self.mean_ret = 0.0
+        self.m2_ret = 0.0
+        self.down_sq = 0.0
+        self.exposed_bars = 0
+        self.trade_pnl_pos = 0.0
+        self.trade_pnl_neg = 0.0
+        self.round_trips = 0
+        self.winning = 0
+        self.notional = 0.0
+        self.equity_sum = 0.0
+        self.num_trades = 0
+
+    def update(self, equity: float, exposed: bool = False):
+        equity = float(equity)
+        if self.last is not None and self.last != 0:
+            r = equity / self.last - 1
+            self.n_ret += 1
+            delta = r - self.mean_ret
+            self.mean_ret += delta / self.n_ret
+            self.m2_ret += delta * (r - self.mean_ret)
+            if r < 0:
+                self.down_sq += r * r
+        if self.first is None:
+            self.first = equity
+        self.last = equity
+        self.n += 1
+        self.equity_sum += equity
+        self.exposed_bars += bool(exposed)
+
+        if equity >= self.peak:
+            self.peak = equity
+            self.bars_since_peak = 0
+        else:
+            self.bars_since_peak += 1
+        dd = (self.peak - equity) / self.peak if self.peak > 0 else 0.0
+        self.max_dd = max(self.max_dd, dd)
+        self.max_dd_bars = max(self.max_dd_bars, self.bars_since_peak)
+
+    def update_many(self, ec: np.ndarray, exposed: Optional[np.ndarray] = None):
+        ec = np.asarray(ec, dtype=np.float64)
+        if not len(ec):
+            return
+        prev = ec if self.last is None else np.concatenate([[self.last], ec])
+        rets = np.diff(prev) / prev[:-1]
+        if len(rets):
+            n_b, mean_b = len(rets), float(rets.mean())
+            m2_b = float(((rets - mean_b) ** 2).sum())
+            delta = mean_b - self.mean_ret
+            total = self.n_ret + n_b
+            self.mean_ret += delta * n_b / total
+            self.m2_ret += m2_b + delta * delta * self.n_ret * n_b / total
+            self.n_ret = total
+            self.down_sq += float((np.minimum(rets, 0.0) ** 2).sum())
+
+        # Drawdown continues from the running peak and its age
+        peaks = np.maximum.accumulate(np.maximum(ec, self.peak))
+        dd = np.where(peaks > 0, (peaks - ec) / np.where(peaks > 0, peaks, 1.0), 0.0)
+        bars = np.arange(1, len(ec) + 1)
+        at_peak = np.where(ec >= peaks, bars, 0)
+        last_peak = np.maximum.accumulate(at_peak)
+        since = np.where(last_peak > 0, bars - last_peak, bars + self.bars_since_peak)
+        self.max_dd = max(self.max_dd, float(dd.max()))
+        self.max_dd_bars = max(self.max_dd_bars, int(since.max()))
+        self.bars_since_peak = int(since[-1])
+        self.peak = float(peaks[-1])
+
+        if self.first is None:
+            self.first = float(ec[0])
+        self.last = float(ec[-1])
+        self.n += len(ec)
+        self.equity_sum += float(ec.sum())
+        if exposed is not None:
+            self.exposed_bars += int(np.count_nonzero(exposed))
+
+    def record_trade(self, price: float, size: float, pnl: Optional[float] = None):
+        """Every fill counts towards turnover; pass `pnl` when the fill closes a round trip."""
+        self.num_trades += 1
+        self.notional += abs(price * size)
+        if pnl is not None:
+            self.round_trips += 1
+            if pnl > 0:
+                self.winning += 1
+                self.trade_pnl_pos += pnl
+            elif pnl < 0:
+                self.trade_pnl_neg -= pnl
+
+    def snapshot(self) -> Dict[str, Any]:
+        n = self.n
+        if self.n_ret > 2:
+            std = math.sqrt(self.m2_ret / self.n_ret)
+            sharpe = self.mean_ret / (std + 1e-12) * math.sqrt(self.ppy)
+            sortino = self.mean_ret / (math.sqrt(self.down_sq / self.n_ret) + 1e-12) * math.sqrt(self.ppy)
+        else:
+            sharpe = sortino = 0.0
+        total_return = self.last / self.first - 1 if n > 1 else 0.0
+        cagr = (self.last / self.first) ** (self.ppy / (n - 1)) - 1 if n > 1 and self.first > 0 and self.last > 0 else 0.0
+        wins, losses = self.trade_pnl_pos, self.trade_pnl_neg
+        return {
+            'final_equity': float(self.last) if n else 0.0,
+            'total_return_pct': float(total_return*100),
+            'sharpe_like': float(sharpe),
+            'sortino': float(sortino),
+            'calmar': float(cagr / self.max_dd) if self.max_dd > 0 else 0.0,
+            'max_drawdown_pct': float(self.max_dd*100),
+            'max_drawdown_bars': int(self.max_dd_bars),
+            'win_rate_pct': float(self.winning / self.round_trips * 100) if self.round_trips else 0.0,
+            'profit_factor': float(wins / losses) if losses > 0 else (float('inf') if wins > 0 else 0.0),
+            'exposure_pct': float(self.exposed_bars / n * 100) if n else 0.0,
+            'turnover': float(self.notional / (self.equity_sum / n) * self.ppy / n) if n else 0.0,
+            'num_trades': int(self.num_trades),
+        }
@@ -0,0 +1,142 @@
+# bot/orders.py
+"""
+Normalized order / fill / balance types and the interface every broker
+adapter implements, so runners can trade any venue the same way:
+
+    broker.submit(OrderRequest("BTC-EUR", "buy", 0.001))
+    broker.submit_many([OrderRequest(...), OrderRequest(...)])
+
+Amounts are always in base units (lots for MT5). A market buy may instead
+give `quote_amount` (spend this much quote currency) on venues that support it.
+Adapters with market metadata (bot/markets.py) round amounts down to the lot
+step and limit prices to the tick before sending.
+"""
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class OrderRequest:
+    symbol: str
+    side: str                              # "buy" / "sell"
+    amount: float = 0.0                    # base units
+    type: str = "market"                   # "market" / "limit"
+    price: Optional[float] = None          # limit price (reference price for paper market orders)
+    quote_amount: Optional[float] = None   # market buys: spend this much quote instead of `amount`
+    client_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+
+
+@dataclass
+class Fill:
+    symbol: str
+    side: str
+    amount: float
+    price: float
+    fee: float = 0.0
+    ts: Optional[int] = None               # ms since epoch
+    order_id: Optional[str] = None
+
+
+@dataclass
+class OrderResult:
+    ok: bool
+    raw: Any = None                        # the venue's response, untouched
+    order_id: Optional[str] = None
+    client_id: Optional[str] = None
+    symbol: Optional[str] = None
+    side: Optional[str] = None
+    status: str = "unknown"                # "filled", "new", "partially_filled", "canceled", "rejected", "dry_run"
+    amount: float = 0.0                    # requested
+    filled: float = 0.0
+    avg_price: Optional[float] = None
+    fills: List[Fill] = field(default_factory=list)
+    error: Optional[str] = None
+    latency_ms: Optional[float] = None
+
+
+@dataclass
+class Balance:
+    asset: str
+    free: float
+    used: float = 0.0
+
+    @property
+    def total(self) -> float:
+        return self.free + self.used
+
+
+def rejected(order: OrderRequest, error: str) -> OrderResult:
+    """Result for an order that was never sent (or failed before the venue answered)."""
+    return OrderResult(ok=False, client_id=order.client_id, symbol=order.symbol, side=order.side,
+                       status="rejected", amount=order.amount, error=error)
+
+
+def field_of(obj: Any, key: str, default: Any = None) -> Any:
+    """Read `key` from a dict or an SDK response object alike."""
+    if obj is None:
+        return default
+    if isinstance(obj, dict):
+        return obj.get(key, default)
+    return getattr(obj, key, default)
+
+
+class BrokerBase:
+    """
+    Common broker interface. Adapters implement submit() (and cancel() /
+    balances() where the venue allows); submit_many() / cancel_many() then
+    run a whole batch concurrently, so N orders take about one round trip
+    instead of N. Adapters with a native batch endpoint override them.
+
+    Batch calls never raise for a single bad order: each result carries
+    ok/error, in the same order as the requests.
+    """
+    batch_workers = 8
+    markets = None  # bot.markets.MarketCache for the venue, when the adapter has one
+
+    def submit(self, order: OrderRequest) -> OrderResult:
+        raise NotImplementedError
+
+    def cancel(self, order_id: str, symbol: Optional[str] = None) -> OrderResult:
+        raise NotImplementedError
+
+    def balances(self) -> Dict[str, Balance]:
+        raise NotImplementedError
+
+    def market_info(self, symbol: str):
+        """bot.markets.MarketInfo for `symbol`, or None without metadata."""
+        return self.markets.get(symbol) if self.markets is not None and symbol else None
+
+    def round_order(self, order: OrderRequest) -> OrderRequest:
+        """`order` with amount and limit price rounded to the market's lot step and tick."""
+        info = self.market_info(order.symbol)
+        if info is None:
+            return order
+        return replace(order,
+                       amount=info.round_amount(order.amount, order.price) if order.amount else order.amount,
+                       price=info.round_price(order.price) if order.price is not None else None)
+
+    def submit_many(self, orders: List[OrderRequest]) -> List[OrderResult]:
+        return self._batch(self.submit, [(o,) for o in orders], rejected)
+
+    def cancel_many(self, order_ids: List[str], symbol: Optional[str] = None) -> List[OrderResult]:
+        return self._batch(self.cancel, [(oid, symbol) for oid in order_ids],
+                           lambda oid, sym, e: OrderResult(ok=False, order_id=oid, symbol=sym, error=e))
+
+    def _batch(self, fn, calls, on_error) -> List[OrderResult]:
+        def run(args):
+            started = time.monotonic()
+            try:
+                res = fn(*args)
+            except Exception as e:
+                res = on_error(*args, f"{type(e).__name__}: {e}")
+            if res.latency_ms is None:
+                res.latency_ms = (time.monotonic() - started) * 1000
+            return res
+
+        if len(calls) <= 1:
+            return [run(c) for c in calls]
+        with ThreadPoolExecutor(max_workers=min(self.batch_workers, len(calls))) as pool:
+            return list(pool.map(run, calls))
@@ -0,0 +1,157 @@
+# bot/portfolio.py
+from typing import Dict, Any, List, Optional
+import numpy as np
+import pandas as pd
+from .risk import RiskManager
+from .strategy import BaseStrategy
+from .backtest import equity_metrics
+from .metrics import infer_timeframe_ms
+
+
+class PortfolioBacktester:
+    """
+    Backtest many symbols against one shared cash balance in a single pass.
+
+    Works on aligned (time x symbol) arrays. Each bar is one vectorized step
+    across all symbols: stop/target exits, signal exits, then entries. Entries
+    are sized with RiskManager from the cash available at the start of the bar
+    and taken in symbol order while cash lasts. Per-symbol cash flows and
+    position changes are written to (time x symbol) arrays, and the equity
+    curves are built from them with cumsum at the end.
+
+    With a single symbol this gives the same trades as Backtester.
+    """
+    def __init__(self, params: Dict[str, Any], strategy: BaseStrategy, risk: RiskManager):
+        self.params = params
+        self.strategy = strategy
+        self.risk = risk
+        self.fee_pct = float(params.get('fee_pct', 0.0005))
+        self.slippage_pct = float(params.get('slippage_pct', 0.0002))
+        self.intrabar_stops = bool(params.get('intrabar_stops', True))
+
+    def run(self, candles: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
+        """Align per-symbol candle frames on timestamp, generate signals and run."""
+        symbols = list(candles)
+        frames = {sym: candles[sym].drop_duplicates('timestamp').set_index('timestamp').sort_index() for sym in symbols}
+        index = frames[symbols[0]].index
+        for sym in symbols[1:]:
+            index = index.union(frames[sym].index)
+
+        close = np.full((len(index), len(symbols)), np.nan)
+        signals = np.zeros((len(index), len(symbols)), dtype=np.int8)
+        ohlc = {col: np.full((len(index), len(symbols)), np.nan) for col in ('open', 'high', 'low')}
+        for j, sym in enumerate(symbols):
+            df = frames[sym]
+            rows = index.get_indexer(df.index)
+            close[rows, j] = df['close'].to_numpy(dtype=np.float64)
+            for col in ohlc:
+                ohlc[col][rows, j] = df[col].to_numpy(dtype=np.float64)
+            sig = self.strategy.generate_signals(df.reset_index())
+            signals[rows, j] = np.nan_to_num(sig.to_numpy(dtype=np.float64)).astype(np.int8)
+
+        return self.run_arrays(close, signals, high=ohlc['high'], low=ohlc['low'], open_=ohlc['open'],
+                               symbols=symbols, timestamps=index.to_numpy())
+
+    def run_arrays(self, close: np.ndarray, signals: np.ndarray, high: Optional[np.ndarray] = None,
+                   low: Optional[np.ndarray] = None, open_: Optional[np.ndarray] = None,
+                   symbols: Optional[List[str]] = None, timestamps: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """
+        close/signals (and optionally open/high/low) are (time x symbol). NaN
+        closes mark bars where a symbol has no data: no trading there, and the
+        position is marked at the last known close.
+        """
+        close = np.asarray(close, dtype=np.float64)
+        signals = np.asarray(signals)
+        T, N = close.shape
+        symbols = symbols or [str(j) for j in range(N)]
+        equity = float(self.params.get('starting_equity', 10000.0))
+        use_stops = self.intrabar_stops and high is not None and low is not None
+        if use_stops and open_ is None:
+            open_ = close
+
+        # Mark-to-market price: last known close per symbol
+        mark = pd.DataFrame(close).ffill().fillna(0.0).to_numpy()
+        tradable = ~np.isnan(close)
+
+        cash = equity
+        pos = np.zeros(N)
+        sl = np.full(N, -np.inf)
+        tp = np.full(N, np.inf)
+        flows = np.zeros((T, N))       # cash in/out per symbol per bar
+        pos_delta = np.zeros((T, N))
+        trades = []
+
+        for t in range(T):
+            held = pos > 0
+            if use_stops and held.any():
+                lo, hi, op = low[t], high[t], open_[t]
+                stop_hit = held & (lo <= sl)
+                target_hit = held & ~stop_hit & (hi >= tp)
+                hit = stop_hit | target_hit
+                if hit.any():
+                    px = np.where(stop_hit, np.minimum(op, sl), np.maximum(op, tp))
+                    cash += self._close(t, np.flatnonzero(hit), px, pos, flows, pos_delta, trades)
+                    held = pos > 0
+
+            sig = signals[t]
+            exits = held & (sig == -1) & tradable[t]
+            if exits.any():
+                px = close[t] * (1 + self.slippage_pct)
+                cash += self._close(t, np.flatnonzero(exits), px, pos, flows, pos_delta, trades)
+
+            entries = np.flatnonzero((pos == 0) & (sig == 1) & tradable[t])
+            if len(entries):
+                px = close[t, entries] * (1 + self.slippage_pct)
+                sizes = self.risk.position_sizes(cash, px)
+                cost = px * sizes * (1 + self.fee_pct)
+                fits = np.cumsum(cost) <= cash
+                entries, px, sizes, cost = entries[fits], px[fits], sizes[fits], cost[fits]
+                taken = sizes > 0
+                entries, px, sizes, cost = entries[taken], px[taken], sizes[taken], cost[taken]
+                if len(entries):
+                    pos[entries] = sizes
+                    flows[t, entries] -= cost
+                    pos_delta[t, entries] += sizes
+                    cash -= cost.sum()
+                    if use_stops:
+                        sl[entries] = px * (1 - self.risk.stop_loss_pct)
+                        tp[entries] = px * (1 + self.risk.take_profit_pct)
+                    trades.extend((t, int(j), 'buy', float(p), float(s)) for j, p, s in zip(entries, px, sizes))
+
+        positions = np.cumsum(pos_delta, axis=0)
+        symbol_pnl = np.cumsum(flows, axis=0) + positions * mark   # per-symbol contribution to equity
+        equity_curve = equity + symbol_pnl.sum(axis=1)
+
+        trades_df = pd.DataFrame(trades, columns=['t', 'symbol', 'side', 'price', 'size'])
+        trades_df['symbol'] = [symbols[j] for j in trades_df['symbol']]
+        if timestamps is not None:
+            trades_df.insert(0, 'ts', np.asarray(timestamps)[trades_df['t'].to_numpy()])
+
+        timeframe = self.params.get('timeframe') or (infer_timeframe_ms(timestamps) if timestamps is not None else "1m")
+        per_symbol = {}
+        counts = trades_df['symbol'].value_counts()
+        for j, sym in enumerate(symbols):
+            per_symbol[sym] = {
+                'pnl': float(symbol_pnl[-1, j]) if T else 0.0,
+                'num_trades': int(counts.get(sym, 0)),
+            }
+
+        return {
+            'metrics': equity_metrics(equity_curve, equity, len(trades_df), timeframe, trades=trades_df,
+                                      positions=(positions > 0).any(axis=1), fee_pct=self.fee_pct),
+            'per_symbol': per_symbol,
+            'equity_curve': equity_curve,
+            'symbol_pnl': symbol_pnl,
+            'trades': trades_df,
+        }
+
+    def _close(self, t, cols, px, pos, flows, pos_delta, trades) -> float:
+        """Sell the whole position in `cols` at `px`; returns the cash received."""
+        px = np.broadcast_to(px, pos.shape)[cols]
+        sizes = pos[cols]
+        proceeds = px * sizes * (1 - self.fee_pct)
+        flows[t, cols] += proceeds
+        pos_delta[t, cols] -= sizes
+        pos[cols] = 0.0
+        trades.extend((t, int(j), 'sell', float(p), float(s)) for j, p, s in zip(cols, px, sizes))
+        return float(proceeds.sum())
@@ -0,0 +1,167 @@
+# bot/resample.py
+"""
+Higher-timeframe OHLCV derived from lower-timeframe candles (e.g. 1m -> 5m,
+15m, 1h, 4h, 1d), so every timeframe comes from one stored series instead
+of a separate exchange fetch, and all of them agree with each other.
+
+- resample(): whole arrays / DataFrames at once (NumPy reduceat per column)
+- align(): higher-timeframe columns on the base index, each base bar seeing
+  only the last *completed* higher bar (no lookahead)
+- Resampler: the same bars maintained incrementally as live candles arrive
+
+Bars are aligned to UTC epoch multiples of the target timeframe, like
+exchange candles. Candle rows are [timestamp(ms, open), open, high, low, close, volume].
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Union, TYPE_CHECKING
+
+import numpy as np
+
+from .candle_store import CANDLE_COLUMNS
+from .utils import timeframe_to_ms
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def _ms(timeframe: Union[str, int]) -> int:
+    """'1h' or a bar length already in ms."""
+    return timeframe if isinstance(timeframe, int) else timeframe_to_ms(timeframe)
+
+
+def _to_frame(arr: np.ndarray) -> "pd.DataFrame":
+    import pandas as pd
+    df = pd.DataFrame(np.asarray(arr), columns=CANDLE_COLUMNS)
+    df['timestamp'] = df['timestamp'].astype(np.int64)
+    return df
+
+
+def _as_array(candles) -> np.ndarray:
+    if hasattr(candles, "columns"):
+        return candles[CANDLE_COLUMNS].to_numpy(dtype=np.float64)
+    return np.asarray(candles, dtype=np.float64).reshape(-1, len(CANDLE_COLUMNS))
+
+
+def resample_array(arr: np.ndarray, timeframe: str, source_timeframe: Union[str, int] = "1m",
+                   include_partial: bool = False) -> np.ndarray:
+    """
+    (n, 6) candles sorted by timestamp -> (m, 6) candles of `timeframe`.
+    The last bucket is dropped unless its final source candle is present
+    (or `include_partial`); gaps inside a bucket are tolerated.
+    """
+    step = _ms(timeframe)
+    src_step = _ms(source_timeframe)
+    if step % src_step:
+        raise ValueError(f"{timeframe} is not a multiple of {source_timeframe}")
+    if not len(arr):
+        return np.empty((0, len(CANDLE_COLUMNS)))
+
+    ts = arr[:, 0]
+    bucket = ts - ts % step
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(arr)] - 1
+
+    out = np.empty((len(starts), len(CANDLE_COLUMNS)))
+    out[:, 0] = bucket[starts]
+    out[:, 1] = arr[starts, 1]
+    out[:, 2] = np.maximum.reduceat(arr[:, 2], starts)
+    out[:, 3] = np.minimum.reduceat(arr[:, 3], starts)
+    out[:, 4] = arr[ends, 4]
+    out[:, 5] = np.add.reduceat(arr[:, 5], starts)
+
+    if not include_partial and ts[-1] + src_step < out[-1, 0] + step:
+        out = out[:-1]
+    return out
+
+
+def resample(candles: Union["pd.DataFrame", np.ndarray], timeframe: str, source_timeframe: Union[str, int] = "1m",
+             include_partial: bool = False):
+    """resample_array() for a DataFrame (returns a DataFrame) or an array (returns an array)."""
+    out = resample_array(_as_array(candles), timeframe, source_timeframe, include_partial)
+    return _to_frame(out) if hasattr(candles, "columns") else out
+
+
+def resample_many(candles, timeframes: Iterable[str], source_timeframe: str = "1m") -> Dict[str, "pd.DataFrame"]:
+    """Several timeframes from the same source candles; the source timeframe itself is passed through."""
+    arr = _as_array(candles)
+    return {tf: _to_frame(arr if tf == source_timeframe else resample_array(arr, tf, source_timeframe))
+            for tf in timeframes}
+
+
+def align(base: "pd.DataFrame", higher: "pd.DataFrame", base_timeframe: Union[str, int], timeframe: str,
+          columns: Sequence[str] = ("open", "high", "low", "close", "volume")) -> "pd.DataFrame":
+    """
+    Columns of `higher` (a `timeframe` frame) on `base`'s index, suffixed with
+    the timeframe ('close_4h'). Each base bar gets the last higher bar that had
+    closed by the base bar's close; NaN before the first one.
+    """
+    import pandas as pd
+    base_close = base['timestamp'].to_numpy(dtype=np.float64) + _ms(base_timeframe)
+    higher_close = higher['timestamp'].to_numpy(dtype=np.float64) + _ms(timeframe)
+    idx = np.searchsorted(higher_close, base_close, side='right') - 1
+    valid = idx >= 0
+    out = {}
+    for col in columns:
+        values = np.full(len(base), np.nan)
+        values[valid] = higher[col].to_numpy(dtype=np.float64)[idx[valid]]
+        out[f"{col}_{timeframe}"] = values
+    return pd.DataFrame(out, index=base.index)
+
+
+class Resampler:
+    """
+    Incremental resample(): feed source candles in time order with update();
+    a higher bar is returned as soon as its last source candle arrives (or,
+    after a gap, when the first candle of a later bucket does).
+    """
+    def __init__(self, timeframes: Iterable[str], source_timeframe: Union[str, int] = "1m"):
+        self.source_timeframe = source_timeframe
+        self.src_step = _ms(source_timeframe)
+        self.steps = {tf: _ms(tf) for tf in timeframes}
+        for tf, step in self.steps.items():
+            if step % self.src_step:
+                raise ValueError(f"{tf} is not a multiple of {source_timeframe}")
+        self._bars: Dict[str, Optional[List[float]]] = {tf: None for tf in self.steps}
+        self.last_ts: Optional[float] = None
+
+    def update(self, candle) -> Dict[str, List[List[float]]]:
+        """One source candle (row or dict) -> {timeframe: [completed bars]} (usually empty)."""
+        if isinstance(candle, dict):
+            row = [float(candle[c]) for c in CANDLE_COLUMNS]
+        else:
+            row = [float(v) for v in candle[:len(CANDLE_COLUMNS)]]
+        ts = row[0]
+        if self.last_ts is not None and ts <= self.last_ts:
+            return {}  # already seen (refetched candle)
+        self.last_ts = ts
+
+        done: Dict[str, List[List[float]]] = {}
+        for tf, step in self.steps.items():
+            bucket = ts - ts % step
+            bar = self._bars[tf]
+            if bar is not None and bar[0] != bucket:
+                done.setdefault(tf, []).append(bar)  # gap: the bucket ended without its last candle
+                bar = None
+            if bar is None:
+                bar = [bucket, row[1], row[2], row[3], row[4], row[5]]
+            else:
+                bar[2] = max(bar[2], row[2])
+                bar[3] = min(bar[3], row[3])
+                bar[4] = row[4]
+                bar[5] += row[5]
+            if ts + self.src_step >= bucket + step:
+                done.setdefault(tf, []).append(bar)
+                bar = None
+            self._bars[tf] = bar
+        return done
+
+    def update_many(self, candles) -> Dict[str, List[List[float]]]:
+        done: Dict[str, List[List[float]]] = {}
+        for row in _as_array(candles):
+            for tf, bars in self.update(row).items():
+                done.setdefault(tf, []).extend(bars)
+        return done
+
+    def current(self, timeframe: str) -> Optional[List[float]]:
+        """The forming bar of `timeframe`, if any."""
+        bar = self._bars[timeframe]
+        return list(bar) if bar is not None else None
@@ -1,6 +1,10 @@
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional, TYPE_CHECKING
 import math
+import numpy as np
+
+if TYPE_CHECKING:
+    from .markets import MarketInfo
 
 class RiskManager:
     def __init__(self, params: Dict[str, Any]):
@@ -8,11 +12,26 @@ class RiskManager:
         self.stop_loss_pct = float(params.get('stop_loss_pct', 0.02))
         self.take_profit_pct = float(params.get('take_profit_pct', 0.04))
 
-    def position_size(self, equity: float, price: float) -> float:
+    def position_size(self, equity: float, price: float, market: Optional["MarketInfo"] = None) -> float:
+        """
+        Base amount for one entry. With `market` (bot/markets.py) it is rounded down
+        to the venue's lot step and is 0 below its minimum order; otherwise it is
+        truncated to 6 dp.
+        """
         dollar_risk = equity * self.max_position_pct
         size = dollar_risk / price
+        if market is not None:
+            return market.round_amount(size, price)
         return math.floor(size * 1e6) / 1e6  # truncate to 6 dp for safety
 
+    def position_sizes(self, equity: float, prices: np.ndarray, market: Optional["MarketInfo"] = None) -> np.ndarray:
+        """Vectorized position_size for several prices against the same equity."""
+        prices = np.asarray(prices, dtype=np.float64)
+        sizes = (equity * self.max_position_pct) / prices
+        if market is not None:
+            return market.round_amounts(sizes, prices)
+        return np.floor(sizes * 1e6) / 1e6
+
     def stops(self, entry_price: float):
         sl = entry_price * (1 - self.stop_loss_pct)
         tp = entry_price * (1 + self.take_profit_pct)
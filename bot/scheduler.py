@@ -0,0 +1,137 @@
+# bot/scheduler.py
+"""
+Wakes live runners once per closed candle instead of sleeping a fixed time
+after each cycle (which drifts and acts on half-formed candles):
+
+    sched = CandleScheduler("1h", settle_ms=2000)
+    for tick in sched:                  # blocks until the next close + settle
+        candles = tick.closed(fetch(), ts=lambda c: c["time"] * 1000)
+        ...signal...
+        tick.mark("signal")
+        ...order...
+        tick.mark("order")
+        sched.report(tick)              # [SCHED] line with latency since the close
+
+Boundaries come from the wall clock (candles are aligned to UTC epoch), but
+every wait is measured on time.monotonic(), so clock adjustments never make a
+cycle fire twice or skip. If a cycle overruns past the next close, the next
+wait returns at once for the latest close; closes in between are counted as
+missed and reported.
+"""
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional
+
+from .utils import timeframe_to_ms, ts_to_str
+
+
+@dataclass
+class Tick:
+    close_ms: int                          # close time of the candle that just completed (= next candle's open)
+    step_ms: int
+    lag_ms: float                          # wake-up time after the close (settle delay + oversleep)
+    missed: int = 0                        # closes skipped since the previous tick
+    marks: Dict[str, float] = field(default_factory=dict)  # label -> ms after the close
+    _mono_close: float = 0.0
+
+    @property
+    def open_ms(self) -> int:
+        """Open time of the candle that just closed."""
+        return self.close_ms - self.step_ms
+
+    def is_closed(self, candle_open_ms: float) -> bool:
+        return candle_open_ms + self.step_ms <= self.close_ms
+
+    def closed(self, candles: Iterable[Any], ts: Callable[[Any], float]) -> List[Any]:
+        """`candles` without the one still forming; `ts` gives a candle's open time in ms."""
+        return [c for c in candles if self.is_closed(ts(c))]
+
+    def mark(self, label: str) -> float:
+        """Record that `label` (e.g. "signal", "order") happened now; returns ms since the close."""
+        ms = (time.monotonic() - self._mono_close) * 1000
+        self.marks[label] = ms
+        return ms
+
+
+class CandleScheduler:
+    def __init__(self, timeframe: str, settle_ms: float = 2000, name: str = "SCHED", latency_window: int = 1000):
+        self.timeframe = timeframe
+        self.step_ms = timeframe_to_ms(timeframe)
+        self.settle_ms = float(settle_ms)
+        self.name = name
+        self.last_close_ms: Optional[int] = None
+        self.ticks = 0
+        self.missed = 0
+        # Last `latency_window` samples per label: a loop running for months keeps constant memory
+        self.latency_window = int(latency_window)
+        self._latency: Dict[str, Deque[float]] = {}
+
+    def __iter__(self):
+        while True:
+            yield self.wait()
+
+    def next_close_ms(self, now_ms: Optional[float] = None) -> int:
+        """First candle close whose settle time is still ahead."""
+        now_ms = time.time() * 1000 if now_ms is None else now_ms
+        return int(((now_ms - self.settle_ms) // self.step_ms + 1) * self.step_ms)
+
+    def seconds_until_next(self) -> float:
+        now_ms = time.time() * 1000
+        latest = (now_ms - self.settle_ms) // self.step_ms * self.step_ms
+        if self.last_close_ms is not None and latest > self.last_close_ms:
+            return 0.0  # overran: a settled close is still unhandled
+        return max(0.0, (self.next_close_ms(now_ms) + self.settle_ms - now_ms) / 1000)
+
+    def wait(self) -> Tick:
+        """Block until the next unhandled candle close + settle delay."""
+        deadline = time.monotonic() + self.seconds_until_next()
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return self._tick()
+            time.sleep(remaining)
+
+    async def wait_async(self) -> Tick:
+        deadline = time.monotonic() + self.seconds_until_next()
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return self._tick()
+            await asyncio.sleep(remaining)
+
+    def _tick(self) -> Tick:
+        mono, now_ms = time.monotonic(), time.time() * 1000
+        close_ms = int((now_ms - self.settle_ms) // self.step_ms * self.step_ms)
+        if self.last_close_ms is not None and close_ms <= self.last_close_ms:
+            # the wall clock stepped back; stay on the candle after the last one handled
+            close_ms = self.last_close_ms + self.step_ms
+        missed = 0
+        if self.last_close_ms is not None:
+            missed = max(0, (close_ms - self.last_close_ms) // self.step_ms - 1)
+        lag_ms = now_ms - close_ms
+        self.last_close_ms = close_ms
+        self.ticks += 1
+        self.missed += missed
+        if missed:
+            print(f"[{self.name}] missed {missed} {self.timeframe} close(s) before {ts_to_str(close_ms)}")
+        return Tick(close_ms, self.step_ms, lag_ms, missed, _mono_close=mono - lag_ms / 1000)
+
+    def report(self, tick: Tick):
+        """Print the cycle's latencies since the close and add them to latency_stats()."""
+        for label, ms in tick.marks.items():
+            self._latency.setdefault(label, deque(maxlen=self.latency_window)).append(ms)
+        marks = ", ".join(f"{label} +{ms:.0f}ms" for label, ms in tick.marks.items())
+        print(f"[{self.name}] {self.timeframe} close {ts_to_str(tick.close_ms)}: woke +{tick.lag_ms:.0f}ms"
+              + (f", {marks}" if marks else ""))
+
+    def latency_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per mark label over the last `latency_window` cycles: count, mean, p50, max (ms after the close)."""
+        import numpy as np
+        out = {}
+        for label, values in self._latency.items():
+            arr = np.asarray(values)
+            out[label] = {"count": len(arr), "mean": float(arr.mean()), "p50": float(np.median(arr)),
+                          "max": float(arr.max())}
+        return out
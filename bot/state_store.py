@@ -0,0 +1,254 @@
+# bot/state_store.py
+"""
+Crash-safe trading state: an append-only journal of orders, fills, positions
+and equity marks in SQLite (WAL mode), so a restarted runner knows its
+positions without asking the venue:
+
+    store = StateStore("data/state/paper.db")
+    state = store.recover()            # latest snapshot + replay of newer events
+    store.record_fill({...})           # returns at once; committed by a writer thread
+    store.record_equity(cash=..., equity=..., prices={...}).result()  # wait until durable
+
+Every record_*() applies the event to the in-memory state and queues it. One
+writer thread commits whatever has queued up in a single transaction (group
+commit: one fsync for the whole batch) and then resolves each event's Future,
+so an event counts as acknowledged only once it is on disk. Every
+`snapshot_every` events the state is written as a snapshot and the events it
+covers are deleted (compaction), keeping recovery to one row plus a short tail.
+"""
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional
+
+from .utils import ensure_dir
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (seq INTEGER PRIMARY KEY, ts REAL NOT NULL, kind TEXT NOT NULL, payload TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS snapshots (seq INTEGER PRIMARY KEY, ts REAL NOT NULL, state TEXT NOT NULL);
+"""
+
+OPEN_STATUSES = ("new", "partially_filled", "unknown")
+
+
+def empty_state() -> Dict[str, Any]:
+    return {"cash": None, "equity": None, "positions": {}, "last_price": {}, "open_orders": {}, "fills": 0}
+
+
+def apply_event(state: Dict[str, Any], kind: str, p: Dict[str, Any]) -> Dict[str, Any]:
+    """Fold one journal event into `state` (used both live and on replay)."""
+    if kind == "fill":
+        sym = p["symbol"]
+        direction = 1 if p["side"] == "buy" else -1
+        pos = state["positions"].setdefault(sym, {"size": 0.0, "entry_price": None})
+        size, price = float(p["size"]), float(p["price"])
+        new_size = pos["size"] + direction * size
+        if abs(new_size) < 1e-12:
+            pos.update(size=0.0, entry_price=None)
+        elif pos["size"] == 0 or (new_size > 0) != (pos["size"] > 0):
+            pos.update(size=new_size, entry_price=price)
+        elif abs(new_size) > abs(pos["size"]):
+            # adding to the position: average the entry
+            pos.update(size=new_size, entry_price=(pos["entry_price"] * abs(pos["size"]) + price * size) / abs(new_size))
+        else:
+            pos["size"] = new_size
+        if state["cash"] is not None:
+            state["cash"] -= direction * size * price + float(p.get("fee", 0.0) or 0.0)
+        state["last_price"][sym] = price
+        state["fills"] += 1
+    elif kind == "position":
+        # absolute position, e.g. reconciled against the venue
+        state["positions"][p["symbol"]] = {"size": float(p["size"]), "entry_price": p.get("entry_price")}
+    elif kind == "equity":
+        for key in ("cash", "equity"):
+            if p.get(key) is not None:
+                state[key] = float(p[key])
+        state["last_price"].update(p.get("prices") or {})
+    elif kind == "order":
+        key = p.get("order_id") or p.get("client_id")
+        if p.get("status") in OPEN_STATUSES:
+            state["open_orders"][key] = p
+        else:
+            state["open_orders"].pop(key, None)
+    return state
+
+
+class StateStore:
+    def __init__(self, path: str = "data/state/trading.db", snapshot_every: int = 1000):
+        self.path = path
+        self.snapshot_every = int(snapshot_every)
+        ensure_dir(os.path.dirname(path) or ".")
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue()
+        self._since_snapshot = 0
+        self.commits = 0
+        self.events_written = 0
+
+        conn = self._connect()
+        self.state, self.seq = self._recover(conn)
+        conn.close()
+
+        self._writer = threading.Thread(target=self._run, name="state-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=FULL")  # a committed batch survives power loss, not just a crash
+        conn.executescript(_SCHEMA)
+        return conn
+
+    # --- recording (any thread; never blocks on disk) ---
+
+    def append(self, kind: str, payload: Dict[str, Any]) -> Future:
+        fut = Future()
+        with self._lock:
+            apply_event(self.state, kind, payload)
+            self.seq += 1
+            self._queue.put(("event", self.seq, kind, json.dumps(payload, default=str), fut))
+            self._since_snapshot += 1
+            if self.snapshot_every and self._since_snapshot >= self.snapshot_every:
+                self._queue_snapshot()
+        return fut
+
+    def record_fill(self, fill: Dict[str, Any]) -> Future:
+        """PaperBroker-style fill dict: symbol, side, size, price, fee, ts."""
+        return self.append("fill", {k: fill.get(k) for k in ("symbol", "side", "size", "price", "fee", "ts", "type")})
+
+    def record_position(self, symbol: str, size: float, entry_price: Optional[float] = None) -> Future:
+        return self.append("position", {"symbol": symbol, "size": size, "entry_price": entry_price})
+
+    def record_equity(self, cash: Optional[float] = None, equity: Optional[float] = None,
+                      prices: Optional[Dict[str, float]] = None) -> Future:
+        return self.append("equity", {"cash": cash, "equity": equity, "prices": prices or {}, "ts": time.time()})
+
+    def record_order(self, result) -> Future:
+        """A bot.orders.OrderResult, plus each of its fills."""
+        fut = self.append("order", {
+            "order_id": result.order_id, "client_id": result.client_id, "symbol": result.symbol,
+            "side": result.side, "status": result.status, "amount": result.amount, "filled": result.filled,
+            "avg_price": result.avg_price, "error": result.error,
+        })
+        for f in result.fills:
+            fut = self.record_fill({"symbol": f.symbol, "side": f.side, "size": f.amount, "price": f.price,
+                                    "fee": f.fee, "ts": f.ts})
+        return fut  # the last event: resolved once all of them are committed
+
+    def snapshot(self) -> Future:
+        """Write the current state and drop the events it covers."""
+        with self._lock:
+            return self._queue_snapshot()
+
+    def _queue_snapshot(self) -> Future:
+        fut = Future()
+        self._queue.put(("snapshot", self.seq, None, json.dumps(self.state, default=str), fut))
+        self._since_snapshot = 0
+        return fut
+
+    def flush(self, timeout: Optional[float] = None):
+        """Wait until everything recorded so far is committed."""
+        fut = Future()
+        self._queue.put(("flush", None, None, None, fut))
+        fut.result(timeout)
+
+    def close(self):
+        self.flush()
+        self._queue.put(None)
+        self._writer.join()
+
+    # --- recovery ---
+
+    def recover(self) -> Dict[str, Any]:
+        """The state as of the last recorded event (a copy)."""
+        with self._lock:
+            return json.loads(json.dumps(self.state))
+
+    def _recover(self, conn: sqlite3.Connection):
+        row = conn.execute("SELECT seq, state FROM snapshots ORDER BY seq DESC LIMIT 1").fetchone()
+        state, seq = (json.loads(row[1]), row[0]) if row else (empty_state(), 0)
+        replayed = 0
+        for seq, kind, payload in conn.execute("SELECT seq, kind, payload FROM events WHERE seq > ? ORDER BY seq", (seq,)):
+            apply_event(state, kind, json.loads(payload))
+            replayed += 1
+        last = conn.execute("SELECT MAX(seq) FROM events").fetchone()[0]
+        self._since_snapshot = replayed
+        if replayed or row:
+            print(f"[STATE] recovered {self.path}: snapshot {row[0] if row else 0} + {replayed} events")
+        return state, max(seq, last or 0)
+
+    # --- writer thread ---
+
+    def _run(self):
+        conn = self._connect()
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            while len(batch) < 10_000:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)  # stop after this batch
+                    break
+                batch.append(item)
+            self._commit(conn, batch)
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.close()
+
+    def _commit(self, conn: sqlite3.Connection, batch: List[tuple]):
+        try:
+            conn.execute("BEGIN")
+            events = [(seq, time.time(), kind, payload) for op, seq, kind, payload, _ in batch if op == "event"]
+            conn.executemany("INSERT INTO events (seq, ts, kind, payload) VALUES (?, ?, ?, ?)", events)
+            for op, seq, _, state, _ in batch:
+                if op == "snapshot":
+                    conn.execute("INSERT OR REPLACE INTO snapshots (seq, ts, state) VALUES (?, ?, ?)", (seq, time.time(), state))
+                    conn.execute("DELETE FROM events WHERE seq <= ?", (seq,))
+                    conn.execute("DELETE FROM snapshots WHERE seq < ?", (seq,))
+            conn.execute("COMMIT")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            print(f"[STATE] commit failed ({len(batch)} events): {type(e).__name__} {e}")
+            for *_, fut in batch:
+                fut.set_exception(e)
+            return
+        self.commits += 1
+        self.events_written += len(events)
+        for *_, fut in batch:
+            fut.set_result(None)
+        if any(op == "snapshot" for op, *_ in batch):
+            conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+
+def import_legacy_paper_state(store: StateStore, path: str, symbol: str) -> bool:
+    """Seed an empty store from the old key=value paper_state.txt (equity, position, last_price)."""
+    if store.seq or not os.path.exists(path):
+        return False
+    values = {}
+    with open(path, "r") as f:
+        for line in f:
+            key, _, value = line.strip().partition("=")
+            if value:
+                values[key] = float(value)
+    price = values.get("last_price")
+    store.record_equity(cash=values.get("equity"), prices={symbol: price} if price else None)
+    if values.get("position"):
+        store.record_position(symbol, values["position"], price)
+    store.flush()
+    print(f"[STATE] imported {path} into {store.path}")
+    return True
+
+
+def open_store(cfg: Dict[str, Any], name: str) -> StateStore:
+    """The journal for runner `name` under config.yaml `state` (default data/state/<name>.db)."""
+    opts = cfg.get("state") or {}
+    return StateStore(os.path.join(opts.get("dir", "data/state"), f"{name}.db"),
+                      snapshot_every=opts.get("snapshot_every", 1000))
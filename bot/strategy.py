@@ -1,28 +1,111 @@
-from typing import Dict, Any
-import pandas as pd
-import ta
+from __future__ import annotations
+from typing import Dict, Any, List, Optional, Sequence, TYPE_CHECKING
+import numpy as np
+from .indicators import SMA, EMA, RSI
+from . import indicator_cache as ind
+
+if TYPE_CHECKING:
+    import pandas as pd  # batch path only; the live on_candle path never needs it
 
 
 class BaseStrategy:
     def __init__(self, params: Dict[str, Any]):
         self.params = params
+        # Higher timeframes used next to the trading timeframe (params 'timeframes', e.g. ["4h", "1d"]);
+        # always resampled from the strategy's own candles, never fetched separately
+        self.timeframes: List[str] = list(params.get('timeframes') or [])
+        self.base_timeframe: Optional[str] = params.get('timeframe')  # runners fill it in from market.timeframe
+        self.higher_bars: Dict[str, Dict[str, float]] = {}
+        self._resampler = None
 
     def generate_signals(self, candles: pd.DataFrame) -> pd.Series:
         raise NotImplementedError
 
+    @property
+    def backend(self) -> str:
+        """params 'backend': "pandas" (default), or "numpy" / "numba" / "auto" for bot/kernels.py."""
+        return self.params.get('backend', 'pandas')
+
+    @classmethod
+    def signals_batch(cls, candles: pd.DataFrame, param_sets, backend: str = "auto"):
+        """generate_signals() for each of `param_sets` over the same candles: (sets, bars) int8 array."""
+        raise NotImplementedError
+
+    def on_candle(self, candle: Dict[str, Any]) -> int:
+        """
+        Streaming counterpart of generate_signals: feed one closed candle
+        (a dict/row with at least 'close' and 'volume') and get the signal
+        for that bar, the same value generate_signals gives for it.
+        """
+        raise NotImplementedError
+
+    def warm_up(self, candles: pd.DataFrame) -> int:
+        """Reset streaming state and replay history; returns the last bar's signal."""
+        self.reset_stream()
+        sig = 0
+        if self.timeframes:
+            for row in candles.to_dict('records'):
+                sig = self.step(row)
+            return sig
+        for close, volume in zip(candles['close'].to_numpy(), candles['volume'].to_numpy()):
+            sig = self.on_candle({'close': close, 'volume': volume})
+        return sig
+
+    def step(self, candle: Dict[str, Any]) -> int:
+        """
+        on_candle() for runners: first completes any higher-timeframe bars this
+        candle closes (on_higher_candle), then returns the candle's signal.
+        Needs the full candle (timestamp, open, high, low, close, volume).
+        """
+        if self.timeframes:
+            if self._resampler is None:
+                from .resample import Resampler
+                self._resampler = Resampler(self.timeframes, self.base_timeframe or "1m")
+            for tf, bars in self._resampler.update(candle).items():
+                for bar in bars:
+                    self.on_higher_candle(tf, bar)
+        return self.on_candle(candle)
+
+    def on_higher_candle(self, timeframe: str, bar: Sequence[float]):
+        """A completed `timeframe` bar [timestamp, open, high, low, close, volume]; kept in higher_bars by default."""
+        self.higher_bars[timeframe] = dict(zip(('timestamp', 'open', 'high', 'low', 'close', 'volume'), bar))
+
+    def higher(self, candles: pd.DataFrame, timeframe: str, columns: Sequence[str] = ('close',)) -> pd.DataFrame:
+        """
+        Batch counterpart of higher_bars: `timeframe` columns on `candles`' index
+        ('close_4h'), each bar seeing only the last completed higher bar.
+        """
+        from .resample import resample, align
+        from .metrics import infer_timeframe_ms
+        base = self.base_timeframe or infer_timeframe_ms(candles['timestamp'].to_numpy())
+        return align(candles, resample(candles, timeframe, base), base, timeframe, columns)
+
+    def reset_stream(self):
+        self._stream = None
+        self._resampler = None
+        self.higher_bars = {}
+
 
 class SMARSI(BaseStrategy):
     def generate_signals(self, candles: pd.DataFrame) -> pd.Series:
+        import pandas as pd
+        if self.backend != 'pandas':
+            from .kernels import smarsi_signals
+            return pd.Series(smarsi_signals(candles['close'].to_numpy(), self.params, self.backend),
+                             index=candles.index, dtype=np.int64)
         fast = self.params.get('fast_sma', 10)      # short-term SMA
         slow = self.params.get('slow_sma', 30)      # long-term SMA
         rsi_p = self.params.get('rsi_period', 14)
         rsi_buy_below = self.params.get('rsi_buy_below', 35)
         rsi_sell_above = self.params.get('rsi_sell_above', 65)
 
-        df = candles.copy()
-        df['sma_fast'] = df['close'].rolling(fast).mean()
-        df['sma_slow'] = df['close'].rolling(slow).mean()
-        df['rsi'] = ta.momentum.rsi(df['close'], window=rsi_p)
+        close = candles['close']
+        df = pd.DataFrame({
+            'close': close,
+            'sma_fast': ind.sma(close, fast),
+            'sma_slow': ind.sma(close, slow),
+            'rsi': ind.rsi(close, rsi_p),
+        })
 
         signal = pd.Series(0, index=df.index)
 
@@ -38,20 +121,46 @@ class SMARSI(BaseStrategy):
         signal[cross_up | rsi_buy] = 1
         signal[cross_down | rsi_sell] = -1
 
-        # Debug output
-        if not signal[signal != 0].empty:
-            last_idx = signal[signal != 0].index[-1]
-            print(
-                f"SMARSI signal: {signal[last_idx]} "
-                f"at price {df['close'].iloc[-1]} "
-                f"(RSI={df['rsi'].iloc[-1]:.2f})"
-            )
-
         return signal.fillna(0)
 
+    @classmethod
+    def signals_batch(cls, candles: pd.DataFrame, param_sets, backend: str = "auto"):
+        from .kernels import smarsi_batch
+        return smarsi_batch(candles['close'].to_numpy(), param_sets, backend)
+
+    def on_candle(self, candle: Dict[str, Any]) -> int:
+        st = getattr(self, '_stream', None)
+        if st is None:
+            st = self._stream = {
+                'fast': SMA(self.params.get('fast_sma', 10)),
+                'slow': SMA(self.params.get('slow_sma', 30)),
+                'rsi': RSI(self.params.get('rsi_period', 14)),
+                'prev_fast': float('nan'),
+                'prev_slow': float('nan'),
+            }
+        close = candle['close']
+        fast = st['fast'].update(close)
+        slow = st['slow'].update(close)
+        rsi = st['rsi'].update(close)
+        prev_fast, prev_slow = st['prev_fast'], st['prev_slow']
+        st['prev_fast'], st['prev_slow'] = fast, slow
+
+        cross_up = fast > slow and prev_fast <= prev_slow
+        cross_down = fast < slow and prev_fast >= prev_slow
+        if cross_down or rsi > self.params.get('rsi_sell_above', 65):
+            return -1
+        if cross_up or rsi < self.params.get('rsi_buy_below', 35):
+            return 1
+        return 0
+
 
 class ScalpingStrategy(BaseStrategy):
     def generate_signals(self, candles: pd.DataFrame) -> pd.Series:
+        import pandas as pd
+        if self.backend != 'pandas':
+            from .kernels import scalping_signals
+            return pd.Series(scalping_signals(candles['close'].to_numpy(), candles['volume'].to_numpy(),
+                                              self.params, self.backend), index=candles.index, dtype=np.int64)
         ema_fast = self.params.get('ema_fast', 5)
         ema_slow = self.params.get('ema_slow', 20)
         rsi_p = self.params.get('rsi_period', 14)
@@ -59,11 +168,15 @@ class ScalpingStrategy(BaseStrategy):
         rsi_oversold = self.params.get('rsi_oversold', 30)
         vol_window = self.params.get('volume_ma', 10)
 
-        df = candles.copy()
-        df['ema_fast'] = df['close'].ewm(span=ema_fast, adjust=False).mean()
-        df['ema_slow'] = df['close'].ewm(span=ema_slow, adjust=False).mean()
-        df['rsi'] = ta.momentum.rsi(df['close'], window=rsi_p)
-        df['vol_ma'] = df['volume'].rolling(vol_window).mean()
+        close = candles['close']
+        df = pd.DataFrame({
+            'close': close,
+            'volume': candles['volume'],
+            'ema_fast': ind.ema(close, ema_fast),
+            'ema_slow': ind.ema(close, ema_slow),
+            'rsi': ind.rsi(close, rsi_p),
+            'vol_ma': ind.sma(candles['volume'], vol_window),
+        })
 
         signal = pd.Series(0, index=df.index)
 
@@ -73,20 +186,73 @@ class ScalpingStrategy(BaseStrategy):
         signal[long_entry] = 1
         signal[short_entry] = -1
 
-        if not signal[signal != 0].empty:
-            last_idx = signal[signal != 0].index[-1]
-            print(
-                f"Scalping signal: {signal[last_idx]} "
-                f"at price {df['close'].iloc[-1]} "
-                f"(RSI={df['rsi'].iloc[-1]:.2f})"
-            )
-
         return signal.fillna(0)
 
+    @classmethod
+    def signals_batch(cls, candles: pd.DataFrame, param_sets, backend: str = "auto"):
+        from .kernels import scalping_batch
+        return scalping_batch(candles['close'].to_numpy(), candles['volume'].to_numpy(), param_sets, backend)
+
+    def on_candle(self, candle: Dict[str, Any]) -> int:
+        st = getattr(self, '_stream', None)
+        if st is None:
+            st = self._stream = {
+                'ema_fast': EMA(self.params.get('ema_fast', 5)),
+                'ema_slow': EMA(self.params.get('ema_slow', 20)),
+                'rsi': RSI(self.params.get('rsi_period', 14)),
+                'vol_ma': SMA(self.params.get('volume_ma', 10)),
+            }
+        ema_fast = st['ema_fast'].update(candle['close'])
+        ema_slow = st['ema_slow'].update(candle['close'])
+        rsi = st['rsi'].update(candle['close'])
+        volume = float(candle['volume'])
+        vol_ma = st['vol_ma'].update(volume)
+
+        if volume > vol_ma:
+            if ema_fast < ema_slow and rsi < self.params.get('rsi_overbought', 70):
+                return -1
+            if ema_fast > ema_slow and rsi > self.params.get('rsi_oversold', 30):
+                return 1
+        return 0
+
+
+class SMACrossover(BaseStrategy):
+    """Plain fast/slow SMA crossover: 1 on the bar fast crosses above slow, -1 when it crosses below."""
+    def generate_signals(self, candles: pd.DataFrame) -> pd.Series:
+        import pandas as pd
+        close = candles['close']
+        fast = ind.sma(close, self.params.get('fast_sma', 10))
+        slow = ind.sma(close, self.params.get('slow_sma', 40))
+        signal = pd.Series(0, index=candles.index)
+        signal[(fast > slow) & (fast.shift(1) <= slow.shift(1))] = 1
+        signal[(fast < slow) & (fast.shift(1) >= slow.shift(1))] = -1
+        return signal
+
+    def on_candle(self, candle: Dict[str, Any]) -> int:
+        st = getattr(self, '_stream', None)
+        if st is None:
+            st = self._stream = {
+                'fast': SMA(self.params.get('fast_sma', 10)),
+                'slow': SMA(self.params.get('slow_sma', 40)),
+                'prev_fast': float('nan'),
+                'prev_slow': float('nan'),
+            }
+        fast = st['fast'].update(candle['close'])
+        slow = st['slow'].update(candle['close'])
+        prev_fast, prev_slow = st['prev_fast'], st['prev_slow']
+        st['prev_fast'], st['prev_slow'] = fast, slow
+        if fast > slow and prev_fast <= prev_slow:
+            return 1
+        if fast < slow and prev_fast >= prev_slow:
+            return -1
+        return 0
+
 
 def get_strategy(name: str):
     if name == "sma_rsi":
         return SMARSI
+    elif name == "sma_crossover":
+        return SMACrossover
     elif name == "scalping":
         return ScalpingStrategy
     raise ValueError(f"Unknown strategy: {name}")
@@ -0,0 +1,103 @@
+# bot/stream_backtest.py
+import csv
+import os
+from typing import Dict, Any, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from .backtest import Backtester
+from .metrics import RunningMetrics, infer_timeframe_ms, positions_from_trades
+from .risk import RiskManager
+from .strategy import BaseStrategy
+from .utils import ensure_dir
+from .artifacts import run_dir
+from .indicator_cache import IndicatorCache, using
+
+
+class StreamingBacktester:
+    """
+    Backtest over candles delivered in blocks (e.g. CandleStore.iter_chunks),
+    with memory bounded by the block size rather than the history length.
+
+    - signals: each block is prefixed with the last `warmup_bars` candles of
+      the previous one, so rolling/EMA/RSI indicators are warmed up exactly as
+      in a single pass (EMA/RSI memory decays far below float precision well
+      within the default warm-up)
+    - trades: Backtester.vectorized_step carries cash, the open position and
+      its sl/tp from block to block
+    - output: trades are appended to a CSV and the equity curve to a raw
+      float64 file (np.memmap-able) as each block finishes
+    - metrics: each block is merged into a metrics.RunningMetrics, giving
+      the same numbers as equity_metrics() on the full curve
+    - indicators: every block has new data, so nothing in the process-wide
+      indicator cache would be reused; blocks go through a private cache
+      that is emptied after each one
+    """
+    def __init__(self, params: Dict[str, Any], strategy: BaseStrategy, risk: RiskManager,
+                 warmup_bars: int = 2000, out_dir: Optional[str] = None):
+        self.engine = Backtester({**params, 'write_artifacts': False}, strategy, risk)
+        self.strategy = strategy
+        self.starting_equity = float(params.get('starting_equity', 10000.0))
+        self.fee_pct = self.engine.fee_pct
+        self.timeframe = params.get('timeframe')
+        self.warmup_bars = warmup_bars
+        self.out_dir = out_dir  # None: a fresh artifacts/runs/stream-* directory per run
+        self.indicators = IndicatorCache()
+
+    def run(self, chunks: Iterable[pd.DataFrame]) -> Dict[str, Any]:
+        out_dir = self.out_dir or run_dir(prefix="stream")
+        ensure_dir(out_dir)
+        trades_path = os.path.join(out_dir, "trades.csv")
+        equity_path = os.path.join(out_dir, "equity_curve.f64")
+
+        state = {'cash': self.starting_equity, 'size': 0.0, 'sl': -np.inf, 'tp': np.inf}
+        tail = None
+        metrics = None
+        entry_price = 0.0
+        bars = 0
+
+        with open(trades_path, "w", newline="") as tf, open(equity_path, "wb") as ef:
+            writer = csv.writer(tf)
+            writer.writerow(['ts', 'side', 'price', 'size'])
+
+            for chunk in chunks:
+                chunk = chunk.reset_index(drop=True)
+                if len(chunk) == 0:
+                    continue
+                warm = chunk if tail is None else pd.concat([tail, chunk], ignore_index=True)
+                with using(self.indicators):
+                    signals = self.strategy.generate_signals(warm).to_numpy()[len(warm) - len(chunk):]
+                self.indicators.clear()
+                tail = warm.iloc[-self.warmup_bars:] if self.warmup_bars else None
+
+                state_before = state
+                trades, ec, state = self.engine.vectorized_step(chunk, signals, state)
+                writer.writerows(trades.itertuples(index=False, name=None))
+                ef.write(np.ascontiguousarray(ec, dtype=np.float64).tobytes())
+                bars += len(ec)
+
+                ts = chunk['timestamp'].to_numpy()
+                if metrics is None:
+                    metrics = RunningMetrics(self.timeframe or infer_timeframe_ms(ts))
+                held = positions_from_trades(trades, ts, start=state_before['size']) > 0
+                metrics.update_many(ec, held)
+                for side, price, size in trades[['side', 'price', 'size']].itertuples(index=False, name=None):
+                    if side == 'buy':
+                        entry_price = price
+                        metrics.record_trade(price, size)
+                    else:
+                        pnl = price * size * (1 - self.fee_pct) - entry_price * size * (1 + self.fee_pct)
+                        metrics.record_trade(price, size, pnl)
+
+        out = metrics.snapshot() if metrics is not None else RunningMetrics().snapshot()
+        if metrics is None:
+            out['final_equity'] = self.starting_equity
+        return {
+            'metrics': out,
+            'bars': bars,
+            'files': {
+                'trades_csv': trades_path,
+                'equity_curve_f64': equity_path
+            }
+        }
@@ -0,0 +1,126 @@
+# bot/sweep.py
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from . import indicator_cache
+from .backtest import Backtester
+from .risk import RiskManager
+from .strategy import get_strategy
+
+CANDLE_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+# Per-worker state, filled once by _init_worker; see worker_state()
+_worker: Dict[str, Any] = {}
+
+
+def expand_grid(ranges: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Turn {'fast_sma': [5, 10], 'slow_sma': {'start': 20, 'stop': 60, 'step': 10}}
+    into the list of every parameter combination. `stop` is inclusive.
+    """
+    keys = list(ranges)
+    values = []
+    for key in keys:
+        spec = ranges[key]
+        if isinstance(spec, dict):
+            start, stop, step = spec['start'], spec['stop'], spec.get('step', 1)
+            if all(isinstance(v, int) for v in (start, stop, step)):
+                vals = list(range(start, stop + 1, step))
+            else:
+                vals = [round(float(v), 10) for v in np.arange(start, stop + step / 2, step)]
+        elif isinstance(spec, (list, tuple)):
+            vals = list(spec)
+        else:
+            vals = [spec]
+        values.append(vals)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+
+
+def _share_candles(candles: pd.DataFrame):
+    arr = candles[CANDLE_COLUMNS].to_numpy(dtype=np.float64)
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    view = np.ndarray(arr.shape, dtype=np.float64, buffer=shm.buf)
+    view[:] = arr
+    return shm, arr.shape
+
+
+def _init_worker(shm_name: str, shape, cfg: Dict[str, Any]):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    arr = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    df = pd.DataFrame(arr, columns=CANDLE_COLUMNS, copy=False)
+    df['timestamp'] = df['timestamp'].astype(np.int64)
+
+    bt_params = dict(cfg.get('backtest', {}))
+    bt_params['write_artifacts'] = False
+    # Every task in this worker sees the same candles, so repeated indicators are cache hits
+    indicator_cache.configure(**(cfg.get('indicator_cache') or {}))
+
+    _worker['shm'] = shm  # keep the mapping alive for the worker's lifetime
+    _worker['candles'] = df
+    _worker['cfg'] = cfg
+    _worker['bt_params'] = bt_params
+    _worker['risk'] = RiskManager(cfg['risk'])
+    _worker['strategy_cls'] = get_strategy(cfg['strategy']['name'])
+
+
+def worker_state() -> Dict[str, Any]:
+    """
+    Inside a map_shared() task: the worker's candles (DataFrame over the shared
+    block), cfg, bt_params (artifacts off), risk and strategy_cls.
+    """
+    return _worker
+
+
+def map_shared(fn: Callable[[Any], Any], tasks: List[Any], candles: pd.DataFrame, cfg: Dict[str, Any],
+               workers: int) -> List[Any]:
+    """
+    Run picklable `fn` over `tasks` in a process pool whose workers all map
+    `candles` from one shared-memory block (see worker_state()). Results
+    come back in task order.
+    """
+    shm, shape = _share_candles(candles)
+    try:
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shm.name, shape, cfg)) as pool:
+            return list(pool.map(fn, tasks, chunksize=chunksize))
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _run_one(combo: Dict[str, Any]) -> Dict[str, Any]:
+    params = dict(_worker['cfg']['strategy'].get('params') or {})
+    params.update(combo)
+    strat = _worker['strategy_cls'](params)
+    bt = Backtester(_worker['bt_params'], strat, _worker['risk'])
+    try:
+        metrics = bt.run(_worker['candles'])['metrics']
+    except Exception as e:
+        print(f"[SWEEP] {combo} failed: {e}")
+        return {**combo, 'error': str(e)}
+    return {**combo, **metrics}
+
+
+class ParameterSweep:
+    def __init__(self, cfg: Dict[str, Any], ranges: Dict[str, Any], workers: Optional[int] = None):
+        self.cfg = cfg
+        self.ranges = ranges
+        self.workers = workers or os.cpu_count() or 1
+        get_strategy(cfg['strategy']['name'])  # fail fast on unknown strategy
+
+    def run(self, candles: pd.DataFrame, rank_by: str = 'sharpe_like', ascending: bool = False) -> pd.DataFrame:
+        combos = expand_grid(self.ranges)
+        print(f"[SWEEP] {len(combos)} combinations on {len(candles)} candles with {self.workers} workers")
+
+        rows = map_shared(_run_one, combos, candles, self.cfg, self.workers)
+        results = pd.DataFrame(rows)
+        if rank_by in results.columns:
+            results = results.sort_values(rank_by, ascending=ascending, na_position='last')
+        return results.reset_index(drop=True)
@@ -0,0 +1,308 @@
+# bot/synthetic.py
+"""
+Seeded synthetic OHLCV for offline runs, benchmarks and load tests: same
+seed, same candles, on any machine.
+
+    generate(100_000, "1m", seed=7)                       # one DataFrame
+    generate_many(["BTC/USDT", "ETH/USDT"], 100_000, corr=0.8, seed=7)
+    feed = SyntheticFeed(["BTC/USDT"], "1m", seed=7)      # ccxt-like stand-in exchange
+    feed.fetch_ohlcv("BTC/USDT", "1m", limit=100)         # bars up to the wall clock
+
+Prices are geometric Brownian motion (log returns, cumulated in one pass),
+with optional:
+- regimes: market phases, each with its own drift and volatility multiplier
+  and a mean length in bars (e.g. calm / trending / crash)
+- volatility clustering: log volatility follows an AR(1) process
+  (`vol_of_vol`, `vol_persistence`), so quiet and wild stretches alternate
+- gaps: with probability `gap_prob` a bar opens away from the previous close
+- several symbols whose shocks are correlated (`corr`: a number or a matrix)
+
+Everything except the regime bookkeeping is vectorized NumPy, so millions of
+bars take well under a second. Timestamps are aligned to the timeframe (UTC
+epoch multiples) and by default end at the last closed candle.
+
+Config (config.yaml `synthetic`) is used by exchange.name "synthetic" and by
+HistoricalDataSource/LiveDataSource when no exchange is configured.
+"""
+import asyncio
+import math
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from .candle_store import CANDLE_COLUMNS
+from .kernels import ewm
+from .utils import timeframe_to_ms
+
+DEFAULTS = {
+    'drift': 0.0,              # per-bar drift of log returns
+    'vol': 0.001,              # per-bar stdev of log returns
+    'vol_of_vol': 0.0,         # stdev of the log-volatility process; 0 = constant volatility
+    'vol_persistence': 0.98,   # AR(1) coefficient of log volatility (closer to 1 = longer clusters)
+    'regimes': None,           # e.g. [{'drift': 0, 'vol': 1, 'bars': 2000}, {'drift': -0.0005, 'vol': 3, 'bars': 200}]
+    'gap_prob': 0.0,           # chance per bar that it opens away from the previous close
+    'gap_vol': 0.01,           # stdev of the log gap
+    'volume': 10.0,            # typical volume per bar
+}
+
+
+def _params(params: Dict[str, Any]) -> Dict[str, Any]:
+    unknown = set(params) - set(DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown synthetic parameter(s): {', '.join(sorted(unknown))}")
+    return {**DEFAULTS, **params}
+
+
+def _cholesky(corr: Union[float, Sequence[Sequence[float]]], k: int) -> np.ndarray:
+    if np.isscalar(corr):
+        matrix = np.full((k, k), float(corr))
+        np.fill_diagonal(matrix, 1.0)
+    else:
+        matrix = np.asarray(corr, dtype=np.float64)
+        if matrix.shape != (k, k):
+            raise ValueError(f"corr must be {k}x{k}")
+    return np.linalg.cholesky(matrix)
+
+
+def _regime_path(n: int, rng: np.random.Generator, regimes: List[Dict[str, Any]], state: Dict[str, Any]):
+    """Per-bar drift and volatility multiplier from a Markov chain of regimes with geometric lengths."""
+    current, left = state.get('regime', 0), state.get('regime_left', 0)
+    ids, lengths, filled = [], [], 0
+    while filled < n:
+        if left <= 0:
+            if ids or 'regime' in state:
+                others = [i for i in range(len(regimes)) if i != current] or [current]
+                current = others[rng.integers(len(others))]
+            left = int(rng.geometric(1.0 / max(1.0, regimes[current].get('bars', 1000))))
+        take = min(left, n - filled)
+        ids.append(current)
+        lengths.append(take)
+        filled += take
+        left -= take
+    state.update(regime=current, regime_left=left)
+    ids = np.repeat(np.asarray(ids), lengths)
+    drift = np.array([r.get('drift', 0.0) for r in regimes])[ids]
+    mult = np.array([r.get('vol', 1.0) for r in regimes])[ids]
+    return drift, mult
+
+
+def _simulate(n: int, prices: np.ndarray, rng: np.random.Generator, p: Dict[str, Any],
+              chol: np.ndarray, state: Dict[str, Any]) -> np.ndarray:
+    """(n, k, 5) open/high/low/close/volume continuing from `prices`; `state` carries regime and volatility."""
+    k = len(prices)
+    if p['regimes']:
+        drift, mult = _regime_path(n, rng, p['regimes'], state)
+    else:
+        drift, mult = np.full(n, float(p['drift'])), np.ones(n)
+
+    sigma = p['vol'] * mult
+    if p['vol_of_vol'] > 0:
+        phi = float(p['vol_persistence'])
+        shocks = rng.normal(0.0, p['vol_of_vol'] * math.sqrt(1 - phi * phi), n)
+        # x[t] = phi * x[t-1] + shock[t] as an EWM (alpha = 1 - phi) seeded with the carried state
+        x = ewm(np.r_[state.get('log_vol', 0.0), shocks / (1 - phi)], 1 - phi)[1:]
+        state['log_vol'] = float(x[-1])
+        sigma = sigma * np.exp(x - 0.5 * p['vol_of_vol'] ** 2)  # keeps the average volatility near `vol`
+
+    z = rng.standard_normal((n, k)) @ chol.T
+    sig = sigma[:, None]
+    log_ret = (drift - 0.5 * sigma ** 2)[:, None] + sig * z
+    if p['gap_prob'] > 0:
+        gaps = np.where(rng.random((n, k)) < p['gap_prob'], rng.normal(0.0, p['gap_vol'], (n, k)), 0.0)
+    else:
+        gaps = np.zeros((n, k))
+
+    log_close = np.log(prices)[None, :] + np.cumsum(gaps + log_ret, axis=0)
+    prev = np.vstack([np.log(prices)[None, :], log_close[:-1]])
+    out = np.empty((n, k, 5))
+    out[..., 0] = np.exp(prev + gaps)
+    out[..., 3] = np.exp(log_close)
+    wicks = np.abs(rng.standard_normal((2, n, k))) * sig * 0.5
+    out[..., 1] = np.maximum(out[..., 0], out[..., 3]) * np.exp(wicks[0])
+    out[..., 2] = np.minimum(out[..., 0], out[..., 3]) * np.exp(-wicks[1])
+    # busier bars trade more; lognormal(-s^2/2, s) averages 1
+    out[..., 4] = p['volume'] * rng.lognormal(-0.045, 0.3, (n, k)) * (0.5 + 0.5 * np.abs(z))
+    return out
+
+
+def _start_prices(symbols: Sequence[str], prices: Optional[Union[float, Dict[str, float]]]) -> np.ndarray:
+    if isinstance(prices, dict):
+        return np.array([float(prices.get(s, 20000.0)) for s in symbols])
+    return np.full(len(symbols), 20000.0 if prices is None else float(prices))
+
+
+def _start_ms(n: int, step: int, start_ms: Optional[int], end_ms: Optional[int]) -> int:
+    if start_ms is not None:
+        return int(start_ms) // step * step
+    end_ms = time.time() * 1000 if end_ms is None else end_ms
+    return int(end_ms // step - n) * step  # the last bar is the last one closed by end_ms
+
+
+def _frame(ts: np.ndarray, bars: np.ndarray) -> pd.DataFrame:
+    df = pd.DataFrame(bars, columns=CANDLE_COLUMNS[1:])
+    df.insert(0, 'timestamp', ts)
+    return df
+
+
+def generate_many(symbols: Sequence[str], n: int, timeframe: str = "1m", seed: int = 0,
+                  prices: Optional[Union[float, Dict[str, float]]] = None, corr: Union[float, Sequence] = 0.0,
+                  start_ms: Optional[int] = None, end_ms: Optional[int] = None, **params) -> Dict[str, pd.DataFrame]:
+    """`n` candles per symbol, with correlated returns and shared regimes/volatility."""
+    p = _params(params)
+    symbols = list(symbols)
+    start = _start_prices(symbols, prices)
+    step = timeframe_to_ms(timeframe)
+    ts = _start_ms(n, step, start_ms, end_ms) + np.arange(n, dtype=np.int64) * step
+    bars = _simulate(n, start, np.random.default_rng(seed), p, _cholesky(corr, len(symbols)), {})
+    return {sym: _frame(ts, bars[:, i, :]) for i, sym in enumerate(symbols)}
+
+
+def generate(n: int, timeframe: str = "1m", seed: int = 0, price: float = 20000.0,
+             start_ms: Optional[int] = None, end_ms: Optional[int] = None, **params) -> pd.DataFrame:
+    """`n` candles of one symbol (columns timestamp, open, high, low, close, volume)."""
+    return generate_many(["_"], n, timeframe, seed, price, 0.0, start_ms, end_ms, **params)["_"]
+
+
+class SyntheticFeed:
+    """
+    Stand-in exchange: fetch_ohlcv() like ccxt, over a path that keeps growing
+    with the wall clock, so the live loops see a new candle at every close.
+
+    The path starts `history` bars before creation and is generated in
+    chunks of `chunk_bars` as time passes; chunk i always uses the RNG seeded
+    with (seed, i), so the same seed gives the same candles bar for bar. The
+    forming candle is returned with its final values.
+    """
+    def __init__(self, symbols: Sequence[str], timeframe: str = "1m", seed: int = 0, history: int = 10_000,
+                 prices: Optional[Union[float, Dict[str, float]]] = None, corr: Union[float, Sequence] = 0.0,
+                 start_ms: Optional[int] = None, chunk_bars: int = 10_000, **params):
+        self.symbols = list(symbols)
+        self.timeframe = timeframe
+        self.step_ms = timeframe_to_ms(timeframe)
+        self.seed = seed
+        self.chunk_bars = int(chunk_bars)
+        self.start_ms = _start_ms(history, self.step_ms, start_ms, None)
+        self.params = _params(params)
+        self._chol = _cholesky(corr, len(self.symbols))
+        self._index = {s: i for i, s in enumerate(self.symbols)}
+        self._last = _start_prices(self.symbols, prices)
+        self._state: Dict[str, Any] = {}
+        self._chunks: List[np.ndarray] = []  # (chunk_bars, k, 5) each
+        self._lock = threading.Lock()
+
+    def bar_index(self, ts_ms: float) -> int:
+        return int((ts_ms - self.start_ms) // self.step_ms)
+
+    def _ensure(self, index: int):
+        with self._lock:
+            while len(self._chunks) * self.chunk_bars <= index:
+                rng = np.random.default_rng([self.seed, len(self._chunks)])
+                chunk = _simulate(self.chunk_bars, self._last, rng, self.params, self._chol, self._state)
+                self._last = chunk[-1, :, 3]
+                self._chunks.append(chunk)
+
+    def bars(self, symbol: str, first: int, last: int) -> np.ndarray:
+        """(m, 6) candles for bar indices first..last inclusive."""
+        first = max(0, first)
+        if last < first:
+            return np.empty((0, len(CANDLE_COLUMNS)))
+        self._ensure(last)
+        col = self._index[symbol]
+        c0, c1 = first // self.chunk_bars, last // self.chunk_bars
+        ohlcv = np.concatenate([self._chunks[c][:, col, :] for c in range(c0, c1 + 1)])
+        ohlcv = ohlcv[first - c0 * self.chunk_bars:last - c0 * self.chunk_bars + 1]
+        ts = self.start_ms + np.arange(first, last + 1, dtype=np.int64) * self.step_ms
+        return np.column_stack([ts, ohlcv])
+
+    def fetch_ohlcv(self, symbol: str, timeframe: Optional[str] = None, since: Optional[int] = None,
+                    limit: Optional[int] = None, params=None) -> List[List[float]]:
+        """ccxt-style rows [ts, o, h, l, c, v], oldest first, up to and including the forming candle."""
+        if timeframe and timeframe != self.timeframe:
+            raise ValueError(f"synthetic feed is {self.timeframe}, not {timeframe} (resample with bot.resample)")
+        if symbol not in self._index:
+            raise ValueError(f"synthetic feed has no {symbol} (symbols: {', '.join(self.symbols)})")
+        now = self.bar_index(time.time() * 1000)
+        if since is not None:
+            first = -(-(int(since) - self.start_ms) // self.step_ms)
+            last = now if limit is None else min(now, first + int(limit) - 1)
+        else:
+            last = now
+            first = 0 if limit is None else now + 1 - int(limit)
+        rows = self.bars(symbol, first, last)
+        rows = rows.tolist()
+        for row in rows:
+            row[0] = int(row[0])
+        return rows
+
+    def candles(self, symbol: str, limit: int) -> pd.DataFrame:
+        """The last `limit` closed candles as a DataFrame (fewer if the feed's history is shorter)."""
+        last = self.bar_index(time.time() * 1000) - 1
+        arr = self.bars(symbol, last + 1 - int(limit), last)
+        if len(arr) < limit:
+            print(f"[SYNTH] only {len(arr)} of {limit} {self.timeframe} candles before now; raise synthetic.history")
+        return _frame(arr[:, 0].astype(np.int64), arr[:, 1:])
+
+    def stream(self, speed: Optional[float] = 1.0, bars: Optional[int] = None) -> Iterator[Dict[str, List[float]]]:
+        """
+        Yield {symbol: row} for each candle as it closes, starting with the
+        next close. `speed` > 1 replays faster than real time (10 = ten bars
+        per bar length); None yields as fast as the consumer reads.
+        """
+        index = self.bar_index(time.time() * 1000)  # the forming bar: it closes next
+        started, emitted = time.monotonic(), 0
+        first_close = (self.start_ms + (index + 1) * self.step_ms) / 1000
+        wall_offset = first_close - time.time()
+        while bars is None or emitted < bars:
+            if speed:
+                wait = started + (wall_offset + emitted * self.step_ms / 1000) / speed - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+            yield {sym: self.bars(sym, index, index)[0].tolist() for sym in self.symbols}
+            index += 1
+            emitted += 1
+
+    def create_order(self, *args, **kwargs):
+        raise RuntimeError("synthetic feed has no order matching: run with paper.enabled: true")
+
+    def close(self):
+        pass
+
+
+class AsyncSyntheticFeed:
+    """SyntheticFeed with ccxt.async_support's coroutine interface (for AsyncLiveDataSource)."""
+    def __init__(self, feed: SyntheticFeed):
+        self.feed = feed
+
+    async def fetch_ohlcv(self, symbol: str, timeframe: Optional[str] = None, since: Optional[int] = None,
+                          limit: Optional[int] = None, params=None):
+        return self.feed.fetch_ohlcv(symbol, timeframe, since, limit)
+
+    async def create_order(self, *args, **kwargs):
+        return self.feed.create_order(*args, **kwargs)
+
+    async def close(self):
+        await asyncio.sleep(0)
+
+
+# One feed per (seed, timeframe, symbols) in a process, so every data source sees the same market
+_feeds: Dict[tuple, SyntheticFeed] = {}
+_feeds_lock = threading.Lock()
+
+
+def feed_for(cfg: Dict[str, Any], timeframe: Optional[str] = None, history: int = 0) -> SyntheticFeed:
+    """The shared feed for config.yaml `synthetic` and the configured market symbols."""
+    opts = dict(cfg.get('synthetic') or {})
+    market = cfg.get('market', {})
+    symbols = sorted({market.get('symbol'), *(market.get('symbols') or [])} - {None})
+    timeframe = timeframe or market.get('timeframe', '1m')
+    seed = opts.pop('seed', 0)
+    key = (seed, timeframe, tuple(symbols))
+    with _feeds_lock:
+        feed = _feeds.get(key)
+        if feed is None:
+            opts['history'] = max(int(opts.get('history', 10_000)), history)
+            feed = _feeds[key] = SyntheticFeed(symbols, timeframe, seed, **opts)
+        return feed
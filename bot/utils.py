@@ -7,3 +7,12 @@ def ensure_dir(path: str):
 
 def ts_to_str(ts_ms: int) -> str:
     return datetime.utcfromtimestamp(ts_ms/1000).strftime('%Y-%m-%d %H:%M:%S')
+
+_TF_UNITS_MS = {'s': 1_000, 'm': 60_000, 'h': 3_600_000, 'd': 86_400_000, 'w': 604_800_000}
+
+def timeframe_to_ms(timeframe: str) -> int:
+    """'1m' -> 60000, '4h' -> 14400000 (ccxt-style timeframe strings)."""
+    unit = timeframe[-1]
+    if unit not in _TF_UNITS_MS or not timeframe[:-1].isdigit():
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return int(timeframe[:-1]) * _TF_UNITS_MS[unit]
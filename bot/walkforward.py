@@ -0,0 +1,121 @@
+# bot/walkforward.py
+import os
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import sweep
+from .backtest import Backtester, equity_metrics
+from .metrics import infer_timeframe_ms, positions_from_trades
+from .risk import RiskManager
+from .strategy import get_strategy
+
+
+def walk_forward_windows(n: int, train_bars: int, test_bars: int,
+                         step_bars: Optional[int] = None) -> List[Tuple[int, int, int]]:
+    """(train_start, test_start, test_end) for rolling folds; test windows follow their train window."""
+    step = step_bars or test_bars
+    folds = []
+    start = 0
+    while start + train_bars + test_bars <= n:
+        folds.append((start, start + train_bars, start + train_bars + test_bars))
+        start += step
+    return folds
+
+
+def _signals(strategy_cls, cfg: Dict[str, Any], combo: Dict[str, Any], candles: pd.DataFrame) -> np.ndarray:
+    params = dict(cfg['strategy'].get('params') or {})
+    params.update(combo)
+    return strategy_cls(params).generate_signals(candles).to_numpy()
+
+
+def _train_folds(task) -> List[Optional[Dict[str, Any]]]:
+    """Worker: one parameter set over every train window, signals computed once on the full history."""
+    combo, folds = task
+    w = sweep.worker_state()
+    candles = w['candles']
+    try:
+        signals = _signals(w['strategy_cls'], w['cfg'], combo, candles)
+    except Exception as e:
+        print(f"[WALKFORWARD] {combo} failed: {e}")
+        return [None] * len(folds)
+    bt = Backtester(w['bt_params'], None, w['risk'])
+    return [bt.run_signals(candles.iloc[a:b], signals[a:b])['metrics'] for a, b, _ in folds]
+
+
+class WalkForward:
+    """
+    Rolling walk-forward optimisation: for each fold, pick the parameter set
+    with the best `rank_by` on the train window, then backtest it on the test
+    window that follows. Test windows are chained (each starts with the equity
+    the previous one ended on) into one out-of-sample equity curve.
+
+    Each parameter set's signals are computed once on the whole history and
+    sliced per fold, so overlapping windows never recompute indicators.
+    Parameter sets are evaluated in parallel through the sweep worker pool.
+    """
+    def __init__(self, cfg: Dict[str, Any], ranges: Dict[str, Any], train_bars: int, test_bars: int,
+                 step_bars: Optional[int] = None, rank_by: str = 'sharpe_like', workers: Optional[int] = None):
+        self.cfg = cfg
+        self.ranges = ranges
+        self.train_bars = train_bars
+        self.test_bars = test_bars
+        self.step_bars = step_bars
+        self.rank_by = rank_by
+        self.workers = workers or os.cpu_count() or 1
+        self.strategy_cls = get_strategy(cfg['strategy']['name'])
+
+    def run(self, candles: pd.DataFrame) -> Dict[str, Any]:
+        candles = candles.reset_index(drop=True)
+        folds = walk_forward_windows(len(candles), self.train_bars, self.test_bars, self.step_bars)
+        if not folds:
+            raise ValueError(f"Need at least {self.train_bars + self.test_bars} candles, got {len(candles)}")
+        combos = sweep.expand_grid(self.ranges)
+        print(f"[WALKFORWARD] {len(folds)} folds x {len(combos)} combinations with {self.workers} workers")
+
+        train = sweep.map_shared(_train_folds, [(c, folds) for c in combos], candles, self.cfg, self.workers)
+
+        bt_params = dict(self.cfg.get('backtest', {}))
+        bt_params['write_artifacts'] = False
+        equity = float(bt_params.get('starting_equity', 10000.0))
+        risk = RiskManager(self.cfg['risk'])
+        signal_cache = {}
+        timestamps = candles['timestamp'].to_numpy()
+        rows, curves, trades, positions = [], [], [], []
+
+        for k, (a, b, c) in enumerate(folds):
+            scores = [m[k][self.rank_by] if m[k] is not None else -np.inf for m in train]
+            best = int(np.argmax(scores))
+            key = tuple(sorted(combos[best].items()))
+            if key not in signal_cache:
+                signal_cache[key] = _signals(self.strategy_cls, self.cfg, combos[best], candles)
+
+            bt = Backtester({**bt_params, 'starting_equity': equity}, None, risk)
+            res = bt.run_signals(candles.iloc[b:c], signal_cache[key][b:c])
+            curves.append(res['equity_curve'])
+            trades.append(res['trades'])
+            positions.append(positions_from_trades(res['trades'], timestamps[b:c]))
+            equity = res['metrics']['final_equity']
+            rows.append({
+                'fold': k,
+                'train_start': int(candles['timestamp'].iloc[a]),
+                'test_start': int(candles['timestamp'].iloc[b]),
+                'test_end': int(candles['timestamp'].iloc[c - 1]),
+                **combos[best],
+                f'train_{self.rank_by}': scores[best],
+                **{f'test_{name}': v for name, v in res['metrics'].items()},
+            })
+
+        oos = np.concatenate(curves)
+        oos_trades = pd.concat(trades, ignore_index=True)
+        start_equity = float(bt_params.get('starting_equity', 10000.0))
+        return {
+            'folds': pd.DataFrame(rows),
+            'equity_curve': oos,
+            'trades': oos_trades,
+            'metrics': equity_metrics(oos, start_equity, len(oos_trades),
+                                      bt_params.get('timeframe') or infer_timeframe_ms(timestamps),
+                                      trades=oos_trades, positions=np.concatenate(positions),
+                                      fee_pct=float(bt_params.get('fee_pct', 0.0005))),
+        }
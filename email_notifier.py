@@ -7,21 +7,43 @@ class EmailNotifier:
         self.user = os.getenv("EMAIL_USER")
         self.password = os.getenv("EMAIL_PASS")
         self.to = os.getenv("EMAIL_TO")
+        self._server = None  # SMTP connection kept open between messages
 
-    def send(self, subject, body):
+    def _connect(self):
+        server = smtplib.SMTP_SSL("smtp.gmail.com", 465)
+        server.login(self.user, self.password)
+        self._server = server
+        return server
+
+    def close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                pass
+            self._server = None
+
+    def send(self, subject, body) -> bool:
         if not self.user or not self.password or not self.to:
             print("[WARN] Email not configured")
-            return
-        
+            return False
+
         msg = MIMEText(body)
         msg["Subject"] = subject
         msg["From"] = self.user
         msg["To"] = self.to
 
         try:
-            with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-                server.login(self.user, self.password)
+            try:
+                server = self._server or self._connect()
                 server.sendmail(self.user, [self.to], msg.as_string())
+            except smtplib.SMTPServerDisconnected:
+                # The reused connection timed out on the server side; reconnect once
+                self._server = None
+                self._connect().sendmail(self.user, [self.to], msg.as_string())
             print("[INFO] Email sent")
+            return True
         except Exception as e:
             print("[ERROR] Failed to send email:", e)
+            self.close()
+            return False
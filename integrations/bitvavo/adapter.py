@@ -3,17 +3,20 @@ import time
 import hmac
 import hashlib
 import json
-import requests
+from bot.http_session import get_client
+from bot.markets import format_decimal
 
 class BitvavoAdapter:
     BASE_URL = "https://api.bitvavo.com/v2"
 
-    def __init__(self, api_key, api_secret, dry_run=True, default_market="BTC-EUR", order_size_eur=5.0):
+    def __init__(self, api_key, api_secret, dry_run=True, default_market="BTC-EUR", order_size_eur=5.0, http=None):
         self.apiKey = api_key
         self.apiSecret = api_secret.encode("utf-8")
         self.dry_run = dry_run
         self.default_market = default_market
         self.order_size_eur = order_size_eur
+        self.stream = None
+        self.http = http or get_client()
 
     def _headers(self, method: str, endpoint: str, body=None):
         timestamp = str(int(time.time() * 1000))
@@ -33,33 +36,81 @@ class BitvavoAdapter:
     def _signed_get(self, endpoint, params=None):
         url = self.BASE_URL + endpoint
         headers = self._headers("GET", endpoint)
-        resp = requests.get(url, headers=headers, params=params)
+        resp = self.http.get(url, headers=headers, params=params)
         resp.raise_for_status()
         return resp.json()
 
     def _signed_post(self, endpoint, data=None):
         url = self.BASE_URL + endpoint
         headers = self._headers("POST", endpoint, data)
-        resp = requests.post(url, headers=headers, json=data)
+        resp = self.http.post(url, headers=headers, json=data)
         resp.raise_for_status()
         return resp.json()
 
+    def _signed_delete(self, endpoint, params=None):
+        # Bitvavo signs the path including its query string
+        if params:
+            endpoint += "?" + "&".join(f"{k}={v}" for k, v in params.items())
+        url = self.BASE_URL + endpoint
+        headers = self._headers("DELETE", endpoint)
+        resp = self.http.request("DELETE", url, headers=headers)
+        resp.raise_for_status()
+        return resp.json()
+
+    # Streaming mode
+    def start_stream(self, markets=None, intervals=("1m",), buffer_size=200, ws_url=None):
+        """
+        Serve recent_candles / get_latest_price from websocket-fed memory.
+        Calls fall back to REST until the stream is connected and buffered.
+        """
+        from .stream import BitvavoStream, WS_URL
+        self.stream = BitvavoStream(
+            markets or [self.default_market],
+            intervals=intervals,
+            buffer_size=buffer_size,
+            backfill=self._rest_candles,
+            ws_url=ws_url or WS_URL,
+        ).start()
+        return self.stream
+
+    def stop_stream(self):
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream = None
+
     # Public endpoints
     def recent_candles(self, market=None, interval="1m", limit=200):
         market = market or self.default_market
+        if self.stream is not None:
+            candles = self.stream.candles(market, interval, limit)
+            if candles is not None:
+                return candles
+        return self._rest_candles(market, interval, limit)
+
+    def _rest_candles(self, market, interval="1m", limit=200):
         url = f"{self.BASE_URL}/{market}/candles"
         params = {"interval": interval, "limit": limit}
-        resp = requests.get(url, params=params)
+        resp = self.http.get(url, params=params)
         resp.raise_for_status()
         return resp.json()
 
     def get_latest_price(self, market=None):
         market = market or self.default_market
+        if self.stream is not None:
+            price = self.stream.latest_price(market)
+            if price is not None:
+                return price
         url = f"{self.BASE_URL}/{market}/ticker/price"
-        resp = requests.get(url)
+        resp = self.http.get(url)
         resp.raise_for_status()
         return float(resp.json()["price"])
 
+    def get_markets(self):
+        # Public: lot/tick/minimum-order metadata for every market (cached by bot/markets.py)
+        resp = self.http.get(f"{self.BASE_URL}/markets")
+        resp.raise_for_status()
+        return resp.json()
+
     # Authenticated endpoints
     def get_balance(self):
         if self.dry_run:
@@ -72,10 +123,11 @@ class BitvavoAdapter:
             return []
         return self._signed_get("/orders", params={"market": market})
 
-    def create_order(self, market=None, side="buy", order_type="market", amount=0.0):
+    def create_order(self, market=None, side="buy", order_type="market", amount=0.0,
+                     price=None, amount_quote=None, client_order_id=None):
         market = market or self.default_market
         if self.dry_run:
-            print(f"[DRY RUN] {side.upper()} {amount} {market}")
+            print(f"[DRY RUN] {side.upper()} {amount_quote or amount} {market}")
             return {"status": "dry_run", "side": side, "amount": amount, "market": market}
 
         endpoint = "/order"
@@ -83,6 +135,19 @@ class BitvavoAdapter:
             "market": market,
             "side": side,
             "type": order_type,
-            "amount": str(amount)
         }
+        if amount_quote is not None:
+            data["amountQuote"] = format_decimal(amount_quote)  # market orders only
+        else:
+            data["amount"] = format_decimal(amount)
+        if price is not None:
+            data["price"] = format_decimal(price)
+        if client_order_id:
+            data["clientOrderId"] = client_order_id
         return self._signed_post(endpoint, data)
+
+    def cancel_order(self, order_id, market=None):
+        market = market or self.default_market
+        if self.dry_run:
+            return {"orderId": order_id, "status": "dry_run"}
+        return self._signed_delete("/order", params={"market": market, "orderId": order_id})
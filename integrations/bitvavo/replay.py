@@ -0,0 +1,179 @@
+# integrations/bitvavo/replay.py
+"""
+Local stand-in for Bitvavo's websocket: replays recorded frames (one JSON
+message per line) to every client once it has sent its subscribe message.
+Point BitvavoStream at `server.url` (or config.yaml bitvavo.ws_url) to run
+the stream, or the live runner, without touching the exchange.
+
+    python -m integrations.bitvavo.replay tests/fixtures/bitvavo_ws_frames.jsonl --port 8765
+"""
+import base64
+import hashlib
+import json
+import socket
+import struct
+import threading
+import time
+
+_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def load_frames(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class ReplayServer:
+    """
+    Minimal RFC 6455 server (text frames, ping/pong, close) on a background
+    thread. `delay` seconds pass between frames; with `close_after` the
+    connection is dropped once the frames are sent, to exercise reconnects.
+    """
+    def __init__(self, frames, host="127.0.0.1", port=0, delay=0.0, close_after=False):
+        self.frames = list(frames)
+        self.delay = delay
+        self.close_after = close_after
+        self.connections = 0
+        self.received = []
+        self._sock = socket.create_server((host, port))
+        self._sock.settimeout(0.2)
+        self.host, self.port = self._sock.getsockname()[:2]
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}/"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._accept, name="bitvavo-replay", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._sock.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _accept(self):
+        while not self._stop.is_set():
+            try:
+                conn, _ = self._sock.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        with conn:
+            conn.settimeout(0.2)
+            try:
+                if not self._handshake(conn):
+                    return
+                sent = False
+                while not self._stop.is_set():
+                    try:
+                        opcode, payload = self._read_frame(conn)
+                    except socket.timeout:
+                        continue
+                    if opcode is None or opcode == 0x8:
+                        self._send(conn, 0x8, b"")
+                        return
+                    if opcode == 0x9:
+                        self._send(conn, 0xA, payload)
+                    elif opcode == 0x1:
+                        self.received.append(json.loads(payload))
+                        if not sent:
+                            sent = True
+                            for frame in self.frames:
+                                if self.delay:
+                                    time.sleep(self.delay)
+                                self._send(conn, 0x1, json.dumps(frame).encode("utf-8"))
+                            if self.close_after:
+                                self._send(conn, 0x8, struct.pack("!H", 1000))
+                                return
+            except (ConnectionError, OSError):
+                return
+
+    def _handshake(self, conn):
+        request = b""
+        while b"\r\n\r\n" not in request:
+            try:
+                chunk = conn.recv(4096)
+            except socket.timeout:
+                if self._stop.is_set():
+                    return False
+                continue
+            if not chunk:
+                return False
+            request += chunk
+        key = next((line.split(":", 1)[1].strip() for line in request.decode("latin-1").split("\r\n")
+                    if line.lower().startswith("sec-websocket-key:")), None)
+        if key is None:
+            return False
+        accept = base64.b64encode(hashlib.sha1((key + _GUID).encode()).digest()).decode()
+        conn.sendall(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+        return True
+
+    def _recv_exact(self, conn, n, idle_ok=False):
+        data = b""
+        while len(data) < n:
+            try:
+                chunk = conn.recv(n - len(data))
+            except socket.timeout:
+                if idle_ok and not data:
+                    raise  # between frames: let the caller check for stop
+                continue
+            if not chunk:
+                return None
+            data += chunk
+        return data
+
+    def _read_frame(self, conn):
+        head = self._recv_exact(conn, 2, idle_ok=True)
+        if head is None:
+            return None, b""
+        opcode, length = head[0] & 0x0F, head[1] & 0x7F
+        if length == 126:
+            length = struct.unpack("!H", self._recv_exact(conn, 2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", self._recv_exact(conn, 8))[0]
+        mask = self._recv_exact(conn, 4) if head[1] & 0x80 else b"\0\0\0\0"
+        payload = self._recv_exact(conn, length) if length else b""
+        return opcode, bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+
+    def _send(self, conn, opcode, payload):
+        n = len(payload)
+        if n < 126:
+            head = struct.pack("!BB", 0x80 | opcode, n)
+        elif n < 1 << 16:
+            head = struct.pack("!BBH", 0x80 | opcode, 126, n)
+        else:
+            head = struct.pack("!BBQ", 0x80 | opcode, 127, n)
+        conn.sendall(head + payload)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Replay recorded Bitvavo websocket frames locally")
+    parser.add_argument("frames")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.5)
+    args = parser.parse_args()
+    with ReplayServer(load_frames(args.frames), port=args.port, delay=args.delay) as server:
+        print(f"[BITVAVO REPLAY] serving {len(server.frames)} frames on {server.url}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,203 @@
+# integrations/bitvavo/stream.py
+import json
+import itertools
+import queue
+import threading
+import time
+from collections import deque
+
+try:
+    import websocket  # websocket-client
+except Exception:
+    websocket = None
+
+WS_URL = "wss://ws.bitvavo.com/v2/"
+
+INTERVAL_MS = {
+    "1m": 60_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000,
+    "1h": 3_600_000, "2h": 7_200_000, "4h": 14_400_000, "6h": 21_600_000,
+    "8h": 28_800_000, "12h": 43_200_000, "1d": 86_400_000,
+}
+
+
+class BitvavoStream:
+    """
+    Keeps the latest `buffer_size` candles per (market, interval) and the last
+    ticker price per market in memory, fed by Bitvavo's websocket `candles` and
+    `ticker` channels on a background thread.
+
+    Candles are stored like the REST API returns them: [ts, "o", "h", "l", "c", "v"].
+    On every (re)connect, and whenever a candle arrives that skips over missing
+    ones, the buffer is backfilled with `backfill(market, interval, limit)`.
+    Backfills run on their own thread so the websocket keeps reading; until
+    one lands, candles() doesn't serve that buffer.
+    """
+    def __init__(self, markets, intervals=("1m",), buffer_size=200, backfill=None,
+                 ws_url=WS_URL, reconnect_delay=1.0, max_reconnect_delay=30.0, ping_interval=20, ping_timeout=10):
+        if websocket is None:
+            raise RuntimeError("websocket-client not installed. pip install websocket-client")
+        self.markets = list(markets)
+        self.intervals = list(intervals)
+        self.buffer_size = buffer_size
+        self.backfill = backfill
+        self.ws_url = ws_url
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        # stop() can take up to ping_timeout: the reader only notices the close on its next wake-up
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+
+        self._candles = {(m, i): deque(maxlen=buffer_size) for m in self.markets for i in self.intervals}
+        self._prices = {}
+        self._lock = threading.Lock()
+        self._ws = None
+        self._thread = None
+        self._backfills = queue.Queue()
+        self._backfill_thread = None
+        self._queued = set()  # (market, interval) waiting for the backfill thread
+        self._stale = set()   # buffers that may have holes until their backfill lands
+        self._stop = threading.Event()
+        self.connected = threading.Event()
+        self.reconnects = 0
+        self.gaps = 0
+
+    # --- lifecycle ---
+
+    def start(self):
+        self._stop.clear()
+        self._backfill_thread = threading.Thread(target=self._run_backfills, name="bitvavo-backfill", daemon=True)
+        self._backfill_thread.start()
+        self._thread = threading.Thread(target=self._run, name="bitvavo-ws", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._ws is not None:
+            self._ws.close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._backfills.put(None)
+        if self._backfill_thread is not None:
+            self._backfill_thread.join(timeout=5)
+
+    def _run(self):
+        delay = self.reconnect_delay
+        while not self._stop.is_set():
+            self._ws = websocket.WebSocketApp(
+                self.ws_url,
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_error=lambda ws, err: print(f"[BITVAVO WS] error: {err}"),
+            )
+            started = time.monotonic()
+            self._ws.run_forever(ping_interval=self.ping_interval, ping_timeout=self.ping_timeout)
+            self.connected.clear()
+            if self._stop.is_set():
+                break
+            # Reset the backoff after a connection that stayed up for a while
+            if time.monotonic() - started > self.max_reconnect_delay:
+                delay = self.reconnect_delay
+            self.reconnects += 1
+            print(f"[BITVAVO WS] disconnected, reconnecting in {delay:.1f}s")
+            self._stop.wait(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _on_open(self, ws):
+        ws.send(json.dumps({
+            "action": "subscribe",
+            "channels": [
+                {"name": "candles", "interval": self.intervals, "markets": self.markets},
+                {"name": "ticker", "markets": self.markets},
+            ],
+        }))
+        # Anything missed while disconnected comes from REST
+        for market in self.markets:
+            for interval in self.intervals:
+                self._request_backfill(market, interval)
+        self.connected.set()
+
+    # --- message handling ---
+
+    def _on_message(self, ws, message):
+        msg = json.loads(message)
+        event = msg.get("event")
+        if event == "candle":
+            for candle in msg.get("candle", []):
+                self._add_candle(msg["market"], msg["interval"], candle)
+        elif event == "ticker":
+            price = msg.get("lastPrice") or msg.get("bestBid")
+            if price is not None:
+                with self._lock:
+                    self._prices[msg["market"]] = float(price)
+
+    def _add_candle(self, market, interval, candle):
+        key = (market, interval)
+        step = INTERVAL_MS.get(interval)
+        with self._lock:
+            buf = self._candles.setdefault(key, deque(maxlen=self.buffer_size))
+            last_ts = buf[-1][0] if buf else None
+            if last_ts is not None and candle[0] == last_ts:
+                buf[-1] = candle  # update of the candle that is still forming
+                return
+            if last_ts is not None and candle[0] < last_ts:
+                return
+            gap = last_ts is not None and step is not None and candle[0] - last_ts > step
+            buf.append(candle)
+        if gap:
+            self.gaps += 1
+            self._request_backfill(market, interval)
+
+    # --- backfill (own thread: REST calls never block the websocket) ---
+
+    def _request_backfill(self, market, interval):
+        if self.backfill is None:
+            return
+        key = (market, interval)
+        with self._lock:
+            self._stale.add(key)
+            if key in self._queued:
+                return
+            self._queued.add(key)
+        self._backfills.put(key)
+
+    def _run_backfills(self):
+        while True:
+            key = self._backfills.get()
+            if key is None:
+                return
+            with self._lock:
+                # a request arriving while this one fetches queues another pass
+                self._queued.discard(key)
+            self._backfill(*key)
+
+    def _backfill(self, market, interval):
+        key = (market, interval)
+        try:
+            rows = self.backfill(market, interval, self.buffer_size)
+        except Exception as e:
+            print(f"[BITVAVO WS] backfill failed for {market} {interval}: {e}")
+            rows = []
+        with self._lock:
+            buf = self._candles.setdefault(key, deque(maxlen=self.buffer_size))
+            merged = {c[0]: c for c in buf}
+            merged.update({c[0]: c for c in rows})  # REST is authoritative for what it returns
+            buf.clear()
+            buf.extend(merged[ts] for ts in sorted(merged)[-self.buffer_size:])
+            if key not in self._queued:
+                self._stale.discard(key)
+
+    # --- reads ---
+
+    def candles(self, market, interval, limit):
+        """Newest first, like the REST endpoint. None if the buffer can't serve `limit` candles."""
+        with self._lock:
+            buf = self._candles.get((market, interval))
+            stale = (market, interval) in self._stale
+            if not self.connected.is_set() or stale or buf is None or len(buf) < limit:
+                return None
+            return [list(c) for c in itertools.islice(reversed(buf), limit)]
+
+    def latest_price(self, market):
+        with self._lock:
+            return self._prices.get(market) if self.connected.is_set() else None
@@ -0,0 +1,201 @@
+import queue
+import threading
+import time
+
+
+class NotificationDispatcher:
+    """
+    Background delivery for TelegramNotifier / EmailNotifier so the trading
+    loop never waits on Telegram or SMTP.
+
+    notify() only enqueues and returns immediately. A single worker thread:
+    - sends queued Telegram messages, joining whatever piled up into one
+      message (split over several sends past TELEGRAM_MAX_LEN characters)
+      and keeping at least `telegram_min_interval` between sends
+    - folds messages posted with a `digest` key (e.g. per-cycle signal pings)
+      into one summary per key every `digest_seconds`
+    - sends email over the notifier's reused SMTP connection
+    - after a Telegram 429, holds the message until `retry_after` has passed
+      (later Telegram messages join it) instead of sleeping through it
+    When the queue is full, messages are dropped and counted per channel.
+    """
+    TELEGRAM_MAX_LEN = 4096
+
+    def __init__(self, telegram=None, email=None, max_queue=1000, digest_seconds=300.0,
+                 telegram_min_interval=1.0, email_idle_close=60.0):
+        self.telegram = telegram
+        self.email = email
+        self.digest_seconds = digest_seconds
+        self.telegram_min_interval = telegram_min_interval
+        self.email_idle_close = email_idle_close
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._digests = {}  # key -> {'count', 'first', 'last'}
+        self._digest_lock = threading.Lock()
+        self._last_digest_flush = time.monotonic()
+        self._last_telegram = 0.0
+        self._last_email = 0.0
+        self._retry = None  # (not_before, messages): Telegram send held back after a 429
+        self._stop = threading.Event()
+        self._stats_lock = threading.Lock()  # notify() runs on caller threads, sends on the worker
+        self.stats = {'queued': 0, 'sent': 0, 'failed': 0, 'coalesced': 0,
+                      'dropped': {'telegram': 0, 'email': 0}}
+        self._thread = threading.Thread(target=self._run, name="notifier", daemon=True)
+        self._thread.start()
+
+    # --- producer side (never blocks) ---
+
+    def notify(self, message: str, digest: str = None):
+        """Telegram message. With `digest`, it is folded into that key's periodic summary."""
+        if digest is not None:
+            with self._digest_lock:
+                d = self._digests.get(digest)
+                if d is None:
+                    self._digests[digest] = {'count': 1, 'first': message, 'last': message}
+                else:
+                    d['count'] += 1
+                    d['last'] = message
+                    self._count('coalesced')
+            return
+        self._put(('telegram', message))
+
+    def email_notify(self, subject: str, body: str):
+        self._put(('email', (subject, body)))
+
+    def _put(self, item):
+        try:
+            self._queue.put_nowait(item)
+            self._count('queued')
+        except queue.Full:
+            self._count('dropped', item[0])
+
+    def _count(self, key, channel=None):
+        with self._stats_lock:
+            if channel is None:
+                self.stats[key] += 1
+            else:
+                self.stats[key][channel] += 1
+
+    # --- worker ---
+
+    def _run(self):
+        while not self._stop.is_set() or not self._queue.empty() or self._retry is not None:
+            timeout = 0.5
+            if self._retry is not None:
+                timeout = min(timeout, max(0.01, self._retry[0] - time.monotonic()))
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is not None:
+                channel, payload = item
+                if channel == 'telegram':
+                    self._send_telegram([payload] + self._drain_telegram())
+                else:
+                    self._send_email(*payload)
+
+            if self._retry is not None and time.monotonic() >= self._retry[0]:
+                self._send_retry()
+            if time.monotonic() - self._last_digest_flush >= self.digest_seconds:
+                self.flush_digests()
+            self._maybe_close_email()
+
+        # Final flush happens here, on the worker, so it can't race a stop() whose join timed out
+        self.flush_digests()
+        if self._retry is not None:
+            time.sleep(max(0.0, self._retry[0] - time.monotonic()))
+            self._send_retry()
+        if self.email is not None:
+            self.email.close()
+
+    def _drain_telegram(self):
+        # Take every Telegram message already waiting so they go out as one
+        msgs = []
+        while True:
+            try:
+                channel, payload = self._queue.get_nowait()
+            except queue.Empty:
+                return msgs
+            if channel == 'telegram':
+                msgs.append(payload)
+                self._count('coalesced')
+            else:
+                self._send_email(*payload)
+
+    def flush_digests(self):
+        """Send pending digests now. Worker thread only (stop() triggers the final one)."""
+        self._last_digest_flush = time.monotonic()
+        with self._digest_lock:
+            digests, self._digests = self._digests, {}
+        lines = []
+        for key, d in digests.items():
+            if d['count'] == 1:
+                lines.append(d['last'])
+            else:
+                lines.append(f"[{key}] {d['count']} updates, latest: {d['last']}")
+        if lines:
+            self._send_telegram(lines)
+
+    def _send_telegram(self, messages, retry=False):
+        if self.telegram is None:
+            return
+        if self._retry is not None and not retry:
+            # Still backing off: go out together with the held message
+            self._retry[1].extend(messages)
+            return
+        texts = self._split(messages)
+        for k, text in enumerate(texts):
+            wait = self._last_telegram + self.telegram_min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            ok = self.telegram.send(text)
+            self._last_telegram = time.monotonic()
+            retry_after = getattr(self.telegram, 'retry_after', 0)
+            if ok is False and retry_after and not retry:
+                # Telegram asked us to back off (HTTP 429); try the rest once more after that
+                self._retry = (self._last_telegram + retry_after, texts[k:])
+                return
+            self._count('sent' if ok is not False else 'failed')
+
+    def _split(self, messages):
+        # Whole messages packed into texts of at most TELEGRAM_MAX_LEN; longer messages are cut into pieces
+        limit = self.TELEGRAM_MAX_LEN
+        texts, current = [], None
+        for message in messages:
+            for piece in [message[i:i + limit] for i in range(0, len(message), limit)] or [message]:
+                if current is not None and len(current) + 1 + len(piece) <= limit:
+                    current += "\n" + piece
+                else:
+                    if current is not None:
+                        texts.append(current)
+                    current = piece
+        if current is not None:
+            texts.append(current)
+        return texts
+
+    def _send_retry(self):
+        _, messages = self._retry
+        self._retry = None
+        self._send_telegram(messages, retry=True)
+
+    def _send_email(self, subject, body):
+        if self.email is None:
+            return
+        ok = self.email.send(subject, body)
+        self._last_email = time.monotonic()
+        self._count('sent' if ok is not False else 'failed')
+
+    def _maybe_close_email(self):
+        if self.email is not None and self._last_email and \
+                time.monotonic() - self._last_email > self.email_idle_close:
+            self.email.close()
+            self._last_email = 0.0
+
+    def stop(self, timeout: float = 10.0):
+        """Deliver what is queued (including pending digests) and stop the worker."""
+        self._stop.set()
+        self._thread.join(timeout=timeout)
+        if self._thread.is_alive():
+            # The worker flushes digests and closes email itself once it gets there
+            print(f"[WARN] Notifier still delivering after {timeout}s; leaving the rest to the worker thread")
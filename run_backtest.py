@@ -4,11 +4,11 @@ from bot.backtest import Backtester
 from bot.strategy import get_strategy
 from bot.risk import RiskManager
 from bot.data import HistoricalDataSource
-from bot.utils import ensure_dir
+from bot import indicator_cache
 
 def main():
     cfg = load_config("config.yaml")
-    ensure_dir("artifacts")
+    indicator_cache.configure(**(cfg.get('indicator_cache') or {}))
     data = HistoricalDataSource(cfg)
     candles = data.get_historical(limit=2000)  # DataFrame with ['timestamp','open','high','low','close','volume']
     StrategyCls = get_strategy(cfg['strategy']['name'])
@@ -17,7 +17,10 @@ def main():
     bt = Backtester(cfg['backtest'], strat, risk)
     results = bt.run(candles)
     print("Backtest Metrics:", results['metrics'])
-    print("Wrote artifacts to ./artifacts")
+    print("Indicator cache:", indicator_cache.get_cache().stats())
+    if results['artifacts'] is not None:
+        results['artifacts'].result()
+        print("Wrote artifacts to", results['files']['run_dir'])
 
 if __name__ == "__main__":
     main()
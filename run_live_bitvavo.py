@@ -1,73 +1,94 @@
 # run_live_bitvavo.py
 import os
-import time
-import pandas as pd
-from bot.broker_bitvavo import BitvavoBroker
+import yaml
+from bot.broker import get_broker
+from bot.live import RunnerPosition, StrategyFeed
+from bot.strategy import get_strategy
+from bot.orders import OrderRequest
+from bot.risk import RiskManager
+from bot.scheduler import CandleScheduler
+from bot.state_store import open_store
+from bot import http_session, markets
 from telegram_notifier import TelegramNotifier
+from notification_dispatcher import NotificationDispatcher
 
-# Initialize broker and Telegram notifier
-broker = BitvavoBroker()
-notifier = TelegramNotifier()
+with open("config.yaml", "r") as f:
+    CFG = yaml.safe_load(f)
+markets.configure(**(CFG.get("markets") or {}))
+http_session.configure(**(CFG.get("http") or {}))  # before the broker: its REST adapter takes the shared client
 
-def compute_signal(candles):
-    """
-    Simple SMA crossover strategy.
-    Returns: 1 = buy, -1 = sell, 0 = do nothing
-    """
-    df = pd.DataFrame(candles)
-    if len(df) < 50:
-        return 0
+# Initialize broker and Telegram notifier (delivered from a background thread)
+broker = get_broker("bitvavo")()
+notifier = NotificationDispatcher(telegram=TelegramNotifier())
 
-    df["sma_fast"] = df["close"].rolling(10).mean()
-    df["sma_slow"] = df["close"].rolling(40).mean()
-    last = df.iloc[-1]
-    prev = df.iloc[-2]
-
-    if prev["sma_fast"] <= prev["sma_slow"] and last["sma_fast"] > last["sma_slow"]:
-        return 1
-    if prev["sma_fast"] >= prev["sma_slow"] and last["sma_fast"] < last["sma_slow"]:
-        return -1
-    return 0
+def closed_candles(raw, tick):
+    """Bitvavo rows ([ts, "o", "h", "l", "c", "v"], newest first) -> closed candles as dicts, oldest first."""
+    rows = sorted(tick.closed(raw, ts=lambda c: c[0]), key=lambda c: c[0])
+    return [{"timestamp": int(c[0]), "open": float(c[1]), "high": float(c[2]), "low": float(c[3]),
+             "close": float(c[4]), "volume": float(c[5])} for c in rows]
 
 if __name__ == "__main__":
     print("[LIVE BITVAVO] Bot started")
-    notifier.send("🚀 Bitvavo bot started (live mode)")
+    notifier.notify("🚀 Bitvavo bot started (live mode)")
 
     BUY_AMOUNT = float(os.getenv("BUY_AMOUNT", "0.001"))
-    SELL_AMOUNT = float(os.getenv("SELL_AMOUNT", "0.001"))
     MARKET = broker.default_market
+    # Orders and fills are journaled; after a restart the position (and its exits) is known without asking Bitvavo
+    store = open_store(CFG, "bitvavo")
+    position = RunnerPosition(store, MARKET, RiskManager(CFG.get("risk") or {}))
+    print("[STATE] position:", position.size or "flat", "exits (sl, tp):", position.exits)
+    bv_cfg = CFG.get("bitvavo") or {}
+    if bv_cfg.get("stream"):
+        # Candles and prices from the websocket buffer; recent_candles falls back to REST until it is ready
+        broker.start_stream(intervals=("1m",), buffer_size=200, ws_url=bv_cfg.get("ws_url"))
+    # One strategy instance for the market, stepped once per new closed candle
+    feed = StrategyFeed(get_strategy(CFG["strategy"]["name"])(CFG["strategy"].get("params", {})), "1m")
 
-    while True:
+    # One cycle per closed 1-minute candle, SETTLE_MS after the close
+    scheduler = CandleScheduler("1m", float(os.getenv("SETTLE_MS", "2000")))
+    for tick in scheduler:
         try:
             # Fetch last 200 candles with 1-minute interval
-            candles = broker.recent_candles(limit=200, interval="1m")
+            candles = closed_candles(broker.recent_candles(limit=200, interval="1m"), tick)
             print(f"DEBUG candles fetched: {len(candles)}")
-            sig = compute_signal(candles)
+            sig = feed.update(candles)
+            tick.mark("signal")
             last_close = candles[-1]["close"] if candles else None
             print(f"signal: {sig} last close: {last_close}")
+            if last_close is not None:
+                store.record_equity(prices={MARKET: last_close})
+
+            # Per-cycle signal pings are summarised into a periodic digest
+            notifier.notify(f"📊 Signal: {sig} | Last Close: {last_close}", digest="signal")
 
-            # Telegram notification every cycle
-            notifier.send(f"📊 Signal: {sig} | Last Close: {last_close}")
+            if candles and position.exit_hit(candles[-1]):
+                print(f"[RISK] stop-loss / take-profit {position.exits} touched, closing")
+                sig = -1
 
-            # Execute trade if signal
-            if sig == 1:
+            # Execute trade if signal: enter when flat, close what is held
+            if sig == 1 and position.size == 0:
                 print(f"[TRADE] BUY {BUY_AMOUNT} {MARKET.split('-')[0]}")
-                res = broker.create_order(side="buy", amount=BUY_AMOUNT)
-                msg = f"✅ BUY {BUY_AMOUNT} {MARKET.split('-')[0]} at {last_close}\nResult: {res}"
+                res = broker.submit(OrderRequest(MARKET, "buy", BUY_AMOUNT))
+                tick.mark("order")
+                position.record(res, last_close)
+                msg = f"✅ BUY {BUY_AMOUNT} {MARKET.split('-')[0]} at {last_close}\nResult: {res.status} {res.order_id or ''} {res.error or ''}"
                 print(msg)
-                notifier.send(msg)
+                notifier.notify(msg)
 
-            elif sig == -1:
-                print(f"[TRADE] SELL {SELL_AMOUNT} {MARKET.split('-')[0]}")
-                res = broker.create_order(side="sell", amount=SELL_AMOUNT)
-                msg = f"❌ SELL {SELL_AMOUNT} {MARKET.split('-')[0]} at {last_close}\nResult: {res}"
+            elif sig == -1 and position.size > 0:
+                amount = position.size
+                print(f"[TRADE] SELL {amount} {MARKET.split('-')[0]}")
+                res = broker.submit(OrderRequest(MARKET, "sell", amount))
+                tick.mark("order")
+                position.record(res, last_close)
+                msg = f"❌ SELL {amount} {MARKET.split('-')[0]} at {last_close}\nResult: {res.status} {res.order_id or ''} {res.error or ''}"
                 print(msg)
-                notifier.send(msg)
+                notifier.notify(msg)
 
         except Exception as e:
             print("[ERROR]", e)
-            notifier.send(f"⚠️ ERROR: {e}")
+            notifier.notify(f"⚠️ ERROR: {e}")
 
-        time.sleep(60)  # wait 1 minute per cycle
+        scheduler.report(tick)
 
 
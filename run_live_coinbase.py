@@ -1,57 +1,75 @@
 # Live trading runner (Option B, 2025 Coinbase API)
 from dotenv import load_dotenv
-import os, time, pandas as pd, yaml
-from bot.broker_coinbase import CoinbaseBroker
+import os, yaml
+from bot.broker import get_broker
+from bot.live import RunnerPosition, StrategyFeed
+from bot.risk import RiskManager
+from bot.strategy import get_strategy
+from bot.scheduler import CandleScheduler
+from bot.state_store import open_store
+from bot import http_session, markets
 
 load_dotenv()
 
 # Load config.yaml
 with open("config.yaml", "r") as f:
     CFG = yaml.safe_load(f)
+markets.configure(**(CFG.get("markets") or {}))
+http_session.configure(**(CFG.get("http") or {}))
 
 # Initialize Coinbase broker
-broker = CoinbaseBroker(CFG)
-
-# --- Strategy ---
-def compute_signal(candles):
-    df = pd.DataFrame(candles)
-    if len(df) < 50:
-        return 0
-    df["sma_fast"] = df["close"].rolling(10).mean()
-    df["sma_slow"] = df["close"].rolling(40).mean()
-    last = df.iloc[-1]
-    prev = df.iloc[-2]
-    if prev["sma_fast"] <= prev["sma_slow"] and last["sma_fast"] > last["sma_slow"]:
-        return 1   # bullish crossover → buy
-    if prev["sma_fast"] >= prev["sma_slow"] and last["sma_fast"] < last["sma_slow"]:
-        return -1  # bearish crossover → sell
-    return 0
+broker = get_broker("coinbase")(CFG)
 
 # --- Runner ---
 if __name__ == "__main__":
     print("[LIVE] starting...")
-    BUY_AMOUNT_USD = float(os.getenv("BUY_AMOUNT_USD", "100"))     # $100 per buy
-    SELL_AMOUNT_BASE = float(os.getenv("SELL_AMOUNT_BASE", "0.001"))  # 0.001 BTC per sell
+    # Orders and fills are journaled; after a restart the position (and its exits) is known without asking Coinbase
+    store = open_store(CFG, "coinbase")
+    position = RunnerPosition(store, broker.product_id, RiskManager(CFG.get("risk") or {}))
+    print("[STATE] position:", position.size or "flat", "exits (sl, tp):", position.exits)
+    BUY_AMOUNT_USD = float(os.getenv("BUY_AMOUNT_USD", "100"))     # $100 per buy; sells close the position
 
-    while True:
+    # One strategy instance for the product, stepped once per new closed candle
+    feed = StrategyFeed(get_strategy(CFG["strategy"]["name"])(CFG["strategy"].get("params", {})), broker.timeframe)
+
+    # One cycle per closed candle of market.timeframe
+    scheduler = CandleScheduler(broker.timeframe, (CFG.get("scheduler") or {}).get("settle_ms", 2000))
+    for tick in scheduler:
         try:
-            candles = broker.recent_candles(limit=200)
-            sig = compute_signal(candles)
+            candles = tick.closed(broker.recent_candles(limit=200), ts=lambda c: int(c["start"]) * 1000)
+            sig = feed.update([dict(c, timestamp=int(c["start"]) * 1000) for c in candles])
+            tick.mark("signal")
 
             last_close = candles[-1]["close"] if candles else None
             print("signal:", sig, "last close:", last_close)
+            if last_close is not None:
+                store.record_equity(prices={broker.product_id: last_close})
+
+            if candles and position.exit_hit(candles[-1]):
+                print(f"[RISK] stop-loss / take-profit {position.exits} touched, closing")
+                sig = -1
 
-            if sig == 1:
+            if sig == 1 and position.size == 0:
                 print(f"[TRADE] BUY {BUY_AMOUNT_USD} USD of {broker.product_id}")
-                result = broker.buy(BUY_AMOUNT_USD)
+                # Market orders are answered before they fill: journal the size Coinbase reports filled
+                result = broker.settle(broker.buy(BUY_AMOUNT_USD))
+                tick.mark("order")
+                amount = None
+                if result.ok and not result.fills:
+                    # still unfilled after the timeout: never journal more than the account holds
+                    held = broker.balances().get(broker.product_id.split("-")[0])
+                    amount = min(BUY_AMOUNT_USD / last_close, held.free if held else 0.0)
+                position.record(result, last_close, amount=amount)
                 print("Order result:", result)
 
-            elif sig == -1:
-                print(f"[TRADE] SELL {SELL_AMOUNT_BASE} {broker.product_id.split('-')[0]}")
-                result = broker.sell(SELL_AMOUNT_BASE)
+            elif sig == -1 and position.size > 0:
+                print(f"[TRADE] SELL {position.size} {broker.product_id.split('-')[0]}")
+                result = broker.settle(broker.sell(position.size))
+                tick.mark("order")
+                position.record(result, last_close)
                 print("Order result:", result)
 
         except Exception as e:
             print("[ERROR]", e)
 
-        time.sleep(60)
+        scheduler.report(tick)
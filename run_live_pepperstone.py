@@ -1,50 +1,62 @@
 
 # Live trading runner for Pepperstone via MT5
 from dotenv import load_dotenv
-from bot.broker_pepperstone_mt5 import PepperstoneMT5Broker
-import os, time, pandas as pd, yaml
-from bot.broker_pepperstone_mt5 import PepperstoneMT5Broker
+import os, yaml
+from bot.broker import get_broker
+from bot.live import RunnerPosition, StrategyFeed
+from bot.risk import RiskManager
+from bot.strategy import get_strategy
+from bot.scheduler import CandleScheduler
+from bot.state_store import open_store
+from bot import http_session, markets
 
 load_dotenv()
 
 with open("config.yaml","r") as f:
     CFG = yaml.safe_load(f)
+markets.configure(**(CFG.get("markets") or {}))
+http_session.configure(**(CFG.get("http") or {}))
 
-broker = PepperstoneMT5Broker(CFG)
-
-def compute_signal(candles):
-    df = pd.DataFrame(candles)
-    if len(df) < 50:
-        return 0
-    df["sma_fast"] = df["close"].rolling(10).mean()
-    df["sma_slow"] = df["close"].rolling(40).mean()
-    last = df.iloc[-1]
-    prev = df.iloc[-2]
-    if prev["sma_fast"] <= prev["sma_slow"] and last["sma_fast"] > last["sma_slow"]:
-        return 1
-    if prev["sma_fast"] >= prev["sma_slow"] and last["sma_fast"] < last["sma_slow"]:
-        return -1
-    return 0
+broker = get_broker("pepperstone_mt5")(CFG)
 
 if __name__ == "__main__":
     print("[LIVE MT5] starting...")
-    BUY_AMOUNT_USD = float(os.getenv("BUY_AMOUNT_USD","100"))
-    SELL_LOTS = float(os.getenv("SELL_LOTS","0.001"))
+    # Orders and fills are journaled; after a restart the position is known without asking MT5
+    store = open_store(CFG, "pepperstone_mt5")
+    position = RunnerPosition(store, broker.symbol, RiskManager(CFG.get("risk") or {}))
+    print("[STATE] position:", position.size or "flat", "exits (sl, tp):", position.exits)
+    BUY_AMOUNT_USD = float(os.getenv("BUY_AMOUNT_USD","100"))  # sells close the position
+
+    # One strategy instance for the symbol, stepped once per new closed candle
+    feed = StrategyFeed(get_strategy(CFG["strategy"]["name"])(CFG["strategy"].get("params", {})), broker.timeframe)
 
-    while True:
+    scheduler = CandleScheduler(broker.timeframe, (CFG.get("scheduler") or {}).get("settle_ms", 2000))
+    for tick in scheduler:
         try:
-            candles = broker.recent_candles(limit=200)
-            sig = compute_signal(candles)
+            # MT5 includes the forming bar; "time" is the bar's open in seconds
+            candles = tick.closed(broker.recent_candles(limit=200), ts=lambda c: c["time"] * 1000)
+            sig = feed.update([{"timestamp": int(c["time"]) * 1000, "open": c["open"], "high": c["high"],
+                               "low": c["low"], "close": c["close"], "volume": c["tick_volume"]} for c in candles])
+            tick.mark("signal")
             last_close = candles[-1]["close"] if candles else None
             print("signal:", sig, "last close:", last_close)
-            if sig==1:
+            if last_close is not None:
+                store.record_equity(prices={broker.symbol: last_close})
+            if candles and position.exit_hit(candles[-1]):
+                print(f"[RISK] stop-loss / take-profit {position.exits} touched, closing")
+                sig = -1
+            if sig==1 and position.size == 0:
                 print(f"[TRADE] BUY ${BUY_AMOUNT_USD} -> converting to lots")
                 res = broker.buy(usd_amount=BUY_AMOUNT_USD)
+                tick.mark("order")
+                position.record(res, last_close)
                 print("result:", res)
-            elif sig==-1:
-                print(f"[TRADE] SELL {SELL_LOTS} lots")
-                res = broker.sell(lots=SELL_LOTS)
+            elif sig==-1 and position.size > 0:
+                print(f"[TRADE] SELL {position.size} lots")
+                res = broker.sell(lots=position.size)
+                tick.mark("order")
+                position.record(res, last_close)
                 print("result:", res)
         except Exception as e:
             print("[ERROR]", e)
-        time.sleep(60)
+        scheduler.report(tick)
@@ -1,20 +1,19 @@
 # run_paper_trading.py
 import yaml
-from bot.broker_pepperstone_mt5 import PepperstoneMT5Broker
 from bot.live import TradingLoop
-from bot.broker import Broker
-from bot.broker_pepperstone_mt5 import PepperstoneMT5Broker
-
- # assuming you have a Broker class
+from bot.broker import get_broker
+from bot import http_session, markets
 
 
 def main():
     # Load config
     with open("config.yaml", "r") as f:
         cfg = yaml.safe_load(f)
+    markets.configure(**(cfg.get('markets') or {}))
+    http_session.configure(**(cfg.get('http') or {}))
 
     # Initialize broker
-    broker = Broker(cfg)
+    broker = get_broker("paper")(cfg)
 
     # Start trading loop
     loop = TradingLoop(broker, cfg)
@@ -0,0 +1,28 @@
+from bot.config import load_config
+from bot.portfolio import PortfolioBacktester
+from bot.strategy import get_strategy
+from bot.risk import RiskManager
+from bot.data import HistoricalDataSource
+from bot.utils import ensure_dir
+
+def main():
+    cfg = load_config("config.yaml")
+    ensure_dir("artifacts")
+    candles = {}
+    # market.symbols for several pairs; a single-symbol config backtests just market.symbol
+    for sym in cfg['market'].get('symbols') or [cfg['market']['symbol']]:
+        sym_cfg = {**cfg, 'market': {**cfg['market'], 'symbol': sym}}
+        candles[sym] = HistoricalDataSource(sym_cfg).get_historical(limit=2000)
+    StrategyCls = get_strategy(cfg['strategy']['name'])
+    strat = StrategyCls(cfg['strategy']['params'])
+    risk = RiskManager(cfg['risk'])
+    bt = PortfolioBacktester(cfg['backtest'], strat, risk)
+    results = bt.run(candles)
+    print("Portfolio Metrics:", results['metrics'])
+    for sym, stats in results['per_symbol'].items():
+        print(f"  {sym}: pnl={stats['pnl']:.2f} trades={stats['num_trades']}")
+    results['trades'].to_csv("artifacts/portfolio_trades.csv", index=False)
+    print("Wrote artifacts/portfolio_trades.csv")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+from bot.config import load_config
+from bot.candle_store import CandleStore
+from bot.stream_backtest import StreamingBacktester
+from bot.strategy import get_strategy
+from bot.risk import RiskManager
+
+def main():
+    cfg = load_config("config.yaml")
+    # Backtests whatever is in the candle cache (fill it with HistoricalDataSource.sync first)
+    store = CandleStore(cfg['data']['cache_dir'])
+    chunks = store.iter_chunks((cfg.get('exchange') or {}).get('name'), cfg['market']['symbol'], cfg['market']['timeframe'],
+                               chunk_bars=cfg['backtest'].get('stream_chunk_bars', 100_000))
+    StrategyCls = get_strategy(cfg['strategy']['name'])
+    strat = StrategyCls(cfg['strategy']['params'])
+    risk = RiskManager(cfg['risk'])
+    bt = StreamingBacktester(cfg['backtest'], strat, risk)
+    results = bt.run(chunks)
+    print(f"Backtest Metrics ({results['bars']} bars):", results['metrics'])
+    print("Wrote", results['files'])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+from bot.config import load_config
+from bot.data import HistoricalDataSource
+from bot.sweep import ParameterSweep
+from bot.utils import ensure_dir
+
+def main():
+    cfg = load_config("config.yaml")
+    sweep_cfg = cfg.get('sweep', {})
+    ensure_dir("artifacts")
+    data = HistoricalDataSource(cfg)
+    candles = data.get_historical(limit=sweep_cfg.get('candles', 2000))
+    sweep = ParameterSweep(cfg, sweep_cfg['params'], workers=sweep_cfg.get('workers'))
+    results = sweep.run(candles, rank_by=sweep_cfg.get('rank_by', 'sharpe_like'))
+    results.to_csv("artifacts/sweep_results.csv", index=False)
+    print(results.head(10).to_string(index=False))
+    print("Wrote artifacts/sweep_results.csv")
+
+if __name__ == "__main__":
+    main()
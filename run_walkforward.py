@@ -0,0 +1,25 @@
+from bot.config import load_config
+from bot.data import HistoricalDataSource
+from bot.walkforward import WalkForward
+from bot.utils import ensure_dir
+
+def main():
+    cfg = load_config("config.yaml")
+    wf_cfg = cfg.get('walkforward', {})
+    ensure_dir("artifacts")
+    data = HistoricalDataSource(cfg)
+    candles = data.get_historical(limit=wf_cfg.get('candles', 20000))
+    wf = WalkForward(cfg, cfg['sweep']['params'],
+                     train_bars=wf_cfg.get('train_bars', 5000),
+                     test_bars=wf_cfg.get('test_bars', 1000),
+                     step_bars=wf_cfg.get('step_bars'),
+                     rank_by=cfg['sweep'].get('rank_by', 'sharpe_like'),
+                     workers=cfg['sweep'].get('workers'))
+    results = wf.run(candles)
+    results['folds'].to_csv("artifacts/walkforward_folds.csv", index=False)
+    print(results['folds'].to_string(index=False))
+    print("Out-of-sample Metrics:", results['metrics'])
+    print("Wrote artifacts/walkforward_folds.csv")
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,27 @@
-import requests
 import os
+from bot.http_session import get_client
 
 class TelegramNotifier:
-    def __init__(self, token=None, chat_id=None):
+    def __init__(self, token=None, chat_id=None, http=None):
         self.token = token or os.getenv("TELEGRAM_TOKEN")
         self.chat_id = chat_id or os.getenv("TELEGRAM_CHAT_ID")
+        self.http = http or get_client()
+        self.retry_after = 0  # seconds Telegram asked us to wait after a 429
 
-    def send(self, message: str):
+    def send(self, message: str) -> bool:
         if not self.token or not self.chat_id:
             print("[WARN] Telegram not configured")
-            return
+            return False
         url = f"https://api.telegram.org/bot{self.token}/sendMessage"
         payload = {"chat_id": self.chat_id, "text": message}
         try:
-            requests.post(url, data=payload)
+            resp = self.http.post(url, data=payload)
+            if resp.status_code == 429:
+                self.retry_after = resp.json().get("parameters", {}).get("retry_after", 1)
+                print(f"[WARN] Telegram rate limited, retry after {self.retry_after}s")
+                return False
+            self.retry_after = 0
+            return resp.ok
         except Exception as e:
             print("[ERROR] Failed to send Telegram message:", e)
+            return False
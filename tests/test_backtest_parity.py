@@ -0,0 +1,35 @@
+# tests/test_backtest_parity.py
+"""The vectorized engine must reproduce the per-bar loop: same trades, same equity curve."""
+import numpy as np
+import pytest
+
+from bot.backtest import Backtester
+from bot.risk import RiskManager
+from bot.strategy import SMARSI, ScalpingStrategy
+from bot.synthetic import generate
+
+RISK = {"max_position_pct": 0.2, "stop_loss_pct": 0.02, "take_profit_pct": 0.04}
+
+
+def run(engine, strategy, candles, intrabar_stops):
+    bt = Backtester({'engine': engine, 'timeframe': '1m', 'intrabar_stops': intrabar_stops,
+                     'write_artifacts': False}, strategy, RiskManager(RISK))
+    return bt.run(candles)
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("gap_prob", [0.0, 0.01])
+@pytest.mark.parametrize("strategy_cls", [SMARSI, ScalpingStrategy])
+@pytest.mark.parametrize("intrabar_stops", [True, False])
+def test_vectorized_matches_loop(seed, gap_prob, strategy_cls, intrabar_stops):
+    candles = generate(3000, "1m", seed=seed, start_ms=1_700_000_040_000, vol=0.003, gap_prob=gap_prob)
+    loop = run('loop', strategy_cls({}), candles, intrabar_stops)
+    vec = run('vectorized', strategy_cls({}), candles, intrabar_stops)
+
+    assert len(loop['trades']) > 0
+    lt, vt = loop['trades'].reset_index(drop=True), vec['trades'].reset_index(drop=True)
+    assert list(lt['side']) == list(vt['side'])
+    np.testing.assert_array_equal(lt['ts'].to_numpy(np.int64), vt['ts'].to_numpy(np.int64))
+    np.testing.assert_allclose(lt['price'], vt['price'], rtol=1e-12)
+    np.testing.assert_allclose(lt['size'], vt['size'], rtol=1e-12)
+    np.testing.assert_allclose(loop['equity_curve'], vec['equity_curve'], rtol=0, atol=1e-6)
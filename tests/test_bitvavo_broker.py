@@ -0,0 +1,50 @@
+# tests/test_bitvavo_broker.py
+from bot.broker_bitvavo import BitvavoBroker
+from bot.orders import OrderRequest
+
+
+class RecordingAdapter:
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = []
+
+    def create_order(self, **kwargs):
+        self.calls.append(kwargs)
+        return self.reply
+
+    def cancel_order(self, order_id, market=None):
+        return self.reply
+
+
+def broker_with(reply):
+    broker = BitvavoBroker(api_key="", api_secret="", dry_run=False)
+    broker.adapter = RecordingAdapter(reply)
+    broker.markets = None
+    return broker
+
+
+def test_price_only_sent_on_limit_orders():
+    broker = broker_with({"orderId": "1", "status": "new"})
+    broker.submit(OrderRequest("BTC-EUR", "buy", 0.01, price=60000.0))
+    broker.submit(OrderRequest("BTC-EUR", "buy", 0.01, "limit", price=59000.0))
+    assert [c["price"] for c in broker.adapter.calls] == [None, 59000.0]
+
+
+def test_filled_market_order():
+    broker = broker_with({"orderId": "1", "status": "filled", "filledAmount": "0.01", "filledAmountQuote": "600",
+                          "fills": [{"amount": "0.01", "price": "60000", "fee": "1.5"}]})
+    res = broker.submit(OrderRequest("BTC-EUR", "buy", 0.01))
+    assert res.ok and res.status == "filled"
+    assert res.filled == 0.01 and res.avg_price == 60000.0 and res.fills[0].fee == 1.5
+
+
+def test_error_payload_and_non_dict_reply_are_rejections():
+    res = broker_with({"errorCode": 205, "error": "price is not allowed"}).submit(OrderRequest("BTC-EUR", "buy", 0.01))
+    assert not res.ok and res.status == "rejected" and "205" in res.error
+
+    res = broker_with(["unexpected"]).submit(OrderRequest("BTC-EUR", "buy", 0.01))
+    assert not res.ok and res.status == "rejected" and "unexpected response" in res.error
+
+    res = broker_with({"errorCode": 240, "error": "order not found"}).cancel("1")
+    assert not res.ok and res.status == "rejected"
+    assert broker_with({"orderId": "1"}).cancel("1").status == "canceled"
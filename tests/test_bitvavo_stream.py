@@ -0,0 +1,52 @@
+# tests/test_bitvavo_stream.py
+import os
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("websocket")
+
+from integrations.bitvavo.replay import ReplayServer, load_frames
+from integrations.bitvavo.stream import BitvavoStream
+
+FRAMES = os.path.join(os.path.dirname(__file__), "fixtures", "bitvavo_ws_frames.jsonl")
+T0 = 1_700_000_040_000
+
+
+def wait_for(cond, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if cond():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_gap_is_detected_and_backfilled_off_the_ws_thread():
+    calls = []
+    release = threading.Event()
+
+    def rest_candles(market, interval, limit):
+        calls.append(threading.current_thread().name)
+        release.wait(5)
+        # REST answers newest first, including the two candles the stream skipped
+        return [[T0 + k * 60_000, "1", "1", "1", "1", "1"] for k in reversed(range(9))][:limit]
+
+    with ReplayServer(load_frames(FRAMES)) as server:
+        stream = BitvavoStream(["BTC-EUR"], buffer_size=9, backfill=rest_candles, ws_url=server.url,
+                               ping_interval=1, ping_timeout=0.5).start()
+        try:
+            # The connect-time backfill is still blocked, yet frames keep flowing up to the gap
+            assert wait_for(lambda: stream.gaps == 1)
+            assert wait_for(lambda: stream.latest_price("BTC-EUR") == 34525.0)
+            assert stream.candles("BTC-EUR", "1m", 1) is None  # not served until repaired
+
+            release.set()
+            assert wait_for(lambda: stream.candles("BTC-EUR", "1m", 9) is not None)
+            got = stream.candles("BTC-EUR", "1m", 9)
+            assert [c[0] for c in got] == [T0 + k * 60_000 for k in reversed(range(9))]
+            assert 1 <= len(calls) <= 2 and set(calls) == {"bitvavo-backfill"}
+            assert server.received[0]["action"] == "subscribe"
+        finally:
+            stream.stop()
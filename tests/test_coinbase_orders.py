@@ -0,0 +1,58 @@
+# tests/test_coinbase_orders.py
+import pytest
+
+from bot.broker_coinbase import CoinbaseOrders
+from bot.live import RunnerPosition
+from bot.orders import OrderRequest
+from bot.risk import RiskManager
+from bot.state_store import StateStore
+
+
+class FakeClient:
+    def __init__(self, orders):
+        self.orders = list(orders)  # successive get_order answers
+        self.polls = 0
+
+    def create_order(self, **kwargs):
+        return {"success": True, "success_response": {"order_id": "o-1"}}
+
+    def get_order(self, order_id):
+        self.polls += 1
+        return {"order": self.orders.pop(0) if len(self.orders) > 1 else self.orders[0]}
+
+
+def broker_with(*orders):
+    broker = CoinbaseOrders()
+    broker.client = FakeClient(orders)
+    broker.markets = None
+    return broker
+
+
+def test_settle_waits_for_the_fill_and_journals_the_filled_size(tmp_path):
+    # $100 at ~60000 with the fee taken from the quote: less base than 100 / close
+    broker = broker_with({"status": "PENDING", "filled_size": "0"},
+                         {"status": "FILLED", "filled_size": "0.00165", "average_filled_price": "60300",
+                          "total_fees": "0.5"})
+    result = broker.settle(broker.submit(OrderRequest("BTC-USD", "buy", quote_amount=100.0)), poll=0.001)
+    assert broker.client.polls == 2
+    assert result.ok and result.status == "filled"
+    assert result.filled == 0.00165 and result.avg_price == 60300.0
+    assert [(f.amount, f.price, f.fee) for f in result.fills] == [(0.00165, 60300.0, 0.5)]
+
+    store = StateStore(str(tmp_path / "coinbase.db"))
+    position = RunnerPosition(store, "BTC-USD", RiskManager({"stop_loss_pct": 0.02}))
+    position.record(result, 60000.0, amount=100.0 / 60000.0)  # fills win over the estimate
+    assert position.size == pytest.approx(0.00165) and position.entry_price == 60300.0
+    store.close()
+
+
+def test_settle_gives_up_after_the_timeout():
+    broker = broker_with({"status": "OPEN", "filled_size": "0.001", "average_filled_price": "60000"})
+    result = broker.settle(broker.submit(OrderRequest("BTC-USD", "sell", 0.002)), timeout=0.01, poll=0.001)
+    assert result.ok and result.status == "partially_filled" and result.filled == 0.001
+
+
+def test_settle_unfilled_cancel_is_not_ok():
+    broker = broker_with({"status": "CANCELLED", "filled_size": "0"})
+    result = broker.settle(broker.submit(OrderRequest("BTC-USD", "sell", 0.002)), poll=0.001)
+    assert not result.ok and result.status == "canceled" and result.fills == []
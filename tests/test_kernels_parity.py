@@ -0,0 +1,71 @@
+# tests/test_kernels_parity.py
+"""bot/kernels.py backends must give exactly the signals of the pandas generate_signals()."""
+import numpy as np
+import pytest
+
+from bot import kernels
+from bot.strategy import SMARSI, ScalpingStrategy
+from bot.synthetic import generate
+
+SMARSI_SETS = [{}, {'fast_sma': 5, 'slow_sma': 20, 'rsi_period': 7, 'rsi_buy_below': 30, 'rsi_sell_above': 70},
+               {'fast_sma': 15, 'slow_sma': 60, 'rsi_buy_below': 40}]
+SCALPING_SETS = [{}, {'ema_fast': 3, 'ema_slow': 12, 'rsi_period': 9, 'volume_ma': 5},
+                 {'ema_fast': 8, 'ema_slow': 30, 'rsi_overbought': 75, 'rsi_oversold': 25, 'volume_ma': 20}]
+CASES = [(SMARSI, SMARSI_SETS), (ScalpingStrategy, SCALPING_SETS)]
+
+
+@pytest.fixture(scope="module", params=[(0, 0.0), (1, 0.01), (2, 0.0)], ids=["seed0", "seed1-gaps", "seed2"])
+def candles(request):
+    seed, gap_prob = request.param
+    return generate(2000, "1m", seed=seed, start_ms=1_700_000_040_000, vol=0.003, vol_of_vol=0.3,
+                    gap_prob=gap_prob)
+
+
+def reference(strategy_cls, params, candles):
+    return strategy_cls(params).generate_signals(candles).to_numpy()
+
+
+def run_fused(strategy_cls, params, candles):
+    """The fused loop run as plain Python (what numba compiles)."""
+    close = np.ascontiguousarray(candles['close'].to_numpy(np.float64))
+    out = np.zeros(len(close), dtype=np.int8)
+    if strategy_cls is SMARSI:
+        a = kernels._args(params, kernels.SMARSI_DEFAULTS)
+        kernels._smarsi_loop(close, int(a[0]), int(a[1]), int(a[2]), float(a[3]), float(a[4]), out)
+    else:
+        volume = np.ascontiguousarray(candles['volume'].to_numpy(np.float64))
+        a = kernels._args(params, kernels.SCALPING_DEFAULTS)
+        kernels._scalping_loop(close, volume, int(a[0]), int(a[1]), int(a[2]), float(a[3]), float(a[4]),
+                               int(a[5]), out)
+    return out
+
+
+@pytest.mark.parametrize("strategy_cls,param_sets", CASES, ids=["smarsi", "scalping"])
+def test_numpy_backend(candles, strategy_cls, param_sets):
+    for params in param_sets:
+        got = strategy_cls(dict(params, backend='numpy')).generate_signals(candles).to_numpy()
+        np.testing.assert_array_equal(got, reference(strategy_cls, params, candles))
+
+
+@pytest.mark.parametrize("strategy_cls,param_sets", CASES, ids=["smarsi", "scalping"])
+def test_fused_loop(candles, strategy_cls, param_sets):
+    for params in param_sets:
+        np.testing.assert_array_equal(run_fused(strategy_cls, params, candles),
+                                      reference(strategy_cls, params, candles))
+
+
+@pytest.mark.parametrize("strategy_cls,param_sets", CASES, ids=["smarsi", "scalping"])
+def test_batch_numpy(candles, strategy_cls, param_sets):
+    got = strategy_cls.signals_batch(candles, param_sets, backend='numpy')
+    expected = np.vstack([reference(strategy_cls, p, candles) for p in param_sets])
+    np.testing.assert_array_equal(got, expected)
+
+
+@pytest.mark.parametrize("strategy_cls,param_sets", CASES, ids=["smarsi", "scalping"])
+def test_numba_backend(candles, strategy_cls, param_sets):
+    pytest.importorskip("numba")
+    for params in param_sets:
+        got = strategy_cls(dict(params, backend='numba')).generate_signals(candles).to_numpy()
+        np.testing.assert_array_equal(got, reference(strategy_cls, params, candles))
+    got = strategy_cls.signals_batch(candles, param_sets, backend='numba')
+    np.testing.assert_array_equal(got, np.vstack([reference(strategy_cls, p, candles) for p in param_sets]))
@@ -0,0 +1,66 @@
+# tests/test_live_loop.py
+import asyncio
+
+import pytest
+
+from bot.broker import Broker
+from bot.live import TradingLoop
+from bot.scheduler import Tick
+from bot.synthetic import generate
+
+SYMBOLS = ["BTC/USDT", "ETH/USDT"]
+
+
+class Source:
+    """AsyncLiveDataSource stand-in: the last `limit` candles up to `bar`, plus the forming one."""
+    def __init__(self):
+        self.candles = {s: generate(600, "1m", seed=i, start_ms=1_700_000_040_000, vol=0.003)
+                        for i, s in enumerate(SYMBOLS)}
+        self.markets = None
+        self.exchange = None
+        self.bar = 150
+
+    async def get_recent_candles(self, symbol, limit=200):
+        return self.candles[symbol].iloc[max(0, self.bar - limit):self.bar + 1].reset_index(drop=True)
+
+    async def close(self):
+        pass
+
+
+class Done(Exception):
+    pass
+
+
+def run_cycles(tmp_path, concurrent, cycles=300):
+    cfg = {
+        "exchange": {"name": None},
+        "market": {"symbol": SYMBOLS[0], "symbols": SYMBOLS, "timeframe": "1m"},
+        "strategy": {"name": "sma_rsi", "params": {}},
+        "risk": {"max_position_pct": 0.2, "stop_loss_pct": 0.02, "take_profit_pct": 0.04},
+        "paper": {"enabled": True, "starting_equity": 10000, "candles_history": 100, "order_amount": 0.001,
+                  "async": concurrent},
+        "state": {"dir": str(tmp_path / ("async" if concurrent else "sync"))},
+    }
+    loop = TradingLoop(Broker(cfg), cfg)
+    source = Source()
+    setup = loop.setup_async
+    loop.setup_async = lambda: setup(source)
+    first_ts = int(source.candles[SYMBOLS[0]]['timestamp'].iloc[0])
+
+    async def wait_async():
+        if source.bar >= 150 + cycles:
+            raise Done
+        source.bar += 1
+        return Tick(first_ts + source.bar * 60_000, 60_000, 0.0)
+
+    loop.scheduler.wait_async = wait_async
+    with pytest.raises(Done):
+        asyncio.run(loop.run_async(concurrent=concurrent))
+    return loop.paper_broker.fills
+
+
+def test_sync_mode_trades_through_the_same_path(tmp_path):
+    sequential = run_cycles(tmp_path, concurrent=False)
+    assert sequential
+    assert [(f['symbol'], f['side'], f['price']) for f in sequential] == \
+           [(f['symbol'], f['side'], f['price']) for f in run_cycles(tmp_path, concurrent=True)]
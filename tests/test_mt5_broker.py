@@ -0,0 +1,38 @@
+# tests/test_mt5_broker.py
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from mt5_fake import FakeMT5  # noqa: E402
+from bot import broker_pepperstone_mt5, markets  # noqa: E402
+from bot.orders import OrderRequest  # noqa: E402
+
+
+@pytest.fixture
+def fake(monkeypatch, tmp_path):
+    fake = FakeMT5(prices={"BTCUSD": 60000.0, "EURUSD": 1.08}, latency=0.005)
+    monkeypatch.setitem(sys.modules, "MetaTrader5", fake)
+    monkeypatch.setattr(broker_pepperstone_mt5, "mt5", fake)
+    monkeypatch.setattr(markets, "_caches", {})
+    monkeypatch.setitem(markets._options, "cache_dir", str(tmp_path))
+    return fake
+
+
+def test_submit_many_serializes_terminal_calls(fake):
+    broker = broker_pepperstone_mt5.PepperstoneMT5Broker({"pepperstone_mt5": {}})
+    orders = [OrderRequest("BTCUSD" if i % 2 else "EURUSD", "buy" if i % 3 else "sell", 0.1) for i in range(16)]
+    orders.append(OrderRequest("BTCUSD", "buy", 0.1, "limit", price=59000.0))
+
+    results = broker.submit_many(orders)
+
+    assert [r.ok for r in results] == [True] * len(orders)
+    assert [r.status for r in results] == ["filled"] * 16 + ["new"]
+    assert len(fake.requests) == len(orders)
+    assert fake.max_concurrent == 1
+
+    canceled = broker.cancel_many([results[-1].order_id] * 8, "BTCUSD")
+    assert all(r.status == "canceled" for r in canceled)
+    assert fake.max_concurrent == 1
@@ -0,0 +1,87 @@
+# tests/test_notification_dispatcher.py
+import time
+
+from notification_dispatcher import NotificationDispatcher
+
+
+class FakeTelegram:
+    """Answers the first send with a 429 asking for `retry_after` seconds."""
+    def __init__(self, retry_after):
+        self.retry_after = 0
+        self._first_retry_after = retry_after
+        self.sent = []
+
+    def send(self, text):
+        if not self.sent and self._first_retry_after:
+            self.retry_after, self._first_retry_after = self._first_retry_after, 0
+            self.sent.append(None)
+            return False
+        self.retry_after = 0
+        self.sent.append((time.monotonic(), text))
+        return True
+
+
+class FakeEmail:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, subject, body):
+        self.sent.append(time.monotonic())
+        return True
+
+    def close(self):
+        pass
+
+
+def test_rate_limit_holds_message_without_blocking_worker():
+    telegram, email = FakeTelegram(retry_after=0.5), FakeEmail()
+    d = NotificationDispatcher(telegram=telegram, email=email, telegram_min_interval=0.0)
+    start = time.monotonic()
+    d.notify("first")
+    time.sleep(0.1)
+    d.notify("second")            # joins the held message
+    d.email_notify("s", "b")      # not stuck behind the backoff
+    d.notify("tick", digest="signal")
+    d.stop()
+
+    assert email.sent[0] - start < 0.4
+    (sent_at, text), = telegram.sent[1:2]
+    assert sent_at - start >= 0.5
+    assert text == "first\nsecond"
+    assert telegram.sent[2][1] == "tick"  # final digest flush, from the worker
+    assert d.stats['sent'] == 3 and d.stats['failed'] == 0
+
+
+def test_stop_timeout_leaves_final_flush_to_worker():
+    telegram = FakeTelegram(retry_after=0.5)
+    d = NotificationDispatcher(telegram=telegram, telegram_min_interval=0.0)
+    d.notify("first")
+    d.notify("tick", digest="signal")
+    time.sleep(0.1)
+    d.stop(timeout=0.05)          # worker is still waiting out the 429
+    assert len(telegram.sent) == 1
+    d._thread.join(2)
+    assert [t for _, t in telegram.sent[1:]] == ["first", "tick"]
+
+
+def test_long_batches_are_split_not_truncated():
+    telegram = FakeTelegram(retry_after=0)
+    d = NotificationDispatcher(telegram=telegram, telegram_min_interval=0.0)
+    d.TELEGRAM_MAX_LEN = 100
+    messages = [f"{i:02d}" + "x" * 38 for i in range(5)] + ["y" * 250]
+    assert d._split(messages) == ["\n".join(messages[:2]), "\n".join(messages[2:4]), messages[4],
+                                  "y" * 100, "y" * 100, "y" * 50]
+    assert all(len(t) <= 100 for t in d._split(messages))
+    assert d._split(["short"]) == ["short"]
+    d.stop()
+
+
+def test_split_survives_a_rate_limit():
+    telegram = FakeTelegram(retry_after=0.2)
+    d = NotificationDispatcher(telegram=telegram, telegram_min_interval=0.0)
+    d.TELEGRAM_MAX_LEN = 10
+    for text in ("a" * 10, "b" * 10, "c" * 5):
+        d.notify(text)
+    d.stop()
+    assert [t for _, t in telegram.sent[1:]] == ["a" * 10, "b" * 10, "c" * 5]
+    assert d.stats['sent'] == 3 and d.stats['failed'] == 0
@@ -0,0 +1,129 @@
+# tests/test_paper_broker.py
+from bot.broker import PaperBroker
+
+
+def test_market_exits_follow_the_fill():
+    pb = PaperBroker(10_000)
+    fill = pb.market("buy", 100.0, 2.0, tp=110.0, sl=95.0, symbol="BTC")
+    assert {(o['type'], o['size']) for o in pb.open_orders("BTC")} == {('limit', fill['size']), ('stop', fill['size'])}
+
+
+def test_market_without_fill_attaches_no_exits():
+    pb = PaperBroker(10_000)
+    assert pb.market("buy", 100.0, 0.0, tp=110.0, sl=95.0, symbol="BTC") is None
+    assert pb.open_orders("BTC") == []
+
+
+def long_with_exits(**kwargs):
+    pb = PaperBroker(10_000, **kwargs)
+    pb.market("buy", 100.0, 1.0, tp=110.0, sl=95.0, symbol="BTC")
+    return pb
+
+
+def test_stop_loss_inside_bar_cancels_take_profit():
+    pb = long_with_exits()
+    fills = pb.process_bar(high=101.0, low=94.0, open_=99.0, symbol="BTC")
+    assert [(f['type'], f['side'], f['price'], f['size']) for f in fills] == [('stop', 'sell', 95.0, 1.0)]
+    assert pb.position("BTC") == 0.0
+    assert pb.open_orders("BTC") == []
+    assert pb.equity == 10_000 - 100.0 + 95.0
+
+
+def test_take_profit_inside_bar_cancels_stop():
+    pb = long_with_exits()
+    assert pb.process_bar(high=101.0, low=96.0, open_=99.0, symbol="BTC") == []
+    fills = pb.process_bar(high=111.0, low=99.0, open_=100.0, symbol="BTC")
+    assert [(f['type'], f['price']) for f in fills] == [('limit', 110.0)]
+    assert pb.open_orders("BTC") == []
+    assert pb.equity == 10_000 + 10.0
+
+
+def test_stop_wins_when_both_exits_share_a_bar():
+    pb = long_with_exits()
+    fills = pb.process_bar(high=112.0, low=93.0, open_=100.0, symbol="BTC")
+    assert [(f['type'], f['price']) for f in fills] == [('stop', 95.0)]
+
+
+def test_gap_through_fills_at_the_open():
+    pb = long_with_exits()
+    assert pb.process_bar(high=91.0, low=88.0, open_=90.0, symbol="BTC")[0]['price'] == 90.0
+    pb = long_with_exits()
+    assert pb.process_bar(high=116.0, low=114.0, open_=115.0, symbol="BTC")[0]['price'] == 115.0
+
+
+def test_only_stops_slip():
+    pb = long_with_exits(slippage_pct=0.001)
+    assert pb.process_bar(high=101.0, low=94.0, open_=99.0, symbol="BTC")[0]['price'] == 95.0 * (1 - 0.001)
+    pb = long_with_exits(slippage_pct=0.001)
+    assert pb.process_bar(high=111.0, low=99.0, open_=100.0, symbol="BTC")[0]['price'] == 110.0
+
+
+def test_flat_position_cancels_protective_orders():
+    pb = long_with_exits()
+    pb.market("sell", 100.0, 1.0, symbol="BTC")
+    assert pb.open_orders("BTC") == []
+    assert pb.process_bar(high=120.0, low=80.0, open_=100.0, symbol="BTC") == []
+
+
+def test_limit_entries():
+    pb = PaperBroker(10_000, fee_pct=0.001)
+    buy = pb.limit("buy", 98.0, 1.0, symbol="BTC")
+    sell = pb.limit("sell", 103.0, 1.0, symbol="ETH")
+    assert pb.process_bar(high=101.0, low=99.0, open_=100.0, symbol="BTC") == []
+    fills = pb.process_bar(high=99.0, low=97.0, open_=99.0, symbol="BTC")
+    assert [(f['side'], f['price']) for f in fills] == [('buy', 98.0)]
+    assert pb.position("BTC") == 1.0
+    assert pb.equity == 10_000 - 98.0 - 98.0 * 0.001
+    assert [o['id'] for o in pb.open_orders()] == [sell] and buy != sell
+
+    # gapped above a sell limit: fills at the better open
+    assert pb.process_bar(high=106.0, low=104.0, open_=105.0, symbol="ETH")[0]['price'] == 105.0
+    assert pb.position("ETH") == -1.0
+
+
+def test_stop_entries():
+    pb = PaperBroker(10_000)
+    pb.stop("buy", 105.0, 1.0, symbol="BTC", reduce_only=False)
+    assert pb.process_bar(high=104.0, low=100.0, open_=101.0, symbol="BTC") == []
+    assert pb.process_bar(high=106.0, low=101.0, open_=102.0, symbol="BTC")[0]['price'] == 105.0
+    pb.stop("buy", 110.0, 1.0, symbol="BTC", reduce_only=False)
+    assert pb.process_bar(high=113.0, low=111.0, open_=112.0, symbol="BTC")[0]['price'] == 112.0
+    assert pb.position("BTC") == 2.0
+
+
+def test_reduce_only_stop_needs_a_position():
+    pb = PaperBroker(10_000)
+    pb.stop("sell", 95.0, 1.0, symbol="BTC")
+    assert pb.process_bar(high=100.0, low=90.0, open_=99.0, symbol="BTC") == []
+    assert pb.position("BTC") == 0.0
+
+
+def test_compact_reuses_slots_and_keeps_order_ids():
+    pb = PaperBroker(10_000, capacity=4)
+    ids = [pb.limit("buy", 90.0 + i, 1.0, symbol="BTC") for i in range(4)]
+    pb.cancel(ids[0])
+    pb.cancel(ids[2])
+    more = [pb.limit("buy", 80.0, 1.0, symbol="BTC"), pb.limit("buy", 81.0, 1.0, symbol="BTC")]
+    assert len(pb._side) == 4  # compacted in place, no growth
+    assert [o['id'] for o in pb.open_orders("BTC")] == [ids[1], ids[3], *more]
+
+    pb.limit("buy", 70.0, 1.0, symbol="BTC")
+    assert len(pb._side) == 8  # live orders filled the arrays: grown
+    assert len(pb.open_orders("BTC")) == 5
+
+    fills = pb.process_bar(high=95.0, low=90.5, open_=94.0, symbol="BTC")
+    assert sorted(f['price'] for f in fills) == [91.0, 93.0]
+    assert sorted(o['price'] for o in pb.open_orders("BTC")) == [70.0, 80.0, 81.0]
+
+
+def test_restore_replaces_exits_for_open_positions():
+    pb = PaperBroker(10_000)
+    pb.restore(cash=5_000.0, positions={"BTC": 2.0, "ETH": 0.0}, exits={"BTC": (110.0, 95.0), "ETH": (1.0, 0.5)})
+    assert pb.equity == 5_000.0 and pb.position("BTC") == 2.0
+    assert pb.open_orders("ETH") == []
+    assert {(o['type'], o['price'], o['size']) for o in pb.open_orders("BTC")} == {('limit', 110.0, 2.0), ('stop', 95.0, 2.0)}
+
+    fills = pb.process_bar(high=100.0, low=94.0, open_=99.0, symbol="BTC")
+    assert [(f['type'], f['size']) for f in fills] == [('stop', 2.0)]
+    assert pb.equity == 5_000.0 + 2 * 95.0
+    assert pb.open_orders() == []
@@ -0,0 +1,28 @@
+# tests/test_portfolio.py
+import numpy as np
+import pytest
+
+from bot.backtest import Backtester
+from bot.portfolio import PortfolioBacktester
+from bot.risk import RiskManager
+from bot.strategy import SMARSI, SMACrossover
+from bot.synthetic import generate
+
+RISK = {"max_position_pct": 0.2, "stop_loss_pct": 0.02, "take_profit_pct": 0.04}
+
+
+@pytest.mark.parametrize("strategy_cls", [SMARSI, SMACrossover])
+@pytest.mark.parametrize("intrabar_stops", [True, False])
+def test_single_symbol_matches_backtester(strategy_cls, intrabar_stops):
+    candles = generate(3000, "1m", seed=2, start_ms=1_700_000_040_000, vol=0.003, gap_prob=0.01)
+    params = {'timeframe': '1m', 'intrabar_stops': intrabar_stops, 'write_artifacts': False}
+    single = Backtester(params, strategy_cls({}), RiskManager(RISK)).run(candles)
+    port = PortfolioBacktester(params, strategy_cls({}), RiskManager(RISK)).run({"BTC-USD": candles})
+
+    st, pt = single['trades'].reset_index(drop=True), port['trades'].reset_index(drop=True)
+    assert len(st) > 0
+    assert list(st['side']) == list(pt['side'])
+    np.testing.assert_allclose(st['price'], pt['price'], rtol=1e-12)
+    np.testing.assert_allclose(st['size'], pt['size'], rtol=1e-12)
+    np.testing.assert_allclose(port['equity_curve'], single['equity_curve'], rtol=0, atol=1e-6)
+    assert port['metrics']['final_equity'] == pytest.approx(single['metrics']['final_equity'], rel=1e-12)
@@ -0,0 +1,34 @@
+# tests/test_runner_position.py
+import pytest
+
+from bot.live import RunnerPosition
+from bot.orders import Fill, OrderResult
+from bot.risk import RiskManager
+from bot.state_store import StateStore
+
+RISK = RiskManager({"stop_loss_pct": 0.02, "take_profit_pct": 0.04})
+
+
+def test_position_and_exits_survive_a_restart(tmp_path):
+    path = str(tmp_path / "runner.db")
+    store = StateStore(path)
+    pos = RunnerPosition(store, "BTC-EUR", RISK)
+    assert pos.size == 0 and pos.exits is None
+
+    pos.record(OrderResult(ok=True, symbol="BTC-EUR", side="buy", status="filled", amount=0.5, filled=0.5,
+                           fills=[Fill("BTC-EUR", "buy", 0.5, 100.0)]), price=101.0)
+    assert pos.size == 0.5 and pos.exits == pytest.approx((98.0, 104.0))
+    store.close()
+
+    store = StateStore(path)
+    pos = RunnerPosition(store, "BTC-EUR", RISK)
+    assert pos.size == 0.5 and pos.entry_price == 100.0
+    assert not pos.exit_hit({"high": 103.0, "low": 99.0})
+    assert pos.exit_hit({"high": 100.0, "low": 97.5})
+
+    # Accepted without fills (market order still settling): taken as filled at the close
+    pos.record(OrderResult(ok=True, symbol="BTC-EUR", side="sell", status="new", amount=0.5), price=97.0)
+    assert pos.size == 0 and pos.exits is None
+    pos.record(OrderResult(ok=False, symbol="BTC-EUR", side="buy", status="rejected", amount=0.5), price=97.0)
+    assert pos.size == 0
+    store.close()
@@ -0,0 +1,74 @@
+# tests/test_running_metrics.py
+"""RunningMetrics (one point at a time or in blocks) must give compute_metrics' numbers."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from bot.metrics import RunningMetrics, compute_metrics
+
+FEE = 0.001
+
+
+def sample(seed, n=3000):
+    rng = np.random.default_rng(seed)
+    ec = 10_000 * np.cumprod(1 + rng.normal(0, 0.002, n))
+    ts = np.arange(n)
+    buys = np.sort(rng.choice(n // 2, 20, replace=False)) * 2
+    rows = []
+    for b in buys:
+        rows.append((int(ts[b]), 'buy', 100 + rng.normal(), 0.5 + rng.random()))
+        rows.append((int(ts[b + 1]), 'sell', 100 + rng.normal(), rows[-1][3]))
+    trades = pd.DataFrame(rows, columns=['ts', 'side', 'price', 'size'])
+    positions = np.zeros(n)
+    for b in buys:
+        positions[b] = 1.0
+    return ec, trades, positions
+
+
+def record(metrics, trades):
+    entry = 0.0
+    for side, price, size in trades[['side', 'price', 'size']].itertuples(index=False, name=None):
+        if side == 'buy':
+            entry = price
+            metrics.record_trade(price, size)
+        else:
+            metrics.record_trade(price, size, price * size * (1 - FEE) - entry * size * (1 + FEE))
+
+
+def assert_same(actual, expected):
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        assert actual[key] == pytest.approx(value, rel=1e-9, abs=1e-9), key
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_update_matches_compute_metrics(seed):
+    ec, trades, positions = sample(seed)
+    expected = compute_metrics(ec, "1h", trades=trades, positions=positions, fee_pct=FEE)
+    m = RunningMetrics("1h")
+    for equity, held in zip(ec, positions > 0):
+        m.update(equity, held)
+    record(m, trades)
+    assert_same(m.snapshot(), expected)
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("block", [1, 7, 500, 3000])
+def test_update_many_matches_compute_metrics(seed, block):
+    ec, trades, positions = sample(seed)
+    expected = compute_metrics(ec, "1h", trades=trades, positions=positions, fee_pct=FEE)
+    m = RunningMetrics("1h")
+    for start in range(0, len(ec), block):
+        m.update_many(ec[start:start + block], positions[start:start + block] > 0)
+    record(m, trades)
+    assert_same(m.snapshot(), expected)
+
+
+def test_drawdown_spanning_blocks():
+    ec = np.array([100.0, 110.0, 90.0, 95.0, 80.0, 85.0, 120.0, 100.0])
+    expected = compute_metrics(ec, "1m")
+    m = RunningMetrics("1m")
+    for block in (ec[:2], ec[2:5], ec[5:]):
+        m.update_many(block)
+    assert m.snapshot()['max_drawdown_pct'] == pytest.approx(expected['max_drawdown_pct'])
+    assert m.snapshot()['max_drawdown_bars'] == expected['max_drawdown_bars'] == 4
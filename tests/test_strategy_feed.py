@@ -0,0 +1,22 @@
+# tests/test_strategy_feed.py
+import numpy as np
+import pytest
+
+from bot.live import StrategyFeed
+from bot.strategy import SMACrossover, SMARSI, ScalpingStrategy
+from bot.synthetic import generate
+
+
+@pytest.mark.parametrize("strategy_cls", [SMACrossover, SMARSI, ScalpingStrategy])
+def test_feed_matches_generate_signals(strategy_cls):
+    candles = generate(1500, "1m", seed=3, start_ms=1_700_000_040_000, vol=0.003)
+    expected = strategy_cls({}).generate_signals(candles).to_numpy()
+    rows = candles.to_dict('records')
+
+    # Polls of 200 overlapping candles, as the live runners fetch them
+    feed = StrategyFeed(strategy_cls({}), "1m")
+    got = [feed.update(rows[:200])]
+    for end in range(201, len(rows) + 1):
+        got.append(feed.update(rows[end - 200:end]))
+    np.testing.assert_array_equal(got, expected[199:])
+    assert feed.update(rows[-200:]) == 0  # nothing new since the last poll
@@ -0,0 +1,46 @@
+# tests/test_stream_backtest.py
+"""Streaming over blocks must give the in-memory vectorized Backtester's trades, equity curve and metrics."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from bot import indicator_cache
+from bot.backtest import Backtester
+from bot.risk import RiskManager
+from bot.stream_backtest import StreamingBacktester
+from bot.strategy import SMARSI, ScalpingStrategy
+from bot.synthetic import generate
+
+RISK = {"max_position_pct": 0.2, "stop_loss_pct": 0.02, "take_profit_pct": 0.04}
+PARAMS = {'engine': 'vectorized', 'timeframe': '1m', 'write_artifacts': False}
+
+
+def chunks(candles, size):
+    for start in range(0, len(candles), size):
+        yield candles.iloc[start:start + size]
+
+
+@pytest.mark.parametrize("strategy_cls", [SMARSI, ScalpingStrategy])
+@pytest.mark.parametrize("chunk_bars", [700, 5000])
+def test_stream_matches_in_memory(tmp_path, strategy_cls, chunk_bars):
+    candles = generate(5000, "1m", seed=3, start_ms=1_700_000_040_000, vol=0.003, gap_prob=0.01)
+    full = Backtester(PARAMS, strategy_cls({}), RiskManager(RISK)).run(candles)
+
+    before = indicator_cache.get_cache().stats()['entries']
+    stream = StreamingBacktester(PARAMS, strategy_cls({}), RiskManager(RISK), warmup_bars=1000,
+                                 out_dir=str(tmp_path)).run(chunks(candles, chunk_bars))
+    assert indicator_cache.get_cache().stats()['entries'] == before
+    assert stream['bars'] == len(candles)
+
+    ec = np.fromfile(stream['files']['equity_curve_f64'], dtype=np.float64)
+    np.testing.assert_allclose(ec, full['equity_curve'], rtol=0, atol=1e-6)
+
+    trades = pd.read_csv(stream['files']['trades_csv'])
+    expected = full['trades'].reset_index(drop=True)
+    assert len(expected) > 0
+    assert list(trades['side']) == list(expected['side'])
+    np.testing.assert_allclose(trades['price'], expected['price'], rtol=1e-12)
+    np.testing.assert_allclose(trades['size'], expected['size'], rtol=1e-12)
+
+    for key, value in full['metrics'].items():
+        assert stream['metrics'][key] == pytest.approx(value, rel=1e-9, abs=1e-9), key
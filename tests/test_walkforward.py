@@ -0,0 +1,54 @@
+# tests/test_walkforward.py
+import numpy as np
+import pytest
+
+from bot.backtest import Backtester
+from bot.risk import RiskManager
+from bot.strategy import SMACrossover
+from bot.synthetic import generate
+from bot.walkforward import WalkForward, walk_forward_windows
+
+CFG = {
+    'strategy': {'name': 'sma_crossover', 'params': {}},
+    'risk': {"max_position_pct": 0.2, "stop_loss_pct": 0.02, "take_profit_pct": 0.04},
+    'backtest': {'engine': 'vectorized', 'timeframe': '1m', 'starting_equity': 10000.0},
+}
+RANGES = {'fast_sma': [5, 10], 'slow_sma': [20, 40]}
+
+
+def test_windows():
+    assert walk_forward_windows(10, 4, 2) == [(0, 4, 6), (2, 6, 8), (4, 8, 10)]
+    assert walk_forward_windows(10, 4, 2, step_bars=3) == [(0, 4, 6), (3, 7, 9)]
+    assert walk_forward_windows(5, 4, 2) == []
+
+
+def test_walk_forward_picks_best_train_combo_and_chains_test_windows():
+    candles = generate(4000, "1m", seed=1, start_ms=1_700_000_040_000, vol=0.003)
+    res = WalkForward(CFG, RANGES, train_bars=1500, test_bars=500, rank_by='sharpe_like', workers=2).run(candles)
+    folds = res['folds']
+    assert len(folds) == 5
+    assert len(res['equity_curve']) == 5 * 500
+
+    risk = RiskManager(CFG['risk'])
+    equity = 10000.0
+    for k, (a, b, c) in enumerate(walk_forward_windows(len(candles), 1500, 500)):
+        scores = {}
+        for fast in RANGES['fast_sma']:
+            for slow in RANGES['slow_sma']:
+                signals = SMACrossover({'fast_sma': fast, 'slow_sma': slow}).generate_signals(candles).to_numpy()
+                bt = Backtester({**CFG['backtest'], 'write_artifacts': False}, None, risk)
+                scores[(fast, slow)] = bt.run_signals(candles.iloc[a:b], signals[a:b])['metrics']['sharpe_like']
+        best = max(scores, key=scores.get)
+        row = folds.iloc[k]
+        assert (row['fast_sma'], row['slow_sma']) == best
+        assert row['train_sharpe_like'] == pytest.approx(scores[best])
+        # each test window starts with the equity the previous one ended on
+        assert res['equity_curve'][k * 500] == pytest.approx(equity, rel=1e-2)
+        equity = row['test_final_equity']
+
+    m = res['metrics']
+    assert m['final_equity'] == pytest.approx(folds['test_final_equity'].iloc[-1])
+    assert m['num_trades'] == folds['test_num_trades'].sum() == len(res['trades']) > 0
+    assert m['exposure_pct'] > 0 and m['turnover'] > 0
+    assert 0 < m['win_rate_pct'] < 100
+    assert m['profit_factor'] > 0